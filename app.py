@@ -2,6 +2,7 @@ import streamlit as st
 import os
 from utils.controller import init_session_state
 from utils.db import create_tables
+from scoring.rubric import get_scoring_plans
 
 # Set page config
 st.set_page_config(
@@ -22,6 +23,7 @@ load_css()
 
 # Initialize DB and Session State
 create_tables()
+get_scoring_plans()  # Compile the per-role scoring plans up front
 init_session_state()
 
 # Hide default Streamlit sidebar nav to implement custom flow, or just let users use it
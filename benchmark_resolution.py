@@ -0,0 +1,65 @@
+"""
+Accuracy vs latency of the per-frame vision pass at several analysis resolutions.
+
+    python benchmark_resolution.py interview.mp4 [sample_fps]
+
+Every sampled frame is analyzed at full resolution (the reference) and at each
+size in SIZES. For each size it reports the mean per-frame latency of
+analyze_vision_frame and the emotion detector, and how often gaze and posture
+agree with the full-resolution result.
+"""
+import sys
+import time
+import numpy as np
+from vision.frame_analyzer import analyze_vision_frame
+from vision.emotion_detector import analyze_face_crop
+from vision.video_pipeline import iter_sampled_frames
+
+# Longest side in pixels; 0 is the capture resolution
+SIZES = [0, 960, 640, 480, 320, 240]
+
+
+def benchmark(path: str, sample_fps: float = 1.0) -> list:
+    frames = [frame for _, frame in iter_sampled_frames(path, sample_fps)]
+    if not frames:
+        raise RuntimeError(f"No frames read from {path}")
+
+    # Warm up the graphs so model loading is not timed
+    analyze_vision_frame(frames[0], max_side=0)
+
+    reference = [analyze_vision_frame(f, max_side=0) for f in frames]
+    rows = []
+    for size in SIZES:
+        vision_ms, emotion_ms, gaze_hits, posture_hits, face_frames = [], [], 0, 0, 0
+        for frame, ref in zip(frames, reference):
+            start = time.perf_counter()
+            res = analyze_vision_frame(frame, max_side=size)
+            vision_ms.append((time.perf_counter() - start) * 1000)
+            if res.has_face:
+                start = time.perf_counter()
+                analyze_face_crop(frame, res.bbox, res.face)
+                emotion_ms.append((time.perf_counter() - start) * 1000)
+            if ref.has_face:
+                face_frames += 1
+                gaze_hits += res.gaze == ref.gaze
+            posture_hits += res.posture == ref.posture
+
+        rows.append({
+            "max_side": size or "full",
+            "vision_ms": round(float(np.mean(vision_ms)), 1),
+            "emotion_ms": round(float(np.mean(emotion_ms)), 1) if emotion_ms else 0.0,
+            "gaze_agreement": round(100 * gaze_hits / face_frames, 1) if face_frames else 0.0,
+            "posture_agreement": round(100 * posture_hits / len(frames), 1)
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    fps = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    print(f"{'max_side':>8} {'vision ms':>10} {'emotion ms':>11} {'gaze %':>8} {'posture %':>10}")
+    for r in benchmark(sys.argv[1], fps):
+        print(f"{r['max_side']:>8} {r['vision_ms']:>10} {r['emotion_ms']:>11} "
+              f"{r['gaze_agreement']:>8} {r['posture_agreement']:>10}")
@@ -0,0 +1,179 @@
+import json
+import re
+import threading
+import zlib
+import numpy as np
+from utils.config import (
+    DUPLICATE_NUM_PERM, DUPLICATE_BANDS, DUPLICATE_SHINGLE_SIZE,
+    DUPLICATE_MIN_WORDS, DUPLICATE_THRESHOLD, TEMPLATE_ANSWERS_PATH
+)
+from utils.db import add_session_listener, iter_answer_transcripts
+from utils.resources import registry, resource
+
+_MERSENNE = np.uint64((1 << 31) - 1)
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def shingles(text: str, size: int = DUPLICATE_SHINGLE_SIZE) -> set:
+    """Set of word size-grams of the lowercased text (punctuation and spacing ignored)."""
+    words = _WORD.findall((text or "").lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class AnswerIndex:
+    """
+    MinHash/LSH index for near-duplicate answers.
+    Each answer is reduced to a num_perm MinHash signature of its word shingles, whose
+    share of equal positions estimates the Jaccard similarity of two answers. The
+    signature is cut into `bands` bands hashed into buckets; only answers sharing a
+    bucket with the query are compared, so lookups stay sub-linear in the number of
+    stored answers. Entries are keyed (session_id, question_index); template answers
+    use session_id None.
+    """
+
+    def __init__(self, num_perm: int = DUPLICATE_NUM_PERM, bands: int = DUPLICATE_BANDS,
+                 shingle_size: int = DUPLICATE_SHINGLE_SIZE, min_words: int = DUPLICATE_MIN_WORDS, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_MERSENNE), num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE), num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+        self._buckets = [{} for _ in range(bands)]  # band -> {band bytes: set of keys}
+        self._signatures = {}  # key -> signature
+        self._templates = {}   # template index -> title
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str):
+        """MinHash signature of text, or None for answers too short to compare."""
+        if len(_WORD.findall((text or "").lower())) < self.min_words:
+            return None
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles(text, self.shingle_size)),
+                             dtype=np.uint64)
+        # (a * x + b) mod p for every permutation and shingle, then the column minimum
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE).min(axis=1).astype(np.uint32)
+
+    def _bands(self, sig):
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def add(self, key: tuple, text: str, title: str = None) -> bool:
+        """Indexes one answer under key; returns False when it is too short to index."""
+        sig = self.signature(text)
+        if sig is None:
+            return False
+        with self._lock:
+            self._remove(key)
+            self._signatures[key] = sig
+            for band, part in zip(self._buckets, self._bands(sig)):
+                band.setdefault(part, set()).add(key)
+            if key[0] is None:
+                self._templates[key[1]] = title
+        return True
+
+    def add_template(self, title: str, text: str) -> bool:
+        return self.add((None, len(self._templates)), text, title)
+
+    def _remove(self, key):
+        sig = self._signatures.pop(key, None)
+        if sig is None:
+            return
+        for band, part in zip(self._buckets, self._bands(sig)):
+            keys = band.get(part)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del band[part]
+
+    def remove_session(self, session_id: int):
+        with self._lock:
+            for key in [k for k in self._signatures if k[0] == session_id]:
+                self._remove(key)
+
+    def query(self, text: str, threshold: float = DUPLICATE_THRESHOLD, exclude_session: int = None) -> list:
+        """
+        Stored answers whose estimated Jaccard similarity to text is at least threshold,
+        most similar first, as {'session_id', 'question_index', 'template', 'similarity'}.
+        """
+        sig = self.signature(text)
+        if sig is None:
+            return []
+        with self._lock:
+            candidates = set()
+            for band, part in zip(self._buckets, self._bands(sig)):
+                candidates.update(band.get(part, ()))
+            matches = []
+            for key in candidates:
+                if exclude_session is not None and key[0] == exclude_session:
+                    continue
+                similarity = float(np.mean(self._signatures[key] == sig))
+                if similarity >= threshold:
+                    matches.append({
+                        "session_id": key[0],
+                        "question_index": key[1],
+                        "template": self._templates.get(key[1]) if key[0] is None else None,
+                        "similarity": round(similarity, 3)
+                    })
+        matches.sort(key=lambda m: -m["similarity"])
+        return matches
+
+
+def load_template_answers(path: str = TEMPLATE_ANSWERS_PATH) -> list:
+    """Public template answers as [{'title', 'answer'}]; empty when the file is missing."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+    except Exception as e:
+        print(f"Warning: could not load template answers: {e}")
+        return []
+
+
+@resource("answer_index")
+def get_answer_index() -> AnswerIndex:
+    """Builds the index from the template answers and every stored transcript; db hooks keep it current."""
+    index = AnswerIndex()
+    for t in load_template_answers():
+        index.add_template(t.get("title", ""), t.get("answer", ""))
+    for row in iter_answer_transcripts():
+        index.add((row["session_id"], row["question_index"]), row["answer_transcript"])
+    return index
+
+
+def check_answers(transcripts: list, exclude_session: int = None) -> list:
+    """
+    Near-duplicate check of one interview's answers against other candidates' and
+    template answers. Returns one {'duplicate_similarity', 'duplicate_matches'} dict per
+    transcript; duplicate_similarity is the best match (0.0 without one).
+    """
+    index = get_answer_index()
+    results = []
+    for text in transcripts:
+        matches = index.query(text, exclude_session=exclude_session) if (text or "").strip() else []
+        results.append({
+            "duplicate_similarity": matches[0]["similarity"] if matches else 0.0,
+            "duplicate_matches": matches[:5]
+        })
+    return results
+
+
+def _on_session_change(event: str, session_id: int, row: dict = None):
+    if not registry.is_loaded("answer_index"):
+        return  # Loaded later straight from the database
+    index = get_answer_index()
+    index.remove_session(session_id)
+    if event == "save":
+        for answer in iter_answer_transcripts([session_id]):
+            index.add((session_id, answer["question_index"]), answer["answer_transcript"])
+
+
+add_session_listener(_on_session_change)
@@ -1,8 +1,9 @@
-import streamlit as st
 import re
 from collections import Counter
+from functools import lru_cache
+from utils.resources import resource
 
-@st.cache_resource
+@resource("spacy")
 def get_nlp_model():
     try:
         import spacy
@@ -14,7 +15,7 @@ def get_nlp_model():
         print("Warning: spacy not installed.")
         return None
 
-@st.cache_resource
+@resource("vader")
 def get_vader_analyzer():
     try:
         from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
@@ -23,6 +24,15 @@ def get_vader_analyzer():
         print("Warning: vaderSentiment not installed.")
         return None
 
+@lru_cache(maxsize=512)
+def parse_text(text: str):
+    """
+    Returns the spaCy Doc for text, or None if spaCy is unavailable.
+    Docs are cached so the engine, STAR detector and reports share one parse per answer.
+    """
+    nlp = get_nlp_model()
+    return nlp(text) if nlp else None
+
 def analyze_answer(text: str, question: str) -> dict:
     """
     Analyzes an answer text based on relevance, grammar, vocab, sentiment, completeness.
@@ -37,8 +47,7 @@ def analyze_answer(text: str, question: str) -> dict:
             "key_points_covered": []
         }
         
-    nlp = get_nlp_model()
-    doc = nlp(text) if nlp else None
+    doc = parse_text(text)
     
     # Simple Word Count + Structure for completeness
     word_count = len(text.split())
@@ -69,6 +78,27 @@ def analyze_answer(text: str, question: str) -> dict:
         "key_points_covered": key_points[:5]
     }
 
+def analyze_answer_fast(text: str, question: str) -> dict:
+    """
+    Cheap stand-in for analyze_answer when the analysis deadline is near: the same
+    completeness, vocabulary level and VADER sentiment, without the spaCy parse
+    behind key topics (relevance is left at its floor).
+    """
+    if not text:
+        return analyze_answer(text, question)
+    word_count = len(text.split())
+    analyzer = get_vader_analyzer()
+    sentiment = (analyzer.polarity_scores(text)['compound'] + 1) * 50 if analyzer else 50.0
+    vocab_scores = {"basic": 50, "intermediate": 75, "advanced": 95}
+    return {
+        "relevance_score": 40.0,
+        "grammar_score": 85.0,
+        "vocabulary_score": vocab_scores.get(get_vocabulary_level(text), 50),
+        "sentiment": round(sentiment, 2),
+        "completeness": round(min(100.0, (word_count / 150.0) * 100), 2),
+        "key_points_covered": []
+    }
+
 def get_vocabulary_level(text: str) -> str:
     """Classifies vocabulary complexity based on unique word ratio and average word length."""
     words = [w.lower() for w in re.findall(r'\b\w+\b', text)]
@@ -86,9 +116,8 @@ def get_vocabulary_level(text: str) -> str:
 
 def extract_key_topics(text: str) -> list:
     """Extracts noun chunks and named entities as key topics."""
-    nlp = get_nlp_model()
-    if not nlp: return []
-    doc = nlp(text)
+    doc = parse_text(text)
+    if doc is None: return []
     
     topics = []
     for ent in doc.ents:
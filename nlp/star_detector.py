@@ -1,5 +1,30 @@
 import re
 
+STAR_COMPONENTS = ("situation", "task", "action", "result")
+
+# Heuristic indicator words for each section
+STAR_INDICATORS = {
+    "situation": ["when i was", "at my previous", "during my time", "context", "situation", "problem was", "issue was"],
+    "task": ["my role", "my objective", "my responsibility", "i had to", "goal was", "tasked with", "my task was"],
+    "action": ["i decided to", "i implemented", "i created", "i built", "i led", "i analyzed", "i resolved"],
+    "result": ["as a result", "consequently", "the outcome", "achieved", "increased by", "decreased by", "led to", "finally"]
+}
+
+# One alternation per component, matched as substrings of the lowercased text
+_INDICATOR_PATTERNS = {
+    comp: re.compile("|".join(re.escape(w) for w in words))
+    for comp, words in STAR_INDICATORS.items()
+}
+
+# Typical relative position range of each component in a well formed answer;
+# sentences outside the range are penalised by their distance to it
+_POSITION_PRIORS = ((0.0, 0.35), (0.1, 0.5), (0.25, 0.9), (0.6, 1.0))
+_PRIOR_WEIGHT = 3.0
+_LEXICON_WEIGHT = 1.5
+_SWITCH_PENALTY = 0.5
+
+_SENTENCE_RE = re.compile(r'[^.!?]+(?:[.!?]+|$)')
+
 def detect_star_components(text: str) -> dict:
     """
     Analyzes an answer to see if it follows the STAR framework 
@@ -8,14 +33,6 @@ def detect_star_components(text: str) -> dict:
     """
     text_lower = text.lower()
     
-    # Heuristic indicator words for each section
-    indicators = {
-        "situation": ["when i was", "at my previous", "during my time", "context", "situation", "problem was", "issue was"],
-        "task": ["my role", "my objective", "my responsibility", "i had to", "goal was", "tasked with", "my task was"],
-        "action": ["i decided to", "i implemented", "i created", "i built", "i led", "i analyzed", "i resolved"],
-        "result": ["as a result", "consequently", "the outcome", "achieved", "increased by", "decreased by", "led to", "finally"]
-    }
-    
     components = {
         "situation": False,
         "task": False,
@@ -23,8 +40,8 @@ def detect_star_components(text: str) -> dict:
         "result": False
     }
     
-    for comp, words in indicators.items():
-        if any(word in text_lower for word in words):
+    for comp, pattern in _INDICATOR_PATTERNS.items():
+        if pattern.search(text_lower):
             components[comp] = True
             
     # Special parsing for action: usually the longest chunk starting with "I"
@@ -41,21 +58,86 @@ def detect_star_components(text: str) -> dict:
         "star_score": score
     }
 
-def highlight_star_segments(text: str) -> dict:
+def split_sentences(text: str) -> list:
     """
-    Attempts to break the text into the 4 STAR components for highlighting in the UI.
-    Returns {'situation': '...', 'task': '...', 'action': '...', 'result': '...'}
+    Returns (start_char, end_char) spans of the sentences in text.
+    Uses the cached spaCy parse when available, otherwise punctuation boundaries.
     """
-    # Without an LLM, this relies on splitting the string roughly into 4 chunks based on heuristics.
-    # We will do a generic proportional split for demonstration, 
-    # assuming a well formed answer has 15% S, 15% T, 50% A, 20% R length-wise.
-    
-    words = text.split()
+    from nlp.engine import parse_text
+    doc = parse_text(text)
+    if doc is not None:
+        spans = [(s.start_char, s.end_char) for s in doc.sents]
+    else:
+        spans = [m.span() for m in _SENTENCE_RE.finditer(text)]
+    return [(a, b) for a, b in spans if text[a:b].strip()]
+
+def _distance_outside(position: float, bounds: tuple) -> float:
+    low, high = bounds
+    return max(0.0, low - position, position - high)
+
+def star_sentence_labels(text: str) -> list:
+    """
+    Labels each sentence of the answer with a STAR component.
+    Every sentence is scored per component from indicator hits plus a prior on its
+    position in the answer; a linear-time dynamic program then picks the best
+    labelling whose components appear in S -> T -> A -> R order (components may be skipped).
+    Returns a list of (start_char, end_char, component).
+    """
+    spans = split_sentences(text)
+    if not spans:
+        return []
+
+    lengths = [len(text[a:b].split()) for a, b in spans]
+    total = max(1, sum(lengths))
+
+    emissions = []
+    seen = 0
+    for (a, b), n_words in zip(spans, lengths):
+        position = (seen + n_words / 2) / total
+        seen += n_words
+        sentence = text[a:b].lower()
+        emissions.append([
+            _LEXICON_WEIGHT * min(2, len(_INDICATOR_PATTERNS[comp].findall(sentence)))
+            - _PRIOR_WEIGHT * _distance_outside(position, _POSITION_PRIORS[k])
+            for k, comp in enumerate(STAR_COMPONENTS)
+        ])
+
+    # best[k]: best score of a labelling of the sentences so far ending in component k.
+    # Labels can only stay or move forward, so a running prefix max over the
+    # earlier components suffices; moving forward costs _SWITCH_PENALTY and on
+    # ties the switch is deferred to the latest sentence.
+    n_states = len(STAR_COMPONENTS)
+    best = list(emissions[0])
+    back = []
+    for emission in emissions[1:]:
+        pointers = []
+        new_best = []
+        arg = None
+        for k in range(n_states):
+            stay = best[k]
+            if arg is not None and best[arg] - _SWITCH_PENALTY >= stay:
+                pointers.append(arg)
+                new_best.append(best[arg] - _SWITCH_PENALTY + emission[k])
+            else:
+                pointers.append(k)
+                new_best.append(stay + emission[k])
+            if arg is None or best[k] > best[arg]:
+                arg = k
+        back.append(pointers)
+        best = new_best
+
+    state = max(range(n_states), key=lambda k: best[k])
+    labels = [state]
+    for pointers in reversed(back):
+        state = pointers[state]
+        labels.append(state)
+    labels.reverse()
+
+    return [(a, b, STAR_COMPONENTS[k]) for (a, b), k in zip(spans, labels)]
+
+def _proportional_split(words: list) -> dict:
+    # Assumes a well formed answer has 15% S, 15% T, 50% A, 20% R length-wise.
     total = len(words)
-    
-    if total < 20: # Too short to properly divide
-        return {"situation": "", "task": "", "action": text, "result": ""}
-        
     s_idx = int(total * 0.15)
     t_idx = s_idx + int(total * 0.15)
     a_idx = t_idx + int(total * 0.50)
@@ -67,6 +149,26 @@ def highlight_star_segments(text: str) -> dict:
         "result": " ".join(words[a_idx:])
     }
 
+def highlight_star_segments(text: str) -> dict:
+    """
+    Breaks the text into the 4 STAR components for highlighting in the UI.
+    Returns {'situation': '...', 'task': '...', 'action': '...', 'result': '...'}
+    """
+    words = text.split()
+    
+    if len(words) < 20: # Too short to properly divide
+        return {"situation": "", "task": "", "action": text, "result": ""}
+
+    labelled = star_sentence_labels(text)
+    if len(labelled) < 2:
+        # A single run-on sentence has no boundaries to segment on
+        return _proportional_split(words)
+
+    segments = {comp: [] for comp in STAR_COMPONENTS}
+    for a, b, comp in labelled:
+        segments[comp].append(text[a:b].strip())
+    return {comp: " ".join(parts) for comp, parts in segments.items()}
+
 def get_star_feedback(star_dict: dict) -> str:
     """
     Generates a coaching tip based on missing STAR components.
@@ -2,7 +2,8 @@ import streamlit as st
 import cv2
 from utils.controller import start_interview
 from utils.interviewer import get_questions_for_role
-from vision.tracker import initialize_camera, get_frame, detect_face, release_camera
+from vision.tracker import detect_face
+from vision.camera import CameraStream
 
 st.set_page_config(page_title="Interview Setup", layout="wide")
 
@@ -37,21 +38,18 @@ with col2:
         if st.button("Test Camera", use_container_width=True):
             placeholder = st.empty()
             try:
-                cap = initialize_camera(0)
-                # Read just 10 frames to test
-                frame_found = False
-                for _ in range(10):
-                    frame = get_frame(cap)
-                    if frame is not None:
-                        frame_found = True
+                with CameraStream(0) as cam:
+                    # Wait up to 2 seconds for the first fresh frame
+                    frame = cam.read(timeout=2.0)
+                    frame_found = frame is not None
+                    if frame_found:
+                        frame = frame.copy()
                         res = detect_face(frame)
                         if res:
                             x, y, w, h = res["bbox"]
                             cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
                         # Convert BGR to RGB for stream
                         placeholder.image(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), channels="RGB", use_container_width=True)
-                        break
-                release_camera(cap)
                 if frame_found:
                     st.success("Camera working correctly.")
                 else:
@@ -7,6 +7,7 @@ import cv2
 import numpy as np
 from datetime import datetime
 from utils.controller import get_current_question, next_question, end_interview
+from utils.config import DEBUG
 
 st.set_page_config(page_title="Live Interview", layout="wide")
 
@@ -23,9 +24,19 @@ from audio_recorder_streamlit import audio_recorder
 import speech_recognition as sr
 
 # Import vision modules (fault-tolerant)
-from vision.emotion_detector import analyze_frame, DEEPFACE_AVAILABLE
-from vision.gaze_estimator import estimate_gaze
-from vision.tracker import detect_face, detect_posture
+from vision.emotion_detector import analyze_face_crop, get_emotion_cache_stats, DEEPFACE_AVAILABLE
+from vision.frame_analyzer import analyze_vision_frame
+from vision.tracker import release_vision_session
+from vision.gaze_estimator import GazeAccumulator
+
+# Load models once per server process (no-op on later reruns)
+from utils.st_resources import warmup_models
+# The near-duplicate answer index is built from every stored transcript, so it is
+# loaded here rather than on the script thread when the interview ends
+if cand_info.get("enable_vision", False):
+    warmup_models(("spacy", "vader", "answer_index", "holistic", "emotion_model"))
+else:
+    warmup_models(("spacy", "vader", "answer_index"))
 
 st.title("🎙️ Live Interview Session")
 
@@ -68,39 +79,33 @@ with col_video:
             frame = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
             
             if frame is not None:
-                # ── Face Detection ──
-                face_data = detect_face(frame)
+                # ── Face, Gaze & Posture (single MediaPipe pass) ──
+                vision_result = analyze_vision_frame(frame, session_key=st.session_state.get("vision_session"))
                 
                 emotion_result = {"emotion": "neutral", "confidence": 0}
                 gaze_direction = "unknown"
                 posture_status = "unknown"
                 
-                if face_data:
-                    # ── Emotion Analysis ──
-                    emotion_result = analyze_frame(frame)
+                if vision_result.has_face:
+                    # ── Emotion Analysis (reuses the face mesh box, no second detection) ──
+                    emotion_result = analyze_face_crop(frame, vision_result.bbox, vision_result.face)
                     
-                    # ── Gaze / Eye Contact ──
-                    gaze_direction = estimate_gaze(frame, face_data["landmarks"])
-                    
-                    # ── Posture ──
-                    posture_status = detect_posture(frame)
+                    gaze_direction = vision_result.gaze
+                    posture_status = vision_result.posture
                     
                     # Store in session state for scoring later
-                    st.session_state.emotions_timeline.append({
-                        "timestamp": elapsed,
-                        "emotion": emotion_result["emotion"],
-                        "confidence": emotion_result["confidence"]
-                    })
-                    
-                    # Track eye contact
-                    if 'gaze_log' not in st.session_state:
-                        st.session_state.gaze_log = []
-                    st.session_state.gaze_log.append(gaze_direction)
+                    st.session_state.emotions_timeline.append(
+                        elapsed, emotion_result["emotion"], emotion_result["confidence"],
+                        emotion_result.get("all_scores")
+                    )
                     
-                    # Calculate eye contact percentage
-                    direct_count = sum(1 for g in st.session_state.gaze_log if g == "direct")
-                    total_gaze = len(st.session_state.gaze_log)
-                    eye_contact_pct = round((direct_count / max(1, total_gaze)) * 100, 1)
+                    # Track eye contact with running counts (constant time per snapshot);
+                    # the accumulator lives in session_state and is updated in place
+                    if st.session_state.get("gaze_acc") is None:
+                        st.session_state.gaze_acc = GazeAccumulator()
+                    gaze_acc = st.session_state.gaze_acc
+                    gaze_acc.update(gaze_direction, vision_result.iris_ratios, timestamp=elapsed)
+                    eye_contact_pct = round(gaze_acc.eye_contact_percent, 1)
                     
                     # Store for scoring
                     st.session_state.candidate_info["eye_contact_percent"] = eye_contact_pct
@@ -122,14 +127,16 @@ with col_video:
                 posture_icon = "🧍" if posture_status == "upright" else "😔"
                 r3.metric(f"{posture_icon} Posture", posture_status.title())
                 
-                if 'gaze_log' in st.session_state and st.session_state.gaze_log:
-                    direct_count = sum(1 for g in st.session_state.gaze_log if g == "direct")
-                    eye_pct = round((direct_count / len(st.session_state.gaze_log)) * 100, 1)
+                if st.session_state.get("gaze_acc") is not None:
+                    eye_pct = round(st.session_state.gaze_acc.eye_contact_percent, 1)
                     r4.metric("👁️ Eye Contact %", f"{eye_pct}%")
                 
                 # Stress warning
                 if emo_label in ["fear", "angry"] and emo_conf > 50:
                     st.error("⚠️ Elevated stress detected. Take a deep breath and compose yourself.")
+                
+                if DEBUG:
+                    st.caption(f"Emotion cache: {get_emotion_cache_stats()}")
         else:
             st.caption("📷 Click 'Take a snapshot' above to capture and analyze your expression.")
     else:
@@ -214,6 +221,8 @@ if c1.button("➡️ Next Question", use_container_width=True, disabled=(q_idx >
 
 if c2.button("🛑 End Interview", type="primary", use_container_width=True):
     end_interview()
+    if enable_vision:
+        release_vision_session(st.session_state.get("vision_session"))
     st.switch_page("pages/03_analytics.py")
 
 # ── Coach Tips (optional) ─────────────────────────────────────────────
@@ -1,13 +1,35 @@
+import html
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-from utils.db import get_session_by_id, get_all_sessions
+from utils.db import get_session_by_id, get_all_sessions, load_question_features
 from nlp.engine import analyze_answer, get_answer_sentiment_arc, generate_word_cloud_data
-from nlp.star_detector import detect_star_components, get_star_feedback
+from nlp.star_detector import detect_star_components, get_star_feedback, highlight_star_segments
+from vision.emotion_timeline import EmotionTimeline
+from utils.config import EMOTION_LABELS
+from scoring.percentiles import get_percentile_index
+from scoring.rubric import get_scoring_plan
+from nlp.duplicate_detector import get_answer_index
+from utils.alignment import TimelineAlignment
 
 st.set_page_config(page_title="Analytics Dashboard", layout="wide")
 
+@st.cache_data(show_spinner=False, max_entries=4)
+def analyze_uploaded_video(digest: str, suffix: str, _data: bytes) -> dict:
+    """Video analysis of an upload, memoized on its content hash so reruns reuse it."""
+    import os
+    import tempfile
+    from vision.video_pipeline import analyze_video
+    from utils.config import VIDEO_ANALYSIS_WORKERS
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp_video:
+        tmp_video.write(_data)
+        video_path = tmp_video.name
+    try:
+        return analyze_video(video_path, sample_fps=1.0, workers=VIDEO_ANALYSIS_WORKERS)
+    finally:
+        os.unlink(video_path)
+
 st.title("📊 Analytics & Feedback")
 
 # Pick session
@@ -50,6 +72,23 @@ with tab1:
     m2.metric("📋 Grade", grade)
     m3.metric("👤 Candidate", cand.get('name', 'N/A'))
     m4.metric("💼 Role", cand.get('role', 'N/A'))
+
+    # Features computed by a cheaper fallback because analysis ran out of time
+    stored = load_question_features([session_id_to_load])
+    degraded = sorted({f for row in stored.get("degraded", []) for f in row})
+    if degraded:
+        st.info("Scored under the analysis deadline; estimated with fallbacks and down-weighted: "
+                + ", ".join(f.replace('_', ' ') for f in degraded))
+    
+    # Where this session stands among others for the same role
+    percentile_index = get_percentile_index()
+    pct = percentile_index.session_percentiles(session_id_to_load)
+    if pct:
+        peers = percentile_index.peers(cand.get('role', ''))
+        st.caption(f"Compared with {peers} session(s) for this role")
+        p_cols = st.columns(len(pct))
+        for col, (dim, value) in zip(p_cols, pct.items()):
+            col.metric(f"{dim.replace('_', ' ').title()} Percentile", f"{value:.0f}th")
     
     st.markdown("---")
     
@@ -78,6 +117,12 @@ with tab1:
                 margin=dict(l=60, r=60, t=30, b=30)
             )
             st.plotly_chart(fig_radar, use_container_width=True)
+
+            # Gap to the role's benchmark scores (compiled scoring plan)
+            gaps = get_scoring_plan(cand.get('role', '')).benchmark_gaps(bd)
+            if gaps:
+                st.caption("Vs. role benchmark: " + ", ".join(
+                    f"{dim.replace('_', ' ').title()} {gap:+.1f}" for dim, gap in gaps.items()))
         else:
             st.warning("No breakdown data available.")
     
@@ -100,6 +145,34 @@ with tab1:
             )
             st.plotly_chart(fig_bar, use_container_width=True)
     
+    # STAR structure of each answer
+    st.markdown("---")
+    st.subheader("Answer Structure (STAR)")
+    answered = [q for q in questions if (q.get("transcript") or "").strip()]
+    if answered:
+        star_colors = {"situation": "#E3F2FD", "task": "#FFF3E0", "action": "#E8F5E9", "result": "#F3E5F5"}
+        answer_index = get_answer_index()
+        for i, q in enumerate(answered, start=1):
+            with st.expander(f"Q{i}: {q.get('text', '')}"):
+                segments = highlight_star_segments(q["transcript"])
+                for comp, seg in segments.items():
+                    if seg:
+                        st.markdown(
+                            f"<div style='background:{star_colors[comp]};padding:6px;border-radius:4px;margin-bottom:4px'>"
+                            f"<b>{comp.capitalize()}:</b> {html.escape(seg)}</div>",
+                            unsafe_allow_html=True
+                        )
+                st.caption(get_star_feedback(detect_star_components(q["transcript"])))
+                matches = answer_index.query(q["transcript"], exclude_session=session_id_to_load)
+                if matches:
+                    sources = ", ".join(
+                        f"template '{m['template']}'" if m["session_id"] is None else f"session {m['session_id']}"
+                        for m in matches[:3]
+                    )
+                    st.warning(f"Near-duplicate answer ({matches[0]['similarity']:.0%} similar) of {sources}")
+    else:
+        st.info("No answer transcripts recorded for this session.")
+    
 # ──────────────────────────────────────────────────────────────────────
 # TAB 2: EMOTION & VOICE
 # ──────────────────────────────────────────────────────────────────────
@@ -108,12 +181,16 @@ with tab2:
     
     # Query emotion logs from DB session (stored as list of dicts)
     # For a fresh session, we use session_state data
-    emotions = []
+    emotions = EmotionTimeline()
     if 'emotions_timeline' in st.session_state and st.session_state.emotions_timeline:
-        emotions = st.session_state.emotions_timeline
+        emotions = EmotionTimeline.coerce(st.session_state.emotions_timeline)
     
     if emotions:
-        df_emo = pd.DataFrame(emotions)
+        df_emo = pd.DataFrame({
+            "timestamp": emotions.timestamps,
+            "emotion": [EMOTION_LABELS[c] for c in emotions.codes],
+            "confidence": emotions.intensities
+        })
         
         col_line, col_pie = st.columns([2, 1])
         
@@ -133,6 +210,29 @@ with tab2:
             st.plotly_chart(fig_pie, use_container_width=True)
     else:
         st.info("No live emotion data was captured in this session. Enable video analysis during setup to track emotions in real-time.")
+
+    # Emotion, stress and gaze per question, joined on the interview clock
+    live_questions = st.session_state.get("questions", [])
+    if emotions and any(q.get("start_offset") is not None for q in live_questions):
+        gaze_acc = st.session_state.get("gaze_acc")
+        gaze_samples = gaze_acc.timed_samples() if gaze_acc is not None else []
+        alignment = TimelineAlignment(live_questions, emotions=emotions, gaze=gaze_samples)
+        rows = []
+        for i, q in enumerate(live_questions):
+            if q.get("start_offset") is None:
+                continue
+            summary = alignment.question_summary(i)
+            result_emotions = alignment.section_summary(i, "result")["emotions"]
+            gaze_total = sum(summary["gaze"].values())
+            rows.append({
+                "Question": f"Q{i + 1}",
+                "Dominant Emotion": max(summary["emotions"], key=summary["emotions"].get) if summary["emotions"] else "-",
+                "Stress Samples": summary["stress_count"],
+                "Eye Contact %": round(summary["gaze"].get("direct", 0) / gaze_total * 100, 1) if gaze_total else None,
+                "Emotion in Result": max(result_emotions, key=result_emotions.get) if result_emotions else "-"
+            })
+        st.subheader("Per-Question Breakdown")
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
     
     st.markdown("---")
     st.subheader("Eye Contact & Posture Summary")
@@ -171,7 +271,7 @@ with tab2:
         st.plotly_chart(fig_pos, use_container_width=True)
     
     with stress_col:
-        stress_count = sum(1 for e in emotions if e.get('emotion') in ['fear', 'angry', 'disgust']) if emotions else 0
+        stress_count = emotions.stress_count()
         stress_idx = min(100, stress_count * 15)
         fig_stress = go.Figure(go.Indicator(
             mode="gauge+number",
@@ -186,3 +286,24 @@ with tab2:
         fig_stress.update_layout(height=250, margin=dict(l=20, r=20, t=40, b=20))
         st.plotly_chart(fig_stress, use_container_width=True)
 
+    # ── Recorded video upload ──
+    st.markdown("---")
+    st.subheader("Analyze a Recorded Interview")
+    video_file = st.file_uploader("Upload an interview video", type=["mp4", "avi", "mov", "mkv"])
+    if video_file is not None:
+        import hashlib
+        import os
+        data = video_file.getvalue()
+        with st.spinner("Analyzing video..."):
+            video_result = analyze_uploaded_video(hashlib.sha256(data).hexdigest(),
+                                                  os.path.splitext(video_file.name)[1], data)
+        v1, v2, v3 = st.columns(3)
+        v1.metric("Frames Analyzed", video_result["frames_analyzed"])
+        v2.metric("Eye Contact %", f"{video_result['eye_contact_percent']}%")
+        v3.metric("Posture", video_result["posture_summary"].title())
+        if video_result["emotion_timeline"]:
+            df_video = pd.DataFrame(video_result["emotion_timeline"])
+            fig_video = px.line(df_video, x="timestamp", y="confidence", color="emotion",
+                                title="Emotion Intensity Over Time (Video)",
+                                color_discrete_sequence=px.colors.qualitative.Set2)
+            st.plotly_chart(fig_video, use_container_width=True)
@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 from utils.db import get_all_sessions, delete_session
 from utils.report_gen import generate_report
+from scoring.percentiles import get_percentile_index
+from scoring.similarity import get_similarity_index
 
 st.set_page_config(page_title="Candidate History", layout="wide")
 
@@ -16,6 +18,10 @@ if not sessions:
 # Convert to DataFrame for easy filtering and rendering
 df = pd.DataFrame(sessions)
 
+# Standing among sessions for the same role (O(log n) lookup per session)
+percentile_index = get_percentile_index()
+df['percentile'] = [percentile_index.session_percentiles(sid).get('overall_score') for sid in df['id']]
+
 # Sidebar Filters
 st.sidebar.header("Filter History")
 filter_role = st.sidebar.multiselect("Role", options=df['role'].unique(), default=df['role'].unique())
@@ -25,9 +31,10 @@ filtered_df = df[(df['role'].isin(filter_role)) & (df['grade'].isin(filter_grade
 
 st.subheader("Previous Sessions")
 st.dataframe(
-    filtered_df[['id', 'candidate_name', 'role', 'date', 'score', 'grade']],
+    filtered_df[['id', 'candidate_name', 'role', 'date', 'score', 'grade', 'percentile']],
     use_container_width=True,
-    hide_index=True
+    hide_index=True,
+    column_config={"percentile": st.column_config.NumberColumn("Role Percentile", format="%.1f")}
 )
 
 st.markdown("---")
@@ -35,6 +42,18 @@ st.markdown("---")
 st.subheader("Actions")
 selected_id = st.selectbox("Select Session ID for Action", options=filtered_df['id'].tolist())
 
+# Candidates with the closest score and feature profile to the selected session
+neighbours = get_similarity_index().similar_sessions(selected_id, k=5) if selected_id is not None else []
+if neighbours:
+    similar_df = pd.DataFrame(neighbours, columns=['id', 'distance']).merge(df, on='id')
+    with st.expander(f"Similar candidates to session {selected_id}"):
+        st.dataframe(
+            similar_df[['id', 'candidate_name', 'role', 'score', 'grade', 'distance']],
+            use_container_width=True,
+            hide_index=True,
+            column_config={"distance": st.column_config.NumberColumn("Profile Distance", format="%.1f")}
+        )
+
 c1, c2, c3 = st.columns(3)
 
 if c1.button("View Analytics", use_container_width=True):
@@ -0,0 +1,280 @@
+from vision.emotion_timeline import EmotionTimeline
+from scoring.fusion import DEGRADABLE_FEATURES, weighted_blend
+
+# Raw per-question features persisted in the question_features table
+QUESTION_FEATURES = [
+    "word_count", "vocabulary_score", "completeness", "sentiment",
+    "star_score", "keyword_coverage_percent"
+]
+
+# Features lost when a stage settles on its placeholder default (its fallback
+# failed or it has none). The NLP and STAR fallbacks compute the same scored
+# features as the full stages, and a missing NLP result is marked at the join
+_STAGE_DEGRADES = {
+    "star": ("star_score",),
+    "kw": ("keyword_coverage_percent",)
+}
+
+
+def _keyword_coverage(transcript: str, jd_keywords: list = None, plan=None):
+    """Coverage of the JD keywords, else of the role plan's keywords, else the neutral 50."""
+    from nlp.keyword_matcher import match_answer_to_jd
+    if jd_keywords:
+        return match_answer_to_jd(transcript, jd_keywords)
+    if plan is not None and plan.keywords:
+        return plan.keyword_coverage(transcript)
+    return 50
+
+
+def extract_question_features(transcript: str, question_text: str, jd_keywords: list = None,
+                              plan=None) -> dict:
+    """
+    Runs the NLP, STAR and keyword models on one answer.
+    Returns the raw features scoring is computed from (schema FEATURE_SCHEMA_VERSION),
+    with 'answered' False and no model features for an empty transcript.
+    Without JD keywords, keyword coverage uses the role's ScoringPlan when given.
+    """
+    from nlp.engine import analyze_answer
+    from nlp.star_detector import detect_star_components
+
+    transcript = transcript or ""
+    if not transcript.strip():
+        return {"answered": False, "word_count": 0}
+
+    nlp_result = analyze_answer(transcript, question_text)
+    star_result = detect_star_components(transcript)
+    # Keyword matching against the JD if one was provided, else the role keywords
+    kw_coverage = _keyword_coverage(transcript, jd_keywords, plan)
+
+    return {
+        "answered": True,
+        "word_count": len(transcript.split()),
+        "vocabulary_score": nlp_result["vocabulary_score"],
+        "completeness": nlp_result["completeness"],
+        "sentiment": nlp_result["sentiment"],
+        "star_score": star_result["star_score"],
+        "keyword_coverage_percent": kw_coverage,
+        "degraded": []
+    }
+
+
+def extract_question_features_fast(transcript: str, question_text: str, jd_keywords: list = None,
+                                   plan=None) -> dict:
+    """
+    Deadline fallback of extract_question_features: STAR and keyword matching as usual
+    but the cheap NLP estimator (no spaCy parse). The scored features are the same,
+    so nothing is marked degraded.
+    """
+    from nlp.engine import analyze_answer_fast
+    from nlp.star_detector import detect_star_components
+
+    transcript = transcript or ""
+    if not transcript.strip():
+        return {"answered": False, "word_count": 0}
+    nlp_result = analyze_answer_fast(transcript, question_text)
+    kw_coverage = _keyword_coverage(transcript, jd_keywords, plan)
+    return _merge_question_features(transcript, nlp_result, detect_star_components(transcript), kw_coverage)
+
+
+def _merge_question_features(transcript: str, nlp_result, star_result, kw_coverage, emotion_window=None) -> dict:
+    """Join stage of one question; a failed NLP stage falls back to neutral scores."""
+    word_count = len(transcript.split())
+    degraded = set()
+    if nlp_result is None:
+        nlp_result = {"vocabulary_score": 50, "completeness": min(100.0, (word_count / 150.0) * 100), "sentiment": 50.0}
+        degraded.update(("vocabulary_score", "sentiment"))
+    features = {
+        "answered": True,
+        "word_count": word_count,
+        "vocabulary_score": nlp_result["vocabulary_score"],
+        "completeness": nlp_result["completeness"],
+        "sentiment": nlp_result["sentiment"],
+        "star_score": star_result["star_score"],
+        "keyword_coverage_percent": kw_coverage,
+        "degraded": sorted(degraded)
+    }
+    if emotion_window is not None:
+        features.update(emotion_window)
+    return features
+
+
+def extract_features_batch(questions: list, jd_keywords: list = None, timeline=None,
+                           thread_pool=None, process_pool=None, stage_timeout: float = None,
+                           deadline: float = None, plan=None) -> list:
+    """
+    Extracts the features of several answers at once with a StageGraph.
+    questions is a list of dicts with 'answer_transcript', 'text' and optionally
+    'start_offset'/'end_offset'. For every answered question the NLP stage runs on
+    the thread pool, STAR and keyword matching (pure Python) on the process pool and
+    the emotion window (with a timeline) inline; one join per question and a final
+    join collect the results. Returns one feature dict per question, in order.
+    With a deadline (seconds), stages that no longer fit ANALYSIS_STAGE_BUDGETS or
+    overrun it use their cheaper estimator; features left on a placeholder are
+    listed in each question's 'degraded'. Without JD keywords, keyword coverage uses the
+    role's ScoringPlan (inline, its compiled regex is cheap) when given.
+    """
+    from utils.config import ANALYSIS_STAGE_BUDGETS
+    from utils.dag import StageGraph
+    if deadline is not None and deadline <= 0:
+        deadline = None  # ANALYSIS_DEADLINE=0 disables the deadline
+    from nlp.engine import analyze_answer, analyze_answer_fast
+    from nlp.star_detector import detect_star_components
+    from nlp.keyword_matcher import match_answer_to_jd
+
+    graph = StageGraph()
+    joins = []
+    for i, q in enumerate(questions):
+        transcript = q.get("answer_transcript") or ""
+        if not transcript.strip():
+            graph.add(f"q{i}", dict, args=({"answered": False, "word_count": 0},), executor="inline")
+            joins.append(f"q{i}")
+            continue
+        graph.add(f"nlp_{i}", analyze_answer, args=(transcript, q.get("text", "")),
+                  executor="thread", timeout=stage_timeout, fallback=analyze_answer_fast,
+                  budget=ANALYSIS_STAGE_BUDGETS.get("nlp"))
+        graph.add(f"star_{i}", detect_star_components, args=(transcript,),
+                  executor="process", timeout=stage_timeout, default={"star_score": 0.0},
+                  fallback=detect_star_components, budget=ANALYSIS_STAGE_BUDGETS.get("star"))
+        if jd_keywords:
+            graph.add(f"kw_{i}", match_answer_to_jd, args=(transcript, jd_keywords),
+                      executor="process", timeout=stage_timeout, default=50,
+                      budget=ANALYSIS_STAGE_BUDGETS.get("keywords"))
+        else:
+            graph.add(f"kw_{i}", _keyword_coverage, args=(transcript, None, plan), executor="inline")
+        deps = [f"nlp_{i}", f"star_{i}", f"kw_{i}"]
+        if timeline is not None:
+            graph.add(f"emotion_{i}", window_emotions, args=(timeline, q.get("start_offset"), q.get("end_offset")),
+                      executor="inline")
+            deps.append(f"emotion_{i}")
+        graph.add(f"q{i}", _merge_question_features, args=(transcript,), deps=tuple(deps), executor="inline",
+                  default={"answered": False, "word_count": 0})
+        joins.append(f"q{i}")
+
+    graph.add("features", lambda *rows: list(rows), deps=tuple(joins), executor="inline")
+    features = graph.run(thread_pool, process_pool, deadline=deadline)["features"]
+    for name in graph.defaulted:
+        stage, _, i = name.rpartition("_")
+        if stage not in _STAGE_DEGRADES:
+            continue  # joins, or stages whose loss _merge_question_features already marks
+        f = features[int(i)]
+        if f.get("answered"):
+            f["degraded"] = sorted(set(f.get("degraded", ())) | set(_STAGE_DEGRADES[stage]))
+    return features
+
+
+def question_score(features: dict) -> float:
+    """Per-question score: weighted combo of the stored NLP features."""
+    if not features.get("answered"):
+        return 0.0
+    q_score = (
+        features["vocabulary_score"] * 0.2 +
+        features["completeness"] * 0.2 +
+        features["sentiment"] * 0.15 +
+        features["star_score"] * 0.25 +
+        features["keyword_coverage_percent"] * 0.2
+    )
+    return round(min(100, max(0, q_score)), 1)
+
+
+def window_emotions(timeline, start: float, end: float = None) -> dict:
+    """Emotion label counts and stress count of the samples in [start, end) seconds."""
+    if start is None:
+        return {"emotion_counts": {}, "stress_count": 0}
+    window = EmotionTimeline.coerce(timeline).window(start, end)
+    return {"emotion_counts": window.counts(), "stress_count": window.stress_count()}
+
+
+_TOTAL_KEYS = ("vocabulary_score", "completeness", "sentiment", "star_score", "keyword_coverage_percent", "word_count")
+
+
+def new_fusion_totals() -> dict:
+    """Running sums and answered-question count that fusion averages are taken from."""
+    totals = {k: 0 for k in _TOTAL_KEYS}
+    totals["answered"] = 0
+    totals["duplicate_similarity"] = 0.0  # Best near-duplicate match of any answer
+    totals["degraded"] = {f: 0 for f in DEGRADABLE_FEATURES}  # Answers scored without the full model
+    totals["degraded_sums"] = {f: 0 for f in DEGRADABLE_FEATURES}  # ... and their placeholder values
+    return totals
+
+
+def add_question_totals(totals: dict, features: dict) -> dict:
+    """Folds one question's features into the running totals (unanswered questions are skipped)."""
+    if features.get("answered"):
+        for k in _TOTAL_KEYS:
+            totals[k] += features[k]
+        totals["answered"] += 1
+        totals["duplicate_similarity"] = max(totals["duplicate_similarity"], features.get("duplicate_similarity") or 0.0)
+        for f in features.get("degraded", ()):
+            totals["degraded"][f] += 1
+            totals["degraded_sums"][f] += features[f]
+    return totals
+
+
+def fusion_inputs_from_totals(totals: dict, duration_secs: float, emotion_summary: dict,
+                              stress_count: int, eye_contact_pct: float, posture: str) -> tuple:
+    """
+    Turns running totals plus session-level vision data into the (audio, vision, nlp)
+    inputs of fuse_scores. Returns (audio, vision, nlp, answered_count).
+    """
+    scored_count = totals["answered"]
+
+    # Compute averages for fusion; a degradable feature is averaged over the answers
+    # the full model scored it for, so fallback placeholders do not bias it (only
+    # when no answer has it computed does the placeholder average stand in)
+    n = max(1, scored_count)
+    degraded = totals.get("degraded", {})
+    degraded_sums = totals.get("degraded_sums", {})
+
+    def average(feature):
+        computed = scored_count - degraded.get(feature, 0)
+        if computed > 0:
+            return (totals[feature] - degraded_sums.get(feature, 0)) / computed
+        return totals[feature] / n
+
+    avg_vocab = average("vocabulary_score")
+    avg_completeness = average("completeness")
+    avg_sentiment = average("sentiment")
+    avg_star = average("star_score")
+    avg_kw = average("keyword_coverage_percent")
+    # Share of answers each feature was fully computed for
+    availability = {f: 1.0 - c / n for f, c in degraded.items()}
+
+    # Estimate WPM from total words and interview duration
+    estimated_wpm = (totals["word_count"] / max(1, duration_secs)) * 60
+
+    audio_data = {
+        "wpm": round(estimated_wpm),
+        "fillers": {},
+        "voice_confidence": round(min(100, weighted_blend([(avg_sentiment, 0.5, "sentiment"),
+                                                          (avg_completeness, 0.5, "completeness")],
+                                                         availability))),
+        "silence_ratio": 0.15 if scored_count > 0 else 0.9
+    }
+    vision_data = {
+        "eye_contact_percent": eye_contact_pct,
+        "posture": posture,
+        "emotion_summary": emotion_summary,
+        "stress_spikes": stress_count
+    }
+    nlp_data = {
+        "vocabulary_score": round(avg_vocab, 1),
+        "completeness": round(avg_completeness, 1),
+        "keyword_coverage_percent": round(avg_kw, 1),
+        "star_score": round(avg_star, 1),
+        "sentiment": round(avg_sentiment, 1),
+        "duplicate_similarity": totals.get("duplicate_similarity", 0.0),
+        "availability": availability
+    }
+    return audio_data, vision_data, nlp_data, scored_count
+
+
+def build_fusion_inputs(question_features: list, duration_secs: float, emotion_summary: dict,
+                        stress_count: int, eye_contact_pct: float, posture: str) -> tuple:
+    """
+    Aggregates stored per-question features and session-level vision data into the
+    (audio, vision, nlp) inputs of fuse_scores. Returns (audio, vision, nlp, answered_count).
+    """
+    totals = new_fusion_totals()
+    for f in question_features:
+        add_question_totals(totals, f)
+    return fusion_inputs_from_totals(totals, duration_secs, emotion_summary, stress_count, eye_contact_pct, posture)
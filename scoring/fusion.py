@@ -1,10 +1,89 @@
-from utils.config import SCORING_WEIGHTS
+import numpy as np
+import pandas as pd
+from utils.config import DUPLICATE_THRESHOLD
+from scoring.rubric import DIMENSIONS, as_scoring_plan, get_grade, get_scoring_plan, role_key
 
-def fuse_scores(audio_scores: dict, vision_scores: dict, nlp_scores: dict, rubric: dict) -> dict:
+# Flat per-session inputs of fuse_scores_batch, with fuse_scores' defaults
+FUSION_FEATURES = {
+    "vocabulary_score": 60,
+    "wpm": 140,
+    "filler_count": 0,
+    "voice_confidence": 65,
+    "eye_contact_percent": 70,
+    "posture": "",
+    "keyword_coverage_percent": 50,
+    "star_score": 40,
+    "completeness": 50,
+    "sentiment": 55,
+    "happy_count": 0,
+    "emotion_total": 0,
+    "emotion_labels": 0,
+    "silence_ratio": 0.2,
+    "stress_spikes": 0,
+    "duplicate_similarity": 0.0
+}
+# Model features that can be degraded under the analysis deadline; their
+# availability (share of answers the full model scored, 0-1) is a fusion input
+DEGRADABLE_FEATURES = ("vocabulary_score", "completeness", "sentiment", "star_score", "keyword_coverage_percent")
+FUSION_FEATURES.update({f"{f}_availability": 1.0 for f in DEGRADABLE_FEATURES})
+
+def _duplicate_penalty(similarity):
+    """0 below DUPLICATE_THRESHOLD, rising linearly to 20 for an exact copy (scalar or array)."""
+    return np.minimum(20.0, np.maximum(0.0, similarity - DUPLICATE_THRESHOLD) / (1 - DUPLICATE_THRESHOLD) * 20)
+
+def weighted_blend(terms: list, availability: dict) -> float:
+    """
+    Weighted sum of (value, weight, feature) terms. A feature the full model only
+    scored for part of the answers (availability < 1) counts proportionally less
+    and the remaining weights are scaled back up to the same total. With every
+    feature available this is exactly the plain weighted sum.
+    """
+    plain = 0.0
+    for value, weight, _ in terms:
+        plain = plain + value * weight
+    avail = [1.0 if f is None else availability.get(f, 1.0) for _, _, f in terms]
+    if all(a >= 1.0 for a in avail):
+        return plain
+    total = kept = weighted = 0.0
+    for (value, weight, _), a in zip(terms, avail):
+        weighted = weighted + value * (weight * a)
+        kept = kept + weight * a
+        total = total + weight
+    return weighted / kept * total if kept > 0 else plain
+
+def _blend_batch(terms: list, availability) -> np.ndarray:
+    """Columnar weighted_blend; availability(feature) returns that feature's availability column."""
+    plain = 0.0
+    for value, weight, _ in terms:
+        plain = plain + value * weight
+    avail = [None if f is None else availability(f) for _, _, f in terms]
+    degraded = np.zeros(np.shape(plain), dtype=bool)
+    for a in avail:
+        if a is not None:
+            degraded |= a < 1.0
+    if not degraded.any():
+        return plain
+    total = kept = weighted = 0.0
+    for (value, weight, _), a in zip(terms, avail):
+        a = 1.0 if a is None else a
+        weighted = weighted + value * (weight * a)
+        kept = kept + weight * a
+        total = total + weight
+    with np.errstate(divide="ignore", invalid="ignore"):
+        blended = weighted / kept * total
+    return np.where(degraded & (kept > 0), blended, plain)
+
+def fuse_scores(audio_scores: dict, vision_scores: dict, nlp_scores: dict, rubric) -> dict:
     """
     Fuses individual module scores into the final 6 dimensions.
-    Returns the fused breakdown + overall_score + grade.
+    rubric is the role's ScoringPlan (scoring.rubric.get_scoring_plan); a raw rubric
+    dict is compiled on the fly and an empty one means the default plan.
+    nlp_scores may carry 'availability' ({feature: 0-1}) for features that were
+    degraded under the analysis deadline; those are weighted down (see weighted_blend).
+    Returns the fused breakdown + overall_score + grade + degraded feature names.
     """
+    plan = as_scoring_plan(rubric)
+    availability = nlp_scores.get("availability", {})
     
     # 1. Communication (NLP vocab + Audio pacing balance)
     vocab = nlp_scores.get("vocabulary_score", 60)
@@ -17,7 +96,8 @@ def fuse_scores(audio_scores: dict, vision_scores: dict, nlp_scores: dict, rubri
     else:
         wpm_score = max(40, 100 - abs(140 - wpm) * 0.3)
     filler_penalty = min(15, sum(audio_scores.get("fillers", {}).values()) * 1.5)
-    communication = min(100.0, max(0.0, (vocab * 0.6 + wpm_score * 0.4) - filler_penalty))
+    communication = min(100.0, max(0.0, weighted_blend([(vocab, 0.6, "vocabulary_score"), (wpm_score, 0.4, None)],
+                                               availability) - filler_penalty))
 
     # 2. Confidence (Voice confidence + eye contact + posture)
     voice_conf = audio_scores.get("voice_confidence", 65)
@@ -29,17 +109,20 @@ def fuse_scores(audio_scores: dict, vision_scores: dict, nlp_scores: dict, rubri
     kw_coverage = nlp_scores.get("keyword_coverage_percent", 50)
     star_score = nlp_scores.get("star_score", 40)
     completeness = nlp_scores.get("completeness", 50)
-    technical = min(100.0, max(0.0, kw_coverage * 0.4 + star_score * 0.35 + completeness * 0.25))
+    # Answers that nearly copy another candidate's or a template answer lose up to 20 points
+    duplicate_penalty = float(_duplicate_penalty(nlp_scores.get("duplicate_similarity", 0.0)))
+    technical = min(100.0, max(0.0, weighted_blend([(kw_coverage, 0.4, "keyword_coverage_percent"), (star_score, 0.35, "star_score"),
+                                            (completeness, 0.25, "completeness")], availability) - duplicate_penalty))
 
     # 4. Emotional IQ (Sentiment + positive emotion presence)
     sentiment = nlp_scores.get("sentiment", 55)
     emotion_summary = vision_scores.get("emotion_summary", {})
     total_emotions = max(1, sum(emotion_summary.values()))
     happy_ratio = emotion_summary.get("happy", 0) / total_emotions * 100 if emotion_summary else 40
-    emotional_iq = min(100.0, max(0.0, sentiment * 0.6 + happy_ratio * 0.2 + 20))
+    emotional_iq = min(100.0, max(0.0, weighted_blend([(sentiment, 0.6, "sentiment"), (happy_ratio, 0.2, None)], availability) + 20))
 
     # 5. Engagement (Eye contact + completeness of answers)
-    engagement = min(100.0, max(0.0, eye_contact * 0.5 + completeness * 0.3 + 20))
+    engagement = min(100.0, max(0.0, weighted_blend([(eye_contact, 0.5, None), (completeness, 0.3, "completeness")], availability) + 20))
 
     # 6. Professionalism (Low silence + low stress + answer completeness)
     silence_ratio = audio_scores.get("silence_ratio", 0.2)
@@ -61,22 +144,149 @@ def fuse_scores(audio_scores: dict, vision_scores: dict, nlp_scores: dict, rubri
         "professionalism": round(professionalism, 1)
     }
 
-    # Calculate Overall using config weights
-    overall_score = sum(breakdown[k] * SCORING_WEIGHTS[k] for k in breakdown.keys())
+    # Calculate Overall using the plan's weights
+    overall_score = plan.overall(breakdown.values())
     
-    from scoring.rubric import get_grade
     return {
         "breakdown": breakdown,
         "overall_score": round(overall_score, 1),
-        "grade": get_grade(overall_score)
+        "grade": get_grade(overall_score),
+        "degraded": [f for f in DEGRADABLE_FEATURES if availability.get(f, 1.0) < 1.0]
+    }
+
+def fusion_features(audio_scores: dict, vision_scores: dict, nlp_scores: dict) -> dict:
+    """Flattens the three fuse_scores input dicts into one FUSION_FEATURES row."""
+    emotion_summary = vision_scores.get("emotion_summary", {})
+    availability = nlp_scores.get("availability", {})
+    return {
+        "vocabulary_score": nlp_scores.get("vocabulary_score", 60),
+        "wpm": audio_scores.get("wpm", 140),
+        "filler_count": sum(audio_scores.get("fillers", {}).values()),
+        "voice_confidence": audio_scores.get("voice_confidence", 65),
+        "eye_contact_percent": vision_scores.get("eye_contact_percent", 70),
+        "posture": vision_scores.get("posture") or "",
+        "keyword_coverage_percent": nlp_scores.get("keyword_coverage_percent", 50),
+        "star_score": nlp_scores.get("star_score", 40),
+        "completeness": nlp_scores.get("completeness", 50),
+        "sentiment": nlp_scores.get("sentiment", 55),
+        "happy_count": emotion_summary.get("happy", 0),
+        "emotion_total": sum(emotion_summary.values()),
+        "emotion_labels": len(emotion_summary),
+        "silence_ratio": audio_scores.get("silence_ratio", 0.2),
+        "stress_spikes": vision_scores.get("stress_spikes", 0),
+        "duplicate_similarity": nlp_scores.get("duplicate_similarity", 0.0),
+        **{f"{f}_availability": availability.get(f, 1.0) for f in DEGRADABLE_FEATURES}
     }
 
-def detect_authenticity_score(wpm_variance: float, answer_lengths: list, star_scores: list) -> float:
+def _round1(values: np.ndarray) -> np.ndarray:
+    """
+    Element-wise round(x, 1) with Python's exact result.
+    np.round scales by 10 first, which can tip values within float error of a
+    .x5 tie the other way, so those few are recomputed with round().
+    """
+    out = np.round(values, 1)
+    scaled = values * 10
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        out[near_tie] = [round(v, 1) for v in values[near_tie].tolist()]
+    return out
+
+def _grades(overall: np.ndarray) -> np.ndarray:
+    """Vectorized scoring.rubric.get_grade."""
+    return np.select(
+        [overall >= 90, overall >= 80, overall >= 70, overall >= 60],
+        ["A (Excellent)", "B (Good)", "C (Passable)", "D (Needs Improvement)"],
+        default="F (Fail)"
+    )
+
+def _weight_matrix(df: pd.DataFrame, rubric, n: int) -> np.ndarray:
+    """(n, 6) overall-score weights: rubric's plan for every row, else each row's role plan."""
+    if rubric is not None or "role" not in df:
+        return np.broadcast_to(as_scoring_plan(rubric).weight_vector, (n, len(DIMENSIONS)))
+    codes, roles = pd.factorize(df["role"].fillna("default").map(role_key))
+    plans = np.stack([get_scoring_plan(r).weight_vector for r in roles]) if len(roles) else np.zeros((0, len(DIMENSIONS)))
+    return plans[codes]
+
+def fuse_scores_batch(features, rubric=None) -> pd.DataFrame:
+    """
+    Columnar fuse_scores for re-scoring many sessions at once.
+    features is a DataFrame (or dict of arrays) with FUSION_FEATURES columns, e.g.
+    rows from fusion_features(); missing columns take fuse_scores' defaults.
+    Overall scores use rubric's ScoringPlan for every row or, without one, the plan
+    of each row's 'role' column (default plan when there is none).
+    Returns a DataFrame with the six dimensions, overall_score and grade on the same
+    index, equal to fuse_scores row by row (same operation order, exact rounding).
+    """
+    df = features if isinstance(features, pd.DataFrame) else pd.DataFrame(features)
+    n = len(df)
+
+    def col(name):
+        if name in df:
+            # Rows stored before a feature existed hold NULL; they score with the default
+            return df[name].fillna(FUSION_FEATURES[name]).to_numpy(dtype=np.float64)
+        return np.full(n, float(FUSION_FEATURES[name]))
+
+    # 1. Communication
+    vocab = col("vocabulary_score")
+    wpm = col("wpm")
+    wpm_score = np.where((wpm >= 100) & (wpm <= 180), 85.0,
+                         np.where(wpm == 0, 50.0, np.maximum(40, 100 - np.abs(140 - wpm) * 0.3)))
+    filler_penalty = np.minimum(15, col("filler_count") * 1.5)
+    def availability(feature):
+        return col(f"{feature}_availability")
+
+    communication = np.minimum(100.0, np.maximum(0.0, _blend_batch(
+        [(vocab, 0.6, "vocabulary_score"), (wpm_score, 0.4, None)], availability) - filler_penalty))
+
+    # 2. Confidence
+    eye_contact = col("eye_contact_percent")
+    posture = df["posture"].to_numpy() if "posture" in df else np.full(n, "")
+    posture_bonus = np.where(posture == "upright", 15.0, 5.0)
+    confidence = np.minimum(100.0, np.maximum(0.0, col("voice_confidence") * 0.35 + eye_contact * 0.45 + posture_bonus + 5))
+
+    # 3. Technical
+    completeness = col("completeness")
+    technical = np.minimum(100.0, np.maximum(0.0, _blend_batch(
+        [(col("keyword_coverage_percent"), 0.4, "keyword_coverage_percent"), (col("star_score"), 0.35, "star_score"),
+         (completeness, 0.25, "completeness")], availability) - _duplicate_penalty(col("duplicate_similarity"))))
+
+    # 4. Emotional IQ
+    total_emotions = np.maximum(1, col("emotion_total"))
+    happy_ratio = np.where(col("emotion_labels") > 0, col("happy_count") / total_emotions * 100, 40.0)
+    emotional_iq = np.minimum(100.0, np.maximum(0.0, _blend_batch(
+        [(col("sentiment"), 0.6, "sentiment"), (happy_ratio, 0.2, None)], availability) + 20))
+
+    # 5. Engagement
+    engagement = np.minimum(100.0, np.maximum(0.0, _blend_batch(
+        [(eye_contact, 0.5, None), (completeness, 0.3, "completeness")], availability) + 20))
+
+    # 6. Professionalism
+    prof_base = 80 - col("silence_ratio") * 30
+    prof_base = prof_base - np.minimum(25, col("stress_spikes") * 5)
+    prof_base = prof_base + completeness * 0.2
+    professionalism = np.minimum(100.0, np.maximum(0.0, prof_base))
+
+    values = [communication, confidence, technical, emotional_iq, engagement, professionalism]
+    out = pd.DataFrame({k: _round1(v) for k, v in zip(DIMENSIONS, values)}, index=df.index)
+
+    weights = _weight_matrix(df, rubric, n)
+    overall = np.zeros(n)
+    for j, k in enumerate(DIMENSIONS):
+        overall = overall + out[k].to_numpy() * weights[:, j]
+    out["overall_score"] = _round1(overall)
+    out["grade"] = _grades(overall)
+    return out
+
+def detect_authenticity_score(wpm_variance: float, answer_lengths: list, star_scores: list,
+                              duplicate_similarity: float = 0.0) -> float:
     """
     Experimental metric: Detects if answers feel rehearsed.
-    Lower wpm variance = more rehearsed. 
+    Lower wpm variance = more rehearsed. An answer nearly duplicating another
+    candidate's or a template answer (nlp.duplicate_detector) caps the score.
     Returns 0-100 (100 = genuine).
     """
+    if duplicate_similarity >= DUPLICATE_THRESHOLD:
+        return round(100.0 * (1 - duplicate_similarity), 1)  # Copied answer
     if wpm_variance < 5.0 and all(s > 90 for s in star_scores):
         return 40.0  # Highly rehearsed
     elif wpm_variance > 25.0:
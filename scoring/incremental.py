@@ -0,0 +1,127 @@
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait as wait_futures
+from utils.config import SCORING_WORKERS, ANALYSIS_PROCESS_WORKERS, ANALYSIS_STAGE_TIMEOUT, ANALYSIS_DEADLINE
+from utils.resources import resource
+from scoring.features import (
+    extract_question_features, extract_question_features_fast, extract_features_batch,
+    new_fusion_totals, add_question_totals
+)
+
+
+def _shutdown(pool):
+    pool.shutdown(wait=False, cancel_futures=True)
+
+@resource("scoring_pool", teardown=_shutdown)
+def get_scoring_pool():
+    """Process-wide worker threads shared by all interviews' IncrementalScorers."""
+    return ThreadPoolExecutor(max_workers=max(1, SCORING_WORKERS), thread_name_prefix="scoring")
+
+@resource("analysis_process_pool", teardown=_shutdown)
+def get_analysis_process_pool():
+    """Process pool for pure-Python analysis stages, or None when disabled."""
+    if ANALYSIS_PROCESS_WORKERS <= 0:
+        return None
+    return ProcessPoolExecutor(max_workers=ANALYSIS_PROCESS_WORKERS)
+
+
+def _done(result) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+class IncrementalScorer:
+    """
+    Scores answers in the background as soon as each question is committed.
+    submit() queues the NLP/STAR/keyword extraction for one answer on the scoring
+    pool; collect() runs on the caller's (script) thread and folds finished results
+    into running totals strictly in question order, so the sums are identical to
+    scoring all answers at the end. Finishing an interview then only waits for the
+    answers still in flight.
+    """
+
+    def __init__(self, jd_keywords: list = None, plan=None):
+        self.jd_keywords = jd_keywords or []
+        self.plan = plan  # role ScoringPlan, for keyword coverage without a JD
+        self.totals = new_fusion_totals()
+        self.features = {}      # question index -> folded features
+        self._pending = {}      # question index -> Future
+        self._next = 0          # next question index to fold
+
+    def submitted(self, index: int) -> bool:
+        return index in self._pending or index in self.features
+
+    def submit(self, index: int, transcript: str, question_text: str):
+        """Queues scoring of question index; a question is only scored once."""
+        if self.submitted(index):
+            return
+        self._pending[index] = get_scoring_pool().submit(
+            extract_question_features, transcript, question_text, self.jd_keywords, self.plan
+        )
+
+    def finish(self, questions: list, timeline=None, deadline: float = ANALYSIS_DEADLINE) -> list:
+        """
+        Scores every question not submitted yet in one concurrent StageGraph run,
+        then folds everything. Returns the indices folded by this call.
+        Within deadline seconds: batch stages that would overrun it use their cheaper
+        estimators, and answers still in flight when it passes are rescored with
+        extract_question_features_fast. Features left on a placeholder are listed in
+        each answer's 'degraded'.
+        """
+        if deadline is not None and deadline <= 0:
+            deadline = None  # ANALYSIS_DEADLINE=0 disables the deadline
+        end = time.monotonic() + deadline if deadline is not None else None
+        todo = [i for i in range(len(questions)) if not self.submitted(i)]
+        if todo:
+            # A pool of its own, one thread per answer: NLP stages never queue behind each
+            # other or the background scorer, and a timed-out stage that keeps running
+            # does not hold up the shared scoring threads
+            pool = ThreadPoolExecutor(max_workers=len(todo), thread_name_prefix="analysis")
+            try:
+                batch = extract_features_batch(
+                    [questions[i] for i in todo], self.jd_keywords, timeline,
+                    thread_pool=pool, process_pool=get_analysis_process_pool(),
+                    stage_timeout=ANALYSIS_STAGE_TIMEOUT, deadline=deadline, plan=self.plan
+                )
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+            for i, features in zip(todo, batch):
+                self._pending[i] = _done(features)
+        if end is not None:
+            running = [f for f in self._pending.values() if not f.done()]
+            if running:
+                wait_futures(running, timeout=max(0.0, end - time.monotonic()))
+            for i, future in self._pending.items():
+                if not future.done():
+                    future.cancel()
+                    q = questions[i] if i < len(questions) else {}
+                    self._pending[i] = _done(extract_question_features_fast(
+                        q.get("answer_transcript", ""), q.get("text", ""), self.jd_keywords, self.plan
+                    ))
+        return self.collect(wait=True)
+
+    def collect(self, wait: bool = False) -> list:
+        """
+        Folds finished results in question order; with wait=True blocks for all
+        submitted questions. Returns the indices folded by this call.
+        """
+        folded = []
+        while self._next in self._pending:
+            future = self._pending[self._next]
+            if not wait and not future.done():
+                break
+            try:
+                features = future.result()
+            except Exception as e:
+                print(f"Error scoring answer {self._next}: {e}")
+                features = {"answered": False, "word_count": 0}
+            del self._pending[self._next]
+            self.features[self._next] = features
+            add_question_totals(self.totals, features)
+            folded.append(self._next)
+            self._next += 1
+        return folded
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
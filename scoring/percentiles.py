@@ -0,0 +1,115 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from utils.config import SCORE_INDEX_REFRESH_SECONDS
+from utils.db import add_session_listener, iter_session_scores, scores_version
+from utils.resources import ChangeCheck, registry, resource
+from scoring.rubric import role_key
+
+# Dimensions ranked per role: the overall score plus the six breakdown dimensions
+RANKED_DIMENSIONS = ["overall_score", "communication", "confidence", "technical",
+                     "emotional_iq", "engagement", "professionalism"]
+
+
+class PercentileIndex:
+    """
+    Per-role, per-dimension sorted score lists for peer ranking.
+    Lookups bisect one list, so a percentile costs O(log n) and never scans sessions;
+    adding or removing a session touches one list per dimension.
+    The percentile of a score is the share of peers below it, counting ties as half
+    (0-100; a lone session sits at 50).
+    """
+
+    def __init__(self):
+        self._scores = {}    # (role, dimension) -> sorted list of scores
+        self._sessions = {}  # session_id -> (role, {dimension: score})
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def add(self, session_id: int, role: str, scores: dict):
+        """Indexes a session's scores (replacing any earlier entry for the same id)."""
+        with self._lock:
+            self._remove(session_id)
+            role = role_key(role)
+            kept = {d: float(scores[d]) for d in RANKED_DIMENSIONS if scores.get(d) is not None}
+            for dim, score in kept.items():
+                insort(self._scores.setdefault((role, dim), []), score)
+            self._sessions[session_id] = (role, kept)
+
+    def remove(self, session_id: int):
+        with self._lock:
+            self._remove(session_id)
+
+    def _remove(self, session_id):
+        entry = self._sessions.pop(session_id, None)
+        if entry is None:
+            return
+        role, scores = entry
+        for dim, score in scores.items():
+            values = self._scores[(role, dim)]
+            del values[bisect_left(values, score)]
+
+    def peers(self, role: str, dimension: str = "overall_score") -> int:
+        return len(self._scores.get((role_key(role), dimension), ()))
+
+    def percentile(self, role: str, dimension: str, score: float):
+        """Percentile of score among the role's indexed sessions, or None without peers."""
+        values = self._scores.get((role_key(role), dimension))
+        if not values:
+            return None
+        below = bisect_left(values, score)
+        ties = bisect_right(values, score) - below
+        return round((below + 0.5 * ties) / len(values) * 100, 1)
+
+    def session_percentiles(self, session_id: int) -> dict:
+        """{dimension: percentile} for an indexed session, empty if it is not indexed."""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return {}
+        role, scores = entry
+        return {dim: self.percentile(role, dim, score) for dim, score in scores.items()}
+
+
+def _is_ranked(row: dict) -> bool:
+    # Sessions without speech carry placeholder zeros and would drag every percentile
+    return not str(row.get("grade") or "").startswith("N/A")
+
+
+_rescored = ChangeCheck(scores_version, SCORE_INDEX_REFRESH_SECONDS)
+
+
+@resource("percentile_index")
+def _percentile_index() -> PercentileIndex:
+    _rescored.reset()
+    index = PercentileIndex()
+    for row in iter_session_scores():
+        if _is_ranked(row):
+            index.add(row["session_id"], row["role"], row)
+    return index
+
+
+def get_percentile_index() -> PercentileIndex:
+    """
+    Builds the index from the database once per process; db hooks keep it current
+    and it is rebuilt after scoring.rescore rewrites the stored scores.
+    """
+    if registry.is_loaded("percentile_index") and _rescored.changed():
+        _percentile_index.clear()
+    return _percentile_index()
+
+
+get_percentile_index.clear = _percentile_index.clear
+
+
+def _on_session_change(event: str, session_id: int, row: dict = None):
+    if not registry.is_loaded("percentile_index"):
+        return  # Loaded later straight from the database
+    index = get_percentile_index()
+    if event == "delete" or not _is_ranked(row or {}):
+        index.remove(session_id)
+    else:
+        index.add(session_id, row["role"], row)
+
+
+add_session_listener(_on_session_change)
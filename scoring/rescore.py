@@ -0,0 +1,51 @@
+"""
+Re-scores stored sessions after a change to SCORING_WEIGHTS, the rubrics or the fusion rules.
+
+    python -m scoring.rescore [features.csv] [--dry-run]
+
+Features come from the session_features table (see utils.db.load_session_features),
+so no model is rerun; a CSV can be given instead. Either way there is one row per
+session: a session_id column plus the FUSION_FEATURES columns (see
+scoring.fusion.fusion_features), and an optional role column selecting each
+session's scoring plan. Sessions whose answered_questions column is 0 keep the
+no-speech result, as at interview time.
+"""
+import sys
+import pandas as pd
+from scoring.fusion import fuse_scores_batch, DIMENSIONS
+
+NO_SPEECH_GRADE = "N/A (No Speech Detected)"
+
+
+def rescore_features(features: pd.DataFrame) -> pd.DataFrame:
+    """Returns session_id, the six dimensions, overall_score and grade for every feature row."""
+    scores = fuse_scores_batch(features)
+    if "answered_questions" in features:
+        silent = (features["answered_questions"] == 0).to_numpy()
+        scores.loc[silent, DIMENSIONS + ["overall_score"]] = 0.0
+        scores.loc[silent, "grade"] = NO_SPEECH_GRADE
+    scores.insert(0, "session_id", features["session_id"].to_numpy())
+    return scores
+
+
+def rescore_sessions(features: pd.DataFrame, chunk_size: int = 5000, dry_run: bool = False) -> pd.DataFrame:
+    """Re-scores the sessions in features and writes the results to the database unless dry_run."""
+    from utils.db import update_session_scores
+    scores = rescore_features(features)
+    if not dry_run:
+        written = update_session_scores(scores.to_dict("records"), chunk_size=chunk_size)
+        # Running servers rebuild their peer-rank and similarity indexes once they
+        # see the new utils.db.scores_version()
+        print(f"Re-scored {written} sessions")
+    return scores
+
+
+if __name__ == "__main__":
+    from utils.db import load_session_features
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    features = pd.read_csv(args[0]) if args else load_session_features()
+    if features.empty:
+        print("No stored features to re-score")
+        sys.exit(0)
+    result = rescore_sessions(features, dry_run="--dry-run" in sys.argv)
+    print(result["grade"].value_counts().to_string())
@@ -1,3 +1,13 @@
+import json
+import os
+import re
+import numpy as np
+from utils.config import SCORING_WEIGHTS, RUBRICS_PATH, RUBRICS_REFRESH_SECONDS
+from utils.resources import ChangeCheck, registry, resource
+
+# The six fused dimensions, in the order fuse_scores sums them
+DIMENSIONS = ["communication", "confidence", "technical", "emotional_iq", "engagement", "professionalism"]
+
 RUBRICS = {
     "software_engineer": {
         "weight": "standard",
@@ -31,10 +41,123 @@ RUBRICS = {
     }
 }
 
+def role_key(role: str) -> str:
+    """Normalizes a role name ('Software Engineer', 'software-engineer') to its rubric key."""
+    return (role or "unknown").lower().replace(" ", "_").replace("-", "_")
+
 def load_rubric(role: str) -> dict:
     """Returns the specific rubric for a given role, or default."""
-    role_key = role.lower().replace(" ", "_").replace("-", "_")
-    return RUBRICS.get(role_key, RUBRICS["default"])
+    return RUBRICS.get(role_key(role), RUBRICS["default"])
+
+def _readonly(values) -> np.ndarray:
+    arr = np.array(values, dtype=np.float64)
+    arr.setflags(write=False)
+    return arr
+
+class ScoringPlan:
+    """
+    Immutable, precompiled form of one role's rubric.
+    weights / weight_vector hold the overall-score weight of each DIMENSIONS entry,
+    benchmark_vector the role's benchmark per dimension (NaN where it sets none) and
+    keyword_pattern one compiled regex over the role keywords (keyword coverage of
+    answers when the interview has no job description). Built once by
+    compile_rubric, so fusion, benchmark comparison and re-scoring do no per-call
+    dict work. Rubrics with weight "standard" use SCORING_WEIGHTS; a "weights" dict
+    overrides individual dimensions.
+    """
+    __slots__ = ("role", "weights", "weight_vector", "benchmarks", "benchmark_vector",
+                 "keywords", "keyword_pattern")
+
+    def __init__(self, role: str, weights: tuple, benchmarks: tuple, keywords: tuple):
+        set_ = object.__setattr__
+        set_(self, "role", role)
+        set_(self, "weights", tuple(float(w) for w in weights))
+        set_(self, "weight_vector", _readonly(self.weights))
+        set_(self, "benchmarks", tuple(benchmarks))
+        set_(self, "benchmark_vector", _readonly([np.nan if b is None else b for b in benchmarks]))
+        set_(self, "keywords", tuple(keywords))
+        pattern = "|".join(re.escape(k) for k in sorted(self.keywords, key=len, reverse=True))
+        set_(self, "keyword_pattern", re.compile(rf"(?<!\w)(?:{pattern})(?!\w)") if keywords else None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ScoringPlan is immutable")
+
+    def __repr__(self) -> str:
+        return f"ScoringPlan({self.role!r})"
+
+    def overall(self, values) -> float:
+        """Weighted overall score of the six dimension values, summed in DIMENSIONS order."""
+        return sum(v * w for v, w in zip(values, self.weights))
+
+    def matched_keywords(self, text: str) -> set:
+        """Role keywords mentioned in text (whole words, case-insensitive)."""
+        if self.keyword_pattern is None or not text:
+            return set()
+        return set(self.keyword_pattern.findall(text.lower()))
+
+    def keyword_coverage(self, text: str) -> float:
+        """Share of role keywords mentioned, scaled like nlp.keyword_matcher.match_answer_to_jd."""
+        if not self.keywords or not text:
+            return 0.0
+        return round(min(100.0, len(self.matched_keywords(text)) / len(self.keywords) * 200), 2)
+
+    def benchmark_gaps(self, breakdown: dict) -> dict:
+        """{dimension: score - benchmark} for the dimensions the role benchmarks."""
+        return {d: round(breakdown.get(d, 0.0) - b, 1) for d, b in zip(DIMENSIONS, self.benchmarks) if b is not None}
+
+def compile_rubric(role: str, rubric: dict) -> ScoringPlan:
+    overrides = rubric.get("weights") or {}
+    weights = [overrides.get(d, SCORING_WEIGHTS[d]) for d in DIMENSIONS]
+    # Benchmarks on dimensions fusion does not produce (e.g. leadership) have nothing to compare with
+    benchmark_scores = rubric.get("benchmark_scores", {})
+    benchmarks = [benchmark_scores.get(d) for d in DIMENSIONS]
+    keywords = [k.lower() for k in rubric.get("keywords", [])]
+    return ScoringPlan(role, weights, benchmarks, keywords)
+
+def load_rubrics(path: str = None) -> dict:
+    """Built-in RUBRICS, with roles from the JSON file at path (default RUBRICS_PATH) added or replaced."""
+    path = RUBRICS_PATH if path is None else path
+    rubrics = dict(RUBRICS)
+    if path and os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                rubrics.update({role_key(k): v for k, v in json.load(f).items()})
+        except Exception as e:
+            print(f"Warning: could not load rubrics from {path}: {e}")
+    return rubrics
+
+def _rubrics_mtime():
+    try:
+        return os.path.getmtime(RUBRICS_PATH) if RUBRICS_PATH else None
+    except OSError:
+        return None
+
+# The rubrics file is stat'ed at most every RUBRICS_REFRESH_SECONDS, not per fusion call
+_rubrics_changed = ChangeCheck(_rubrics_mtime, RUBRICS_REFRESH_SECONDS)
+
+@resource("scoring_plans")
+def _compiled_plans() -> dict:
+    _rubrics_changed.reset()
+    return {k: compile_rubric(k, r) for k, r in load_rubrics().items()}
+
+def get_scoring_plans() -> dict:
+    """{role key: ScoringPlan}, compiled once and again whenever the rubrics file changes."""
+    if registry.is_loaded("scoring_plans") and _rubrics_changed.changed():
+        _compiled_plans.clear()
+    return _compiled_plans()
+
+def get_scoring_plan(role: str) -> ScoringPlan:
+    """Compiled plan for a role, or the default plan."""
+    plans = get_scoring_plans()
+    return plans.get(role_key(role), plans["default"])
+
+def as_scoring_plan(rubric) -> ScoringPlan:
+    """Accepts a ScoringPlan, a raw rubric dict (compiled on the spot) or None (default plan)."""
+    if isinstance(rubric, ScoringPlan):
+        return rubric
+    if not rubric:
+        return get_scoring_plan("default")
+    return compile_rubric("custom", rubric)
 
 def get_grade(total_score: float) -> str:
     """Returns an alphabetical grade based on the raw 100-point score."""
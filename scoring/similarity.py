@@ -0,0 +1,157 @@
+import threading
+import numpy as np
+from utils.config import SCORE_INDEX_REFRESH_SECONDS
+from utils.db import add_session_listener, iter_session_scores, scores_version
+from utils.resources import ChangeCheck, registry, resource
+
+# Score breakdown dimensions forming a session's profile vector (scaled to 0..1)
+PROFILE_DIMENSIONS = ["communication", "confidence", "technical", "emotional_iq", "engagement", "professionalism"]
+# Stored fusion inputs appended to the profile, with the value that maps to 1.0;
+# sessions saved without features use fuse_scores' defaults
+PROFILE_FEATURES = {
+    "vocabulary_score": 100.0,
+    "keyword_coverage_percent": 100.0,
+    "star_score": 100.0,
+    "completeness": 100.0,
+    "sentiment": 100.0,
+    "voice_confidence": 100.0,
+    "eye_contact_percent": 100.0,
+    "wpm": 200.0,
+    "silence_ratio": 1.0
+}
+PROFILE_SIZE = len(PROFILE_DIMENSIONS) + len(PROFILE_FEATURES)
+
+
+def profile_vector(scores: dict) -> np.ndarray:
+    """Breakdown dimensions plus normalized session features, each clipped to 0..1."""
+    from scoring.fusion import FUSION_FEATURES
+    values = [float(scores.get(d) or 0.0) / 100.0 for d in PROFILE_DIMENSIONS]
+    for name, scale in PROFILE_FEATURES.items():
+        value = scores.get(name)
+        if value is None or value != value:  # missing or NaN
+            value = FUSION_FEATURES[name]
+        values.append(min(1.0, max(0.0, float(value) / scale)))
+    return np.array(values, dtype=np.float32)
+
+
+class SimilarityIndex:
+    """
+    k-nearest-neighbour search over session profiles (breakdown plus feature vector).
+    Profiles live in one contiguous (capacity, d) float32 matrix with a parallel id
+    array; a query is a single vectorized distance pass plus argpartition, a few
+    milliseconds for tens of thousands of sessions. Inserts append (amortized O(1))
+    and deletes move the last row into the freed slot (O(1)).
+    """
+
+    def __init__(self, dims: int = PROFILE_SIZE, capacity: int = 1024):
+        self._vectors = np.zeros((max(1, capacity), dims), dtype=np.float32)
+        self._ids = np.zeros(max(1, capacity), dtype=np.int64)
+        self._rows = {}  # session_id -> row
+        self._n = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __contains__(self, session_id) -> bool:
+        return session_id in self._rows
+
+    def add(self, session_id: int, vector):
+        """Inserts or replaces a session's profile vector."""
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            row = self._rows.get(session_id)
+            if row is None:
+                if self._n == len(self._ids):
+                    self._vectors = np.concatenate([self._vectors, np.zeros_like(self._vectors)])
+                    self._ids = np.concatenate([self._ids, np.zeros_like(self._ids)])
+                row = self._n
+                self._n += 1
+                self._rows[session_id] = row
+                self._ids[row] = session_id
+            self._vectors[row] = vector
+
+    def remove(self, session_id: int):
+        with self._lock:
+            row = self._rows.pop(session_id, None)
+            if row is None:
+                return
+            last = self._n - 1
+            if row != last:
+                # Swap-remove: the last profile takes the freed row
+                moved = int(self._ids[last])
+                self._vectors[row] = self._vectors[last]
+                self._ids[row] = moved
+                self._rows[moved] = row
+            self._n = last
+
+    def vector(self, session_id: int):
+        row = self._rows.get(session_id)
+        return None if row is None else self._vectors[row].copy()
+
+    def nearest(self, vector, k: int = 5, exclude=None) -> list:
+        """Returns up to k (session_id, distance) pairs closest to vector, nearest first."""
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            vectors = self._vectors[:self._n]
+            ids = self._ids[:self._n]
+            dist = np.sqrt(((vectors - vector) ** 2).sum(axis=1))
+            if exclude is not None and exclude in self._rows:
+                dist[self._rows[exclude]] = np.inf
+            k = min(k, self._n - (1 if exclude in self._rows else 0))
+            if k <= 0:
+                return []
+            top = np.argpartition(dist, k - 1)[:k]
+            top = top[np.argsort(dist[top], kind="stable")]
+            return [(int(ids[i]), round(float(dist[i]) * 100, 2)) for i in top]
+
+    def similar_sessions(self, session_id: int, k: int = 5) -> list:
+        """The k sessions whose profiles are closest to session_id's (distance in percentage points)."""
+        vector = self.vector(session_id)
+        if vector is None:
+            return []
+        return self.nearest(vector, k, exclude=session_id)
+
+
+def _is_indexed(row: dict) -> bool:
+    # Sessions without speech carry placeholder zero profiles
+    return not str(row.get("grade") or "").startswith("N/A")
+
+
+_rescored = ChangeCheck(scores_version, SCORE_INDEX_REFRESH_SECONDS)
+
+
+@resource("similarity_index")
+def _similarity_index() -> SimilarityIndex:
+    _rescored.reset()
+    index = SimilarityIndex()
+    for row in iter_session_scores(feature_columns=tuple(PROFILE_FEATURES)):
+        if _is_indexed(row):
+            index.add(row["session_id"], profile_vector(row))
+    return index
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """
+    Builds the index from the database once per process; db hooks keep it current
+    and it is rebuilt after scoring.rescore rewrites the stored scores.
+    """
+    if registry.is_loaded("similarity_index") and _rescored.changed():
+        _similarity_index.clear()
+    return _similarity_index()
+
+
+get_similarity_index.clear = _similarity_index.clear
+
+
+def _on_session_change(event: str, session_id: int, row: dict = None):
+    if not registry.is_loaded("similarity_index"):
+        return  # Loaded later straight from the database
+    index = get_similarity_index()
+    if event == "delete" or not _is_indexed(row or {}):
+        index.remove(session_id)
+    else:
+        index.add(session_id, profile_vector(row))
+
+
+add_session_listener(_on_session_change)
@@ -35,4 +35,17 @@ except Exception as e:
     print('DeepFace pre-warm Warning (non-fatal):', e)
 "
 
+echo "4. Exporting emotion model to ONNX..."
+python -c "import tf2onnx" 2>/dev/null || pip install tf2onnx
+python -c "
+from utils.config import EMOTION_ONNX_PATH
+from vision.emotion_backends import export_emotion_onnx
+
+try:
+    export_emotion_onnx(EMOTION_ONNX_PATH)
+    print('ONNX emotion model written to', EMOTION_ONNX_PATH)
+except Exception as e:
+    print('ONNX export Warning (non-fatal, DeepFace will be used):', e)
+"
+
 echo "=== All models pre-downloaded successfully ==="
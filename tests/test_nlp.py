@@ -43,3 +43,17 @@ def test_jd_keyword_matcher():
     score = match_answer_to_jd(answer, kws)
     # 2 out of 4 matches => 50%. Our formula does 0.5 * 200 = 100 max
     assert score == 100.0
+
+def test_highlight_segments_follow_sentences():
+    answer = (
+        "When I was at TechCorp, the problem was that our app was crashing daily. "
+        "We had thousands of users. My task was to stabilize the backend. "
+        "I led a small team. I implemented a new caching layer using Redis. "
+        "We also added monitoring and alerts. "
+        "As a result, downtime decreased by 99% and revenue increased."
+    )
+    segs = highlight_star_segments(answer)
+    assert segs["situation"].endswith("We had thousands of users.")
+    assert segs["task"] == "My task was to stabilize the backend."
+    assert segs["action"].startswith("I led a small team.")
+    assert segs["result"].startswith("As a result")
@@ -0,0 +1,40 @@
+import threading
+from utils.resources import ResourceRegistry
+
+def test_registry_loads_once_across_threads():
+    reg = ResourceRegistry()
+    calls = []
+    reg.register("model", lambda: calls.append(1) or object())
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(reg.get("model"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+def test_registry_reloads_after_fork(monkeypatch):
+    reg = ResourceRegistry()
+    reg.register("model", object)
+    first = reg.get("model")
+
+    # Simulate running inside a forked child
+    import utils.resources
+    monkeypatch.setattr(utils.resources.os, "getpid", lambda: -1)
+    assert not reg.is_loaded("model")
+    assert reg.get("model") is not first
+
+def test_registry_warmup_and_teardown():
+    reg = ResourceRegistry()
+    events = []
+    reg.register("model", lambda: "m", warmup=lambda m: events.append("warm"),
+                 teardown=lambda m: events.append("down"))
+    reg.register("missing", lambda: None)
+
+    assert reg.warmup() == {"model": True, "missing": False}
+    reg.teardown("model")
+    assert events == ["warm", "down"]
+    assert not reg.is_loaded("model")
@@ -2,6 +2,18 @@ import pytest
 from scoring.rubric import load_rubric, get_grade
 from scoring.fusion import fuse_scores, detect_authenticity_score
 
+@pytest.fixture
+def tmp_db(tmp_path, monkeypatch):
+    """Points utils.db at a fresh SQLite file with all tables created; yields the module."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    import utils.db as db
+    engine = create_engine(f"sqlite:///{tmp_path / 'sessions.db'}")
+    monkeypatch.setattr(db, "engine", engine)
+    monkeypatch.setattr(db, "SessionLocal", sessionmaker(bind=engine))
+    db.Base.metadata.create_all(engine)
+    return db
+
 def test_rubric_load():
     swe = load_rubric("Software Engineer")
     assert swe["weight"] == "standard"
@@ -39,3 +51,446 @@ def test_fuse_scores():
 def test_authenticity_score():
     assert detect_authenticity_score(2.0, [], [95, 95]) == 40.0 # Rehearsed
     assert detect_authenticity_score(30.0, [], []) == 90.0 # Genuine
+    assert detect_authenticity_score(30.0, [], [], duplicate_similarity=0.9) == 10.0 # Copied
+
+def test_fuse_scores_batch_matches_scalar():
+    import numpy as np
+    import pandas as pd
+    from scoring.fusion import fuse_scores_batch, fusion_features
+
+    rng = np.random.default_rng(7)
+    rows, expected = [], []
+    for i in range(3000):
+        audio = {"wpm": int(rng.choice([0, 60, 95, 120, 185, 260])), "fillers": {"um": int(rng.integers(0, 12))},
+                 "voice_confidence": int(rng.integers(0, 101)), "silence_ratio": round(float(rng.random()), 2)}
+        emotions = {} if i % 5 == 0 else {"happy": int(rng.integers(0, 20)), "neutral": int(rng.integers(0, 20))}
+        vision = {"eye_contact_percent": round(float(rng.random() * 100), 1),
+                  "posture": rng.choice(["upright", "slouching", "leaning"]),
+                  "emotion_summary": emotions, "stress_spikes": int(rng.integers(0, 8))}
+        # Quarter-point steps produce exact .x5 ties, where np.round alone disagrees with round()
+        nlp = {k: float(rng.integers(0, 401)) / 4 for k in
+               ("vocabulary_score", "completeness", "keyword_coverage_percent", "star_score", "sentiment")}
+        if i % 3 == 0:
+            nlp["duplicate_similarity"] = float(rng.integers(0, 129)) / 128
+        rows.append(fusion_features(audio, vision, nlp))
+        expected.append(fuse_scores(audio, vision, nlp, {}))
+
+    batch = fuse_scores_batch(pd.DataFrame(rows))
+    for i, exp in enumerate(expected):
+        got = batch.iloc[i]
+        assert {k: got[k] for k in exp["breakdown"]} == exp["breakdown"]
+        assert got["overall_score"] == exp["overall_score"]
+        assert got["grade"] == exp["grade"]
+
+def test_rescore_writes_scores(tmp_db):
+    import pandas as pd
+    import utils.db as db
+    from scoring.rescore import rescore_sessions
+
+    ids = [db.save_session({"email": f"c{i}@example.com", "overall_score": 0.0, "score_breakdown": {}}) for i in range(3)]
+
+    features = pd.DataFrame({"session_id": ids, "answered_questions": [2, 0, 1],
+                             "eye_contact_percent": [90, 90, 20], "posture": ["upright"] * 3})
+    scores = rescore_sessions(features, chunk_size=2)
+
+    first = db.get_session_by_id(ids[0])
+    assert first["metrics"]["overall_score"] == scores.loc[0, "overall_score"] > 0
+    assert first["breakdown"]["confidence"] == scores.loc[0, "confidence"]
+    assert db.get_session_by_id(ids[1])["metrics"]["grade"] == "N/A (No Speech Detected)"
+
+def test_feature_store_round_trip(tmp_db):
+    import utils.db as db
+    from scoring.features import build_fusion_inputs, question_score, window_emotions
+    from scoring.fusion import fusion_features
+    from scoring.rescore import rescore_features
+    from vision.emotion_timeline import EmotionTimeline
+
+
+    timeline = EmotionTimeline()
+    for t, emo in [(1, "happy"), (5, "fear"), (12, "neutral"), (15, "happy")]:
+        timeline.append(t, emo, 80.0)
+    question_features = [
+        {"answered": True, "word_count": 120, "vocabulary_score": 75, "completeness": 80.0, "sentiment": 66.5,
+         "star_score": 75.0, "keyword_coverage_percent": 50, "start_offset": 0.0, "end_offset": 10.0},
+        {"answered": False, "word_count": 0, "start_offset": 10.0, "end_offset": 20.0}
+    ]
+    for f in question_features:
+        f.update(window_emotions(timeline, f["start_offset"], f["end_offset"]))
+    assert question_features[0]["emotion_counts"] == {"happy": 1, "fear": 1}
+    assert question_features[0]["stress_count"] == 1
+
+    audio, vision, nlp, answered = build_fusion_inputs(question_features, 20.0, timeline.counts(),
+                                                       timeline.stress_count(), 82.5, "upright")
+    expected = fuse_scores(audio, vision, nlp, {})
+    sid = db.save_session({
+        "email": "a@example.com", "overall_score": expected["overall_score"], "grade": expected["grade"],
+        "score_breakdown": expected["breakdown"],
+        "questions": [{"text": "Q1", "score": question_score(question_features[0])}, {"text": "Q2"}],
+        "question_features": question_features,
+        "session_features": dict(fusion_features(audio, vision, nlp), answered_questions=answered,
+                                 duration_seconds=20.0, emotion_counts=timeline.counts())
+    })
+
+    stored_q = db.load_question_features([sid])
+    assert list(stored_q["question_index"]) == [0, 1]
+    assert stored_q.loc[0, "emotion_counts"] == {"happy": 1, "fear": 1}
+    assert stored_q.loc[0, "answered"] and not stored_q.loc[1, "answered"]
+
+    stored = db.load_session_features()
+    rescored = rescore_features(stored).iloc[0]
+    assert rescored["overall_score"] == expected["overall_score"]
+    assert rescored["grade"] == expected["grade"]
+    assert stored.loc[0, "emotion_counts"] == timeline.counts()
+
+def test_incremental_scorer_folds_in_question_order(monkeypatch):
+    import threading
+    import scoring.incremental as inc
+    from scoring.features import build_fusion_inputs, fusion_inputs_from_totals
+
+    release = threading.Event()
+    def fake_extract(transcript, question_text, jd_keywords, plan=None):
+        if question_text == "slow":
+            release.wait(2)
+        if not transcript:
+            return {"answered": False, "word_count": 0}
+        n = len(transcript)
+        return {"answered": True, "word_count": n, "vocabulary_score": 75, "completeness": n * 1.1,
+                "sentiment": 60.3, "star_score": 50.0, "keyword_coverage_percent": 50}
+    monkeypatch.setattr(inc, "extract_question_features", fake_extract)
+
+    scorer = inc.IncrementalScorer()
+    scorer.submit(0, "first answer", "slow")
+    scorer.submit(1, "second", "fast")
+    scorer.submit(2, "", "fast")
+    scorer.submit(1, "ignored resubmission", "fast")
+    assert scorer.collect() == [] # question 0 still running, nothing folds out of order
+    release.set()
+    assert scorer.collect(wait=True) == [0, 1, 2]
+    assert scorer.in_flight == 0 and scorer.totals["answered"] == 2
+
+    features = [scorer.features[i] for i in range(3)]
+    args = (30.0, {"happy": 2}, 0, 80, "upright")
+    assert fusion_inputs_from_totals(scorer.totals, *args) == build_fusion_inputs(features, *args)
+
+def test_stage_graph_deps_timeouts_and_join():
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.dag import StageGraph
+
+    def slow(x):
+        time.sleep(1.0)
+        return x
+
+    graph = StageGraph()
+    graph.add("a", lambda: 2, executor="thread")
+    graph.add("b", lambda: 3, executor="process") # no process pool: runs on threads
+    graph.add("slow", slow, args=(99,), executor="thread", timeout=0.1, default=0)
+    graph.add("boom", lambda: 1 / 0, executor="thread", default=-1)
+    graph.add("sum", lambda *xs: sum(xs), deps=("a", "b", "slow", "boom"), executor="inline")
+    with ThreadPoolExecutor(4) as pool:
+        start = time.perf_counter()
+        results = graph.run(pool)
+        assert time.perf_counter() - start < 0.8
+    assert results["sum"] == 2 + 3 + 0 - 1
+    assert graph.timed_out == ["slow"] and graph.failed == ["boom"]
+
+    with pytest.raises(ValueError):
+        graph.add("later", print, deps=("missing",))
+
+def test_extract_features_batch_matches_sequential():
+    from concurrent.futures import ThreadPoolExecutor
+    from scoring.features import extract_features_batch, extract_question_features
+    from vision.emotion_timeline import EmotionTimeline
+
+    questions = [
+        {"text": "Tell me about a conflict.", "answer_transcript": "When I was at my last job the situation was "
+         "tense. My task was to fix the release process. I implemented automated python testing and as a result "
+         "we shipped twice as often.", "start_offset": 0.0, "end_offset": 30.0},
+        {"text": "Why us?", "answer_transcript": "", "start_offset": 30.0, "end_offset": 40.0},
+        {"text": "Design a cache.", "answer_transcript": "I would use an LRU with sql persistence.",
+         "start_offset": 40.0, "end_offset": None},
+    ]
+    timeline = EmotionTimeline()
+    timeline.append(5, "happy", 90.0)
+    timeline.append(45, "fear", 70.0)
+    keywords = ["python", "sql", "testing"]
+
+    with ThreadPoolExecutor(4) as pool:
+        batch = extract_features_batch(questions, keywords, timeline, thread_pool=pool, stage_timeout=10)
+    for q, got in zip(questions, batch):
+        expected = extract_question_features(q["answer_transcript"], q["text"], keywords)
+        assert {k: got[k] for k in expected} == expected
+    assert batch[0]["emotion_counts"] == {"happy": 1}
+    assert batch[2]["stress_count"] == 1
+
+def test_percentile_index_tracks_saves_and_deletes(tmp_db):
+    import utils.db as db
+    from scoring.percentiles import PercentileIndex, get_percentile_index
+
+    index = PercentileIndex()
+    for sid, score in enumerate([50, 60, 60, 70, 90]):
+        index.add(sid, "Software Engineer", {"overall_score": score})
+    assert index.percentile("software_engineer", "overall_score", 60) == 40.0 # 1 below + 2 ties halved
+    assert index.session_percentiles(4) == {"overall_score": 90.0}
+    index.remove(4)
+    assert index.percentile("software engineer", "overall_score", 90) == 100.0
+    assert index.percentile("data_scientist", "overall_score", 90) is None
+
+    get_percentile_index.clear()
+
+    def save(email, score, role="Software Engineer"):
+        return db.save_session({"email": email, "role": role, "overall_score": score, "grade": "B (Good)",
+                                "score_breakdown": {"communication": score}})
+    first = save("a@example.com", 70)
+    index = get_percentile_index()  # loaded from the database
+    assert index.session_percentiles(first)["overall_score"] == 50.0
+
+    second = save("b@example.com", 80)  # kept current by the save hook
+    assert index.session_percentiles(second)["overall_score"] == 75.0
+    assert index.session_percentiles(first)["communication"] == 25.0
+    assert index.peers("Software Engineer") == 2
+
+    db.delete_session(second)
+    assert index.session_percentiles(second) == {}
+    assert index.peers("Software Engineer") == 1
+    get_percentile_index.clear()
+
+def test_similarity_index_neighbours_match_brute_force_after_deletes():
+    import numpy as np
+    from scoring.similarity import SimilarityIndex
+
+    rng = np.random.default_rng(7)
+    vectors = rng.random((300, 6)).astype(np.float32)
+    index = SimilarityIndex(dims=6, capacity=16)  # forces several regrowths
+    for sid, v in enumerate(vectors):
+        index.add(sid, v)
+    for sid in range(0, 300, 3):
+        index.remove(sid)  # swap-remove keeps the remaining rows addressable
+    assert len(index) == 200
+
+    kept = [sid for sid in range(300) if sid % 3]
+    dist = np.sqrt(((vectors[kept] - vectors[1]) ** 2).sum(axis=1))
+    expected = [kept[i] for i in np.argsort(dist, kind="stable") if kept[i] != 1][:5]
+    assert [sid for sid, _ in index.similar_sessions(1, k=5)] == expected
+    assert index.similar_sessions(0) == []  # removed
+
+    index.add(2, vectors[1])  # update in place
+    assert index.similar_sessions(1, k=1) == [(2, 0.0)]
+
+def test_answer_index_finds_near_duplicates():
+    from nlp.duplicate_detector import AnswerIndex
+
+    template = ("My greatest weakness is that I am a perfectionist. I sometimes spend too much time making sure "
+                "every detail is right, which can slow me down, so now I set clear deadlines for myself.")
+    own = ("At my last job I migrated our billing service from a monolith to three smaller services, wrote the "
+           "rollout plan with the on-call team and cut the p99 latency of invoice generation from four seconds to one.")
+    index = AnswerIndex()
+    assert index.add_template("Greatest weakness", template)
+    assert index.add((1, 0), own)
+    assert not index.add((1, 1), "Too short to compare.")
+
+    reworded = template.replace("I sometimes", "I often").replace("clear deadlines", "strict deadlines")
+    matches = index.query(reworded)
+    assert [(m["session_id"], m["template"]) for m in matches] == [(None, "Greatest weakness")]
+    assert 0.5 <= matches[0]["similarity"] < 1.0
+    assert index.query(own)[0]["similarity"] == 1.0
+    assert index.query(own, exclude_session=1) == []
+
+    index.remove_session(1)
+    assert index.query(own) == [] and len(index) == 1
+
+def test_create_tables_adds_new_columns(tmp_db):
+    from sqlalchemy import inspect, text
+    import utils.db as db
+
+    with db.engine.begin() as conn:  # a database created before the column existed
+        conn.execute(text("ALTER TABLE session_features DROP COLUMN duplicate_similarity"))
+    db.create_tables()
+    assert "duplicate_similarity" in {c["name"] for c in inspect(db.engine).get_columns("session_features")}
+
+def test_scoring_plans_compile_and_drive_fusion(tmp_path, monkeypatch):
+    import json
+    import os
+    import pandas as pd
+    import scoring.rubric as rubric
+    from scoring.fusion import fuse_scores_batch, fusion_features
+
+    plan = rubric.get_scoring_plan("Data Scientist")
+    assert plan is rubric.get_scoring_plan("data-scientist")  # compiled once
+    with pytest.raises(AttributeError):
+        plan.weights = (1, 0, 0, 0, 0, 0)
+    assert plan.matched_keywords("I validated the model in R.") == {"model", "r"}  # whole words only
+
+    # Without a JD, answers are matched against the role keywords
+    from scoring.features import extract_question_features
+    answer = "I built the pipeline in python and checked the model with cross validation."
+    assert extract_question_features(answer, "Q")["keyword_coverage_percent"] == 50
+    assert extract_question_features(answer, "Q", plan=plan)["keyword_coverage_percent"] == plan.keyword_coverage(answer) > 50
+    assert plan.benchmark_gaps({"communication": 80, "technical": 85, "confidence": 70}) == \
+        {"communication": 5.0, "confidence": 0.0, "technical": -5.0}
+
+    # A rubrics file adds a role with its own weights; editing the file recompiles
+    path = tmp_path / "rubrics.json"
+    path.write_text(json.dumps({"Sales Lead": {"weights": {"communication": 0.5, "technical": 0.0}}}))
+    monkeypatch.setattr(rubric, "RUBRICS_PATH", str(path))
+    monkeypatch.setattr(rubric._rubrics_changed, "interval", 0.0)
+    rubric._compiled_plans.clear()
+    sales = rubric.get_scoring_plan("sales lead")
+    assert sales.weights[:3] == (0.5, 0.2, 0.0)
+
+    audio = {"wpm": 150, "voice_confidence": 70, "silence_ratio": 0.1}
+    vision = {"eye_contact_percent": 75.5, "posture": "upright", "emotion_summary": {"happy": 3}}
+    nlp = {"vocabulary_score": 72.5, "completeness": 81.25, "keyword_coverage_percent": 40, "star_score": 66.75, "sentiment": 58}
+    rows = pd.DataFrame([dict(fusion_features(audio, vision, nlp), role=r) for r in ("Sales Lead", "hr_manager", None)])
+    batch = fuse_scores_batch(rows)
+    for i, role in enumerate(["sales_lead", "hr_manager", "default"]):
+        assert batch.loc[i, "overall_score"] == fuse_scores(audio, vision, nlp, rubric.get_scoring_plan(role))["overall_score"]
+    assert batch.loc[0, "overall_score"] != batch.loc[1, "overall_score"]
+
+    path.write_text(json.dumps({"Sales Lead": {"weights": {"communication": 0.3}}}))
+    os.utime(path, (os.path.getmtime(path) + 5,) * 2)
+    assert rubric.get_scoring_plan("sales lead").weights[0] == 0.3
+    monkeypatch.undo()
+    rubric._compiled_plans.clear()
+
+def test_deadline_degrades_stages_and_reweights_fusion():
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    import pandas as pd
+    from utils.dag import StageGraph
+    from scoring.fusion import fuse_scores, fuse_scores_batch, fusion_features
+
+    def slow(x):
+        time.sleep(1.0)
+        return x
+
+    graph = StageGraph()
+    graph.add("fast", lambda: 1, executor="thread", budget=0.01)
+    graph.add("overrun", slow, args=(5,), executor="thread", fallback=lambda x: -x)
+    graph.add("too_big", slow, args=(7,), executor="thread", budget=60, fallback=lambda x: x * 10)
+    graph.add("sum", lambda *xs: sum(xs), deps=("fast", "overrun", "too_big"), executor="inline")
+    with ThreadPoolExecutor(4) as pool:
+        start = time.perf_counter()
+        results = graph.run(pool, deadline=0.2)
+        assert time.perf_counter() - start < 0.8
+    assert results["sum"] == 1 - 5 + 70
+    assert sorted(graph.degraded) == ["overrun", "too_big"] and graph.timed_out == ["overrun"]
+
+    audio = {"wpm": 130, "fillers": {"um": 4}, "voice_confidence": 80, "silence_ratio": 0.1}
+    vision = {"eye_contact_percent": 75, "posture": "upright", "emotion_summary": {"happy": 6, "neutral": 4},
+              "stress_spikes": 1}
+    nlp = {"keyword_coverage_percent": 60, "star_score": 70, "completeness": 80, "sentiment": 65,
+           "vocabulary_score": 75}
+    full = fuse_scores(audio, vision, nlp, {})
+    assert full["degraded"] == []
+    assert fuse_scores(audio, vision, dict(nlp, availability={"sentiment": 1.0}), {}) == full
+
+    # Sentiment missing for every answer: its weight moves onto the other terms
+    partial = dict(nlp, sentiment=50.0, availability={"sentiment": 0.0})
+    degraded = fuse_scores(audio, vision, partial, {})
+    assert degraded["degraded"] == ["sentiment"]
+    assert degraded["breakdown"]["technical"] == full["breakdown"]["technical"]
+    assert degraded["breakdown"]["emotional_iq"] != fuse_scores(audio, vision, dict(nlp, sentiment=50.0), {})["breakdown"]["emotional_iq"]
+
+    batch = fuse_scores_batch(pd.DataFrame([fusion_features(audio, vision, partial)]))
+    assert batch.iloc[0]["overall_score"] == degraded["overall_score"]
+
+def test_zero_deadline_disables_and_placeholders_stay_out_of_averages():
+    from concurrent.futures import ThreadPoolExecutor
+    from scoring.features import extract_features_batch, build_fusion_inputs
+
+    questions = [{"text": "Q", "answer_transcript": "My task was to fix the build. I wrote python tests and as a "
+                  "result releases stopped breaking."}]
+    with ThreadPoolExecutor(2) as pool:
+        full = extract_features_batch(questions, ["python"], thread_pool=pool, stage_timeout=10)
+        zero = extract_features_batch(questions, ["python"], thread_pool=pool, stage_timeout=10, deadline=0)
+    assert zero == full and zero[0]["degraded"] == []
+
+    computed = dict(full[0], sentiment=80.0, star_score=60.0)
+    fallback = dict(full[0], sentiment=50.0, star_score=0.0, degraded=["sentiment", "star_score"])
+    _, _, nlp, count = build_fusion_inputs([computed, fallback], 60, {}, 0, 70, "upright")
+    assert count == 2
+    assert nlp["sentiment"] == 80.0 and nlp["star_score"] == 60.0
+    assert nlp["availability"]["sentiment"] == 0.5 and nlp["availability"]["completeness"] == 1.0
+
+def test_score_indexes_rebuild_after_rescore(tmp_db, monkeypatch):
+    import numpy as np
+    import utils.db as db
+    import scoring.percentiles as percentiles
+    import scoring.similarity as similarity
+
+    monkeypatch.setattr(percentiles._rescored, "interval", 0.0)
+    percentiles.get_percentile_index.clear()
+
+    ids = [db.save_session({"email": f"{s}@example.com", "role": "Software Engineer", "overall_score": s,
+                            "grade": "B (Good)", "score_breakdown": {"communication": s}}) for s in (60, 80)]
+    index = percentiles.get_percentile_index()
+    assert index.session_percentiles(ids[0])["overall_score"] == 25.0
+
+    # Written as the rescore CLI would, bypassing this process's save hooks
+    row = {"communication": 0.0, "confidence": 0.0, "technical": 0.0, "emotional_iq": 0.0,
+           "engagement": 0.0, "professionalism": 0.0, "grade": "A (Excellent)"}
+    db.update_session_scores([dict(row, session_id=ids[0], overall_score=95.0),
+                              dict(row, session_id=ids[1], overall_score=70.0)])
+    assert percentiles.get_percentile_index().session_percentiles(ids[0])["overall_score"] == 75.0
+    percentiles.get_percentile_index.clear()
+
+    monkeypatch.setattr(similarity._rescored, "interval", 0.0)
+    similarity.get_similarity_index.clear()
+    index = similarity.get_similarity_index()
+    third = db.save_session({"email": "c@example.com", "role": "Software Engineer", "overall_score": 70.0,
+                             "grade": "B (Good)", "score_breakdown": {},
+                             "session_features": {"wpm": 120, "star_score": 40.0}})  # added by the save hook
+    stored = index.vector(third)
+    assert stored[len(similarity.PROFILE_DIMENSIONS) + list(similarity.PROFILE_FEATURES).index("wpm")] == 0.6
+
+    db.update_session_scores([dict(row, session_id=third, overall_score=70.0, communication=90.0)])
+    rebuilt = similarity.get_similarity_index()
+    assert rebuilt is not index and np.allclose(rebuilt.vector(third)[1:], stored[1:])
+    assert rebuilt.vector(third)[0] == np.float32(0.9)
+    similarity.get_similarity_index.clear()
+
+def test_stage_timeout_starts_when_the_stage_does():
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.dag import StageGraph
+
+    def work(x):
+        time.sleep(0.15)
+        return x
+
+    graph = StageGraph()
+    for i in range(4):  # one worker: the last stage waits 0.45s in the queue
+        graph.add(f"s{i}", work, args=(i,), executor="thread", timeout=0.3, default=-1)
+    with ThreadPoolExecutor(1) as pool:
+        results = graph.run(pool)
+    assert [results[f"s{i}"] for i in range(4)] == [0, 1, 2, 3] and graph.timed_out == []
+    assert all(d < 0.3 for d in graph.durations.values())
+
+def test_exact_fallbacks_do_not_degrade_features(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    import utils.config as config
+    import scoring.features as features
+    from scoring.features import extract_features_batch, extract_question_features, build_fusion_inputs
+    from scoring.fusion import fuse_scores
+
+    questions = [{"text": "Q", "answer_transcript": "The situation was a failing release. My task was to fix it. "
+                  "I implemented python tests and as a result we shipped weekly."},
+                 {"text": "Q2", "answer_transcript": ""}]
+    # STAR no longer fits the deadline: its inline fallback gives the full-model score
+    monkeypatch.setitem(config.ANALYSIS_STAGE_BUDGETS, "star", 60.0)
+    with ThreadPoolExecutor(2) as pool:
+        batch = extract_features_batch(questions, ["python"], thread_pool=pool, stage_timeout=10, deadline=5)
+    expected = extract_question_features(questions[0]["answer_transcript"], "Q", ["python"])
+    assert batch[0] == expected and batch[0]["degraded"] == []
+
+    audio, vision, nlp, _ = build_fusion_inputs(batch, 60, {}, 0, 70, "upright")
+    assert all(a == 1.0 for a in nlp["availability"].values())
+    full = fuse_scores(audio, vision, build_fusion_inputs([expected], 60, {}, 0, 70, "upright")[2], {})
+    assert fuse_scores(audio, vision, nlp, {})["breakdown"]["technical"] == full["breakdown"]["technical"]
+
+    # A failing join is left unanswered instead of breaking the degraded bookkeeping
+    monkeypatch.setattr(features, "_merge_question_features", lambda *a: 1 / 0)
+    with ThreadPoolExecutor(2) as pool:
+        broken = extract_features_batch(questions, ["python"], thread_pool=pool, stage_timeout=10)
+    assert broken[0] == {"answered": False, "word_count": 0}
@@ -0,0 +1,418 @@
+import pytest
+import numpy as np
+import vision.emotion_detector as ed
+
+class FakeEmotionModel:
+    """Stands in for the Keras classifier: always predicts 'happy'."""
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, batch, verbose=0):
+        self.calls.append(batch.shape)
+        probs = np.zeros((len(batch), 7), dtype=np.float32)
+        probs[:, ed.MODEL_EMOTION_ORDER.index("happy")] = 0.9
+        probs[:, ed.MODEL_EMOTION_ORDER.index("neutral")] = 0.1
+        return probs
+
+@pytest.fixture(autouse=True)
+def no_emotion_cache(monkeypatch):
+    """Tests count model calls, so the perceptual-hash cache is off unless a test enables it."""
+    monkeypatch.setattr(ed, "get_emotion_cache", lambda: None)
+
+def test_emotion_timeline_is_batched(monkeypatch):
+    model = FakeEmotionModel()
+    monkeypatch.setattr(ed, "get_emotion_model", lambda: model)
+    monkeypatch.setattr(ed, "get_face_cascade", lambda: None)
+
+    frames = [np.full((120, 160, 3), i, dtype=np.uint8) for i in range(10)]
+    timeline = ed.get_emotion_timeline(frames, batch_size=4)
+
+    assert model.calls == [(4, 48, 48, 1), (4, 48, 48, 1), (2, 48, 48, 1)]
+    assert [e["timestamp"] for e in timeline] == list(range(10))
+    assert timeline[0]["emotion"] == "happy"
+    assert timeline[0]["intensity"] == 90.0
+    assert set(timeline[0]["all_scores"]) == set(ed.MODEL_EMOTION_ORDER)
+
+def test_analyze_face_crop_skips_detection(monkeypatch):
+    model = FakeEmotionModel()
+    monkeypatch.setattr(ed, "get_emotion_model", lambda: model)
+
+    def fail_detection(frame):
+        raise AssertionError("face detection should not run")
+    monkeypatch.setattr(ed, "_extract_face", fail_detection)
+
+    frame = np.zeros((240, 320, 3), dtype=np.uint8)
+    res = ed.analyze_face_crop(frame, (100, 60, 80, 100))
+    assert res["emotion"] == "happy"
+    assert model.calls == [(1, 48, 48, 1)]
+
+    crop = ed.crop_face(frame, (300, 200, 40, 60))
+    assert crop.shape[0] > 0 and crop.shape[1] > 0 # clamped to the frame
+
+def _fake_mesh(seed=0):
+    """Builds a MediaPipe-like landmark list with 478 points and a centred right iris."""
+    from types import SimpleNamespace
+    from vision.landmarks import RIGHT_EYE, RIGHT_IRIS
+    rng = np.random.default_rng(seed)
+    pts = rng.uniform(0.3, 0.7, size=(478, 3))
+    eye_ring = np.linspace(0, 2 * np.pi, len(RIGHT_EYE), endpoint=False)
+    pts[RIGHT_EYE, 0] = 0.40 + 0.05 * np.cos(eye_ring)
+    pts[RIGHT_EYE, 1] = 0.45 + 0.02 * np.sin(eye_ring)
+    pts[RIGHT_IRIS, 0] = 0.40
+    pts[RIGHT_IRIS, 1] = 0.45
+    return SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in pts])
+
+def test_face_landmarks_geometry():
+    from vision.landmarks import FaceLandmarks
+    from vision.gaze_estimator import estimate_gaze
+    mesh = _fake_mesh()
+    w, h = 640, 480
+    face = FaceLandmarks.from_mediapipe(mesh, w, h)
+    assert face.points.shape == (478, 3) and face.points.dtype == np.float32
+
+    x_min = min(int(l.x * w) for l in mesh.landmark)
+    y_min = min(int(l.y * h) for l in mesh.landmark)
+    x, y, bw, bh = face.bbox()
+    assert abs(x - x_min) <= 1 and abs(y - y_min) <= 1
+
+    frame = np.zeros((h, w, 3), dtype=np.uint8)
+    assert estimate_gaze(frame, face) == "direct"
+    assert estimate_gaze(frame, mesh) == "direct" # raw MediaPipe output still accepted
+
+    face_2d, face_3d = face.pnp_points()
+    assert face_2d.shape == (6, 2) and face_3d.shape == (6, 3)
+
+def test_classify_posture():
+    from vision.tracker import classify_posture, POSE_NOSE, POSE_LEFT_SHOULDER, POSE_RIGHT_SHOULDER
+    pose = np.zeros((33, 4), dtype=np.float32)
+    pose[POSE_LEFT_SHOULDER, :2] = (0.6, 0.7)
+    pose[POSE_RIGHT_SHOULDER, :2] = (0.4, 0.7)
+    pose[POSE_NOSE, :2] = (0.5, 0.4)
+    assert classify_posture(pose) == "upright"
+    pose[POSE_NOSE, :2] = (0.65, 0.4)
+    assert classify_posture(pose) == "leaning"
+    pose[POSE_NOSE, :2] = (0.5, 0.6)
+    assert classify_posture(pose) == "slouching"
+
+class FakeCapture:
+    """Capture object producing numbered frames as fast as it is read."""
+    def __init__(self, n_frames):
+        self.n = 0
+        self.n_frames = n_frames
+        self.opened = True
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        import time
+        time.sleep(0.001)
+        if self.n >= self.n_frames:
+            return False, None
+        self.n += 1
+        return True, np.full((4, 4, 3), self.n % 256, dtype=np.uint8)
+
+    def release(self):
+        self.opened = False
+
+def test_camera_stream_keeps_only_latest_frame():
+    import time
+    from vision.camera import CameraStream
+    with CameraStream(FakeCapture(200)) as cam:
+        first = cam.read(timeout=1.0)
+        assert first is not None
+        time.sleep(0.05) # analysis slower than the camera
+        latest = cam.read(timeout=1.0)
+        stats = cam.stats()
+
+    assert latest is not None and latest is not first
+    assert stats["frames_dropped"] > 0
+    assert stats["frames_consumed"] == 2
+    assert stats["frames_read"] >= stats["frames_consumed"] + stats["frames_dropped"]
+
+@pytest.fixture
+def dummy_video(tmp_path):
+    """3 second, 10 fps test video."""
+    import cv2
+    path = str(tmp_path / "interview.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(30):
+        writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+    writer.release()
+    return path
+
+def test_video_sampling(dummy_video):
+    from vision.video_pipeline import iter_sampled_frames
+    stamps = [t for t, _ in iter_sampled_frames(dummy_video, sample_fps=2.0)]
+    assert stamps == [0.0, 0.5, 1.0, 1.5, 2.0, 2.5]
+
+def test_analyze_video_pipeline(dummy_video, monkeypatch):
+    import vision.video_pipeline as vp
+    from vision.frame_analyzer import FrameAnalysis
+
+    # Every frame "has a face" looking at the camera
+    def fake_analyze(frame):
+        return FrameAnalysis(face="face", bbox=(10, 10, 20, 20), gaze="direct", posture="upright")
+    monkeypatch.setattr("vision.frame_analyzer.analyze_vision_frame", fake_analyze)
+    monkeypatch.setattr(ed, "get_emotion_model", lambda: FakeEmotionModel())
+
+    res = vp.analyze_video(dummy_video, sample_fps=2.0, workers=0)
+    assert res["frames_analyzed"] == 6
+    assert res["eye_contact_percent"] == 100.0
+    assert res["posture_summary"] == "upright"
+    assert [e["emotion"] for e in res["emotion_timeline"]] == ["happy"] * 6
+
+def test_frame_scheduler_backs_off_on_static_scene():
+    from vision.scheduler import FrameScheduler
+    sched = FrameScheduler(budget_fps=2.0, min_fps=0.25)
+    still = np.full((48, 64, 3), 100, dtype=np.uint8)
+    moving = np.full((48, 64, 3), 200, dtype=np.uint8)
+
+    analyzed = []
+    for i in range(40): # 10 seconds at 4 fps of a static scene
+        t = i * 0.25
+        if sched.should_analyze(still, t):
+            sched.mark_analyzed(still, t)
+            analyzed.append(t)
+    assert analyzed[:2] == [0.0, 0.5]
+    assert len(analyzed) < 10 # well under the 2 fps budget
+
+    # A scene change is picked up as soon as the budget allows
+    assert sched.should_analyze(moving, 10.25)
+    sched.mark_analyzed(moving, 10.25)
+    assert not sched.should_analyze(moving, 10.5) # within 1 / budget_fps
+
+def test_analyze_video_reuses_static_frames(dummy_video, monkeypatch):
+    import vision.video_pipeline as vp
+    from vision.frame_analyzer import FrameAnalysis
+    monkeypatch.setattr("vision.frame_analyzer.analyze_vision_frame",
+                        lambda frame: FrameAnalysis(face="face", bbox=(10, 10, 20, 20), gaze="direct", posture="upright"))
+    monkeypatch.setattr(ed, "get_emotion_model", lambda: FakeEmotionModel())
+
+    res = vp.analyze_video(dummy_video, sample_fps=10.0, workers=0, budget_fps=2.0)
+    assert res["frames_analyzed"] + res["frames_reused"] == 30
+    assert res["frames_analyzed"] <= 7 # 3 seconds at 2 fps plus the first frame
+    assert len(res["emotion_timeline"]) == 30
+
+def test_emotion_cache_reuses_near_duplicate_faces(monkeypatch):
+    from vision.emotion_cache import EmotionCache
+    cache = EmotionCache(maxsize=8, tolerance=4)
+    model = FakeEmotionModel()
+    monkeypatch.setattr(ed, "get_emotion_model", lambda: model)
+    monkeypatch.setattr(ed, "get_emotion_cache", lambda: cache)
+
+    rng = np.random.default_rng(1)
+    face = rng.integers(0, 255, size=(96, 96, 3), dtype=np.uint8)
+    noisy = np.clip(face.astype(int) + rng.integers(-2, 3, size=face.shape), 0, 255).astype(np.uint8)
+    other = rng.integers(0, 255, size=(96, 96, 3), dtype=np.uint8)
+
+    ed.analyze_face_crops([face])
+    ed.analyze_face_crops([noisy])
+    ed.analyze_face_crops([other])
+
+    assert len(model.calls) == 2
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["hit_rate"] == round(1 / 3, 4)
+
+def test_emotion_timeline_matches_list_functions():
+    from vision.emotion_timeline import EmotionTimeline
+    records = [
+        {"timestamp": 0, "emotion": "neutral", "intensity": 80.0},
+        {"timestamp": 1, "emotion": "fear", "intensity": 75.0},
+        {"timestamp": 2, "emotion": "fear", "intensity": 55.0},
+        {"timestamp": 3, "emotion": "fear", "intensity": 70.0},
+        {"timestamp": 4, "emotion": "happy", "intensity": 90.0},
+        {"timestamp": 5, "emotion": "angry", "intensity": 65.0},
+    ]
+    tl = EmotionTimeline.from_records(records)
+    assert len(tl) == 6 and tl[-1]["emotion"] == "angry"
+    assert ed.get_dominant_emotion_summary(tl) == ed.get_dominant_emotion_summary(records)
+    assert tl.summary() == {"happy": 16.67, "angry": 16.67, "fear": 50.0, "neutral": 16.67}
+    assert ed.detect_stress_spikes(records, 60.0) == [1.0, 3.0, 5.0]
+    assert tl.stress_count() == 4
+
+    # Hysteresis: the dip to 55 does not end the episode started at t=1
+    assert tl.stress_spikes(60.0, release_percent=50.0) == [1.0, 5.0]
+    assert tl.stress_spikes(60.0, release_percent=60.0) == [1.0, 3.0, 5.0]
+
+def test_emotion_timeline_resample_and_size():
+    from vision.emotion_timeline import EmotionTimeline
+    tl = EmotionTimeline()
+    for i in range(3600):
+        tl.append(i, "happy" if i % 3 else "sad", 50.0, {"happy": 60.0, "sad": 20.0} if i % 3 else {"sad": 70.0})
+    per_minute = tl.resample(60.0)
+    assert len(per_minute) == 60
+    assert per_minute[0]["emotion"] == "happy"
+    assert tl.nbytes < 200_000 # an hour at 1 Hz
+
+def test_gaze_accumulator_matches_log():
+    from vision.gaze_estimator import GazeAccumulator, get_eye_contact_percentage, get_gaze_heatmap_data
+
+    rng = np.random.default_rng(1)
+    log = rng.choice(["direct", "left", "right", "up", "down", "unknown"], size=500).tolist()
+    acc = GazeAccumulator(smoothing=0.2)
+    for g in log:
+        acc.update(g, (rng.random(), rng.random()))
+
+    assert acc.eye_contact_percent == get_eye_contact_percentage(log)
+    assert get_gaze_heatmap_data(log)["z"] == acc.heatmap_data()["z"]
+    assert int(np.sum(acc.offsets)) == 500
+    assert 0.0 <= acc.smoothed_eye_contact <= 100.0
+
+    restored = GazeAccumulator.from_dict(acc.to_dict())
+    assert restored.eye_contact_percent == acc.eye_contact_percent
+    assert (restored.offsets == acc.offsets).all()
+    assert restored.smoothed_eye_contact == acc.smoothed_eye_contact
+
+    timed = GazeAccumulator()
+    for t in range(100):  # past the initial sample capacity
+        timed.update("left" if t % 2 else "direct", timestamp=t * 0.5)
+    assert len(timed.timed_samples()) == 100 and timed.timed_samples()[99] == (49.5, "left")
+    assert "samples" not in timed.to_dict()
+
+def test_timeline_alignment_joins_modalities_per_question(monkeypatch):
+    import nlp.star_detector as star
+    from utils.alignment import TimelineAlignment, pauses_from_speech
+    from vision.emotion_timeline import EmotionTimeline
+    from vision.gaze_estimator import GazeAccumulator
+
+    questions = [
+        {"start_offset": 0.0, "end_offset": 10.0, "answer_transcript": "We had an outage. I fixed the cache. Latency dropped by half."},
+        {"start_offset": None},  # never asked
+        {"start_offset": 10.0, "end_offset": None, "answer_transcript": "Um, I am not sure."}
+    ]
+    timeline = EmotionTimeline()
+    for t, emo in [(1, "neutral"), (4, "fear"), (9, "happy"), (9.5, "happy"), (12, "angry"), (30, "fear")]:
+        timeline.append(t, emo, 80.0)
+    gaze = GazeAccumulator()
+    for t, label in [(2, "direct"), (3, "left"), (11, "direct"), (15, "down")]:
+        gaze.update(label, timestamp=t)
+    segments = [{"start": 0.0, "end": 4.0, "text": "um so basically it was"}]
+    alignment = TimelineAlignment(questions, emotions=timeline, gaze=gaze.timed_samples(), segments=segments,
+                                  pauses=pauses_from_speech([(0, 2), (3.5, 5), (5.2, 8)], offset=10.0),
+                                  segment_offset=10.0)
+
+    assert alignment.question_at([0.5, 9.99, 10.0, 500, -1]).tolist() == [0, 0, 2, 2, -1]
+    assert alignment.segment_at([9.0, 12.0]).tolist() == [-1, 0]
+    assert alignment.stress_per_question() == [1, None, 2]
+    first = alignment.question_summary(0)
+    assert first["emotions"] == {"neutral": 1, "fear": 1, "happy": 2}
+    assert first["gaze"] == {"direct": 1, "left": 1}
+    last = alignment.question_summary(2)
+    assert last["pauses"] == 1 and last["pause_seconds"] == 1.5
+    assert last["fillers"] == 2  # "um" and "basically"
+
+    # Sentence spans land on the question window by character offset
+    monkeypatch.setattr(star, "star_sentence_labels", lambda text: [(0, 18, "situation"), (18, 37, "action"), (37, 61, "result")])
+    sections = alignment.star_sections(0)
+    assert sections["result"][0][1] == 10.0
+    assert alignment.section_summary(0, "result")["emotions"] == {"happy": 2}
+    assert alignment.star_sections(2) == {}  # open-ended window
+
+def test_analysis_downscale_maps_back_to_full_resolution(monkeypatch):
+    import vision.frame_analyzer as fa
+    from vision.scaling import downscale_for_analysis, scale_bbox
+
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    small, scale = downscale_for_analysis(frame, 640)
+    assert small.shape[:2] == (360, 640) and scale == 0.5
+    assert downscale_for_analysis(small, 640)[1] == 1.0
+    assert downscale_for_analysis(frame, 0)[0] is frame
+    assert scale_bbox((100, 50, 40, 60), scale, frame.shape) == (200, 100, 80, 120)
+    assert scale_bbox((630, 350, 40, 40), scale, frame.shape) == (1260, 700, 20, 20)
+
+    seen = []
+    def fake_graphs(rgb, session_key=None):
+        seen.append(rgb.shape)
+        return _fake_mesh(), None
+    monkeypatch.setattr(fa, "_run_graphs", fake_graphs)
+
+    full = fa.analyze_vision_frame(frame, max_side=0)
+    scaled = fa.analyze_vision_frame(frame, max_side=640)
+    assert seen == [(720, 1280, 3), (360, 640, 3)]
+    assert scaled.bbox == full.bbox and scaled.gaze == full.gaze == "direct"
+
+def test_onnx_backend_matches_keras_interface(monkeypatch, tmp_path):
+    from vision import emotion_backends
+
+    assert emotion_backends.load_onnx_emotion_model(str(tmp_path / "missing.onnx")) is None
+
+    class FakeSession:
+        def run(self, outputs, feeds):
+            batch = feeds["face"]
+            assert batch.dtype == np.float32 and batch.shape[1:] == (48, 48, 1)
+            return [FakeEmotionModel().predict(batch)]
+
+    model = emotion_backends.OnnxEmotionModel.__new__(emotion_backends.OnnxEmotionModel)
+    model.session, model.input_name = FakeSession(), "face"
+    monkeypatch.setattr(ed, "get_emotion_model", lambda: model)
+    monkeypatch.setattr(ed, "get_face_cascade", lambda: None)
+    monkeypatch.setattr(ed, "get_deepface", lambda: pytest.fail("DeepFace should not load"))
+
+    res = ed.analyze_frame(np.zeros((120, 160, 3), dtype=np.uint8))
+    assert res["emotion"] == "happy" and res["confidence"] == 90.0
+    assert set(res["all_scores"]) == set(ed.MODEL_EMOTION_ORDER)
+
+def test_analyze_frame_caches_on_the_face_not_the_snapshot(monkeypatch):
+    from vision.emotion_cache import EmotionCache
+    calls = []
+
+    class FakeDeepFace:
+        @staticmethod
+        def analyze(img, **kwargs):
+            calls.append(img)
+            return [{"dominant_emotion": "happy", "emotion": {"happy": 90.0}}]
+
+    cache = EmotionCache(maxsize=8, tolerance=4)
+    monkeypatch.setattr(ed, "get_emotion_model", lambda: None)
+    monkeypatch.setattr(ed, "get_deepface", lambda: FakeDeepFace)
+    monkeypatch.setattr(ed, "get_emotion_cache", lambda: cache)
+    monkeypatch.setattr(ed, "_extract_face", lambda frame: frame[150:174, 150:174])
+
+    rng = np.random.default_rng(3)
+    frame = rng.integers(0, 255, size=(320, 320, 3), dtype=np.uint8)
+    changed = frame.copy()
+    # Same background, new expression: the whole-snapshot hash does not change at all
+    changed[150:174, 150:174] = rng.integers(0, 255, size=(24, 24, 3), dtype=np.uint8)
+
+    ed.analyze_frame(frame)
+    ed.analyze_frame(frame.copy())
+    ed.analyze_frame(changed)
+    assert len(calls) == 2 and cache.stats()["hits"] == 1
+
+def test_graph_pool_affinity_and_bounds():
+    import threading
+    from vision.graph_pool import GraphPool
+
+    built, closed = [], []
+    def factory():
+        built.append(object())
+        return built[-1]
+    pool = GraphPool(factory, size=2, teardown=closed.append)
+
+    a = pool.checkout("a")
+    b = pool.checkout("b")
+    pool.checkin(a)
+    pool.checkin(b)
+    assert pool.checkout("a") is a # same session gets its own tracking graph back
+    pool.checkin(a)
+
+    # A third session takes over the least recently used graph, which is rebuilt
+    c = pool.checkout("c")
+    assert c is not b and closed == [b] and pool.stats()["rebuilds"] == 1
+
+    # The pool is bounded: a fourth caller waits for a checkin
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.checkout("d", timeout=2)))
+    held = pool.checkout("a")
+    waiter.start()
+    waiter.join(0.1)
+    assert not got
+    pool.checkin(held)
+    waiter.join(2)
+    assert len(got) == 1 and pool.stats()["graphs"] == 2
+    with pytest.raises(TimeoutError):
+        pool.checkout("e", timeout=0.05)
+
+    assert GraphPool(lambda: None).checkout("a") is None # MediaPipe missing
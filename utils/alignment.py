@@ -0,0 +1,245 @@
+import re
+import numpy as np
+from utils.config import EMOTION_LABELS, FILLER_WORDS
+
+_FILLER_RE = re.compile(r"\b(" + "|".join(re.escape(w) for w in FILLER_WORDS) + r")\b")
+
+
+class IntervalIndex:
+    """
+    Sorted, non-overlapping [start, end) intervals (questions, transcript segments).
+    locate() maps any number of timestamps to the interval containing them with one
+    np.searchsorted call, i.e. O(log n) per timestamp.
+    """
+
+    def __init__(self, starts, ends):
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        self._order = np.argsort(starts, kind="stable")
+        self._rank = np.empty_like(self._order)
+        self._rank[self._order] = np.arange(len(self._order))
+        self.starts = starts[self._order]
+        self.ends = ends[self._order]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def locate(self, times) -> np.ndarray:
+        """Original position of the interval containing each time, -1 where none does."""
+        times = np.asarray(times, dtype=np.float64)
+        if not len(self.starts):
+            return np.full(times.shape, -1, dtype=np.int64)
+        i = np.searchsorted(self.starts, times, side="right") - 1
+        safe = np.maximum(i, 0)
+        inside = (i >= 0) & (times < self.ends[safe])
+        return np.where(inside, self._order[safe], -1)
+
+    def bounds(self, position: int) -> tuple:
+        """(start, end) of the interval at original position."""
+        i = self._rank[position]
+        return float(self.starts[i]), float(self.ends[i])
+
+
+class EventSeries:
+    """
+    Time-sorted point events with optional integer codes and weights.
+    Prefix sums over codes and weights make the count, per-code histogram and
+    weight total of any [start, end) window two binary searches plus a subtraction.
+    """
+
+    def __init__(self, times, codes=None, n_codes: int = None, weights=None):
+        times = np.asarray(times, dtype=np.float64)
+        order = np.argsort(times, kind="stable")
+        self.times = times[order]
+        n = len(self.times)
+        self._code_cum = None
+        if codes is not None:
+            codes = np.asarray(codes, dtype=np.int64)[order]
+            n_codes = n_codes or (int(codes.max()) + 1 if n else 0)
+            onehot = np.zeros((n + 1, n_codes), dtype=np.int64)
+            onehot[np.arange(1, n + 1), codes] = 1
+            self._code_cum = np.cumsum(onehot, axis=0)
+        self._weight_cum = None
+        if weights is not None:
+            self._weight_cum = np.concatenate(([0.0], np.cumsum(np.asarray(weights, dtype=np.float64)[order])))
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def span(self, start: float = None, end: float = None) -> tuple:
+        """(lo, hi) positions of the events with start <= time < end (open ends allowed)."""
+        lo = 0 if start is None else int(np.searchsorted(self.times, start, side="left"))
+        hi = len(self.times) if end is None else int(np.searchsorted(self.times, end, side="left"))
+        return lo, max(lo, hi)
+
+    def count(self, start: float = None, end: float = None) -> int:
+        lo, hi = self.span(start, end)
+        return hi - lo
+
+    def code_counts(self, start: float = None, end: float = None) -> np.ndarray:
+        lo, hi = self.span(start, end)
+        return self._code_cum[hi] - self._code_cum[lo]
+
+    def total(self, start: float = None, end: float = None) -> float:
+        lo, hi = self.span(start, end)
+        return float(self._weight_cum[hi] - self._weight_cum[lo])
+
+
+def pauses_from_speech(speech_segments: list, min_pause: float = 0.5, offset: float = 0.0) -> list:
+    """
+    Gaps between speech segments (audio.vad.get_speech_segments output, clip-relative)
+    of at least min_pause seconds, as (start, end) in session time.
+    """
+    pauses = []
+    for (_, prev_end), (next_start, _) in zip(speech_segments, speech_segments[1:]):
+        if next_start - prev_end >= min_pause:
+            pauses.append((prev_end + offset, next_start + offset))
+    return pauses
+
+
+def filler_times(segments: list) -> list:
+    """
+    Estimated times of filler words in timed transcript segments ({'start', 'end', 'text'},
+    session time), interpolated by character position within each segment.
+    """
+    times = []
+    for seg in segments:
+        text = (seg.get("text") or "").lower()
+        if not text:
+            continue
+        duration = seg["end"] - seg["start"]
+        for m in _FILLER_RE.finditer(text):
+            times.append(seg["start"] + duration * m.start() / len(text))
+    return times
+
+
+class TimelineAlignment:
+    """
+    Joins every modality of one interview on the session clock (seconds since start).
+    Questions ({'start_offset', 'end_offset'}) and timed transcript segments are
+    interval indexes; emotion, stress, gaze, pause and filler samples are event
+    series. Any window query (a question, a STAR section of an answer, an arbitrary
+    span) costs O(log n) per modality, however long the interview.
+        alignment = TimelineAlignment(questions, emotions=timeline, gaze=gaze_samples)
+        alignment.stress_per_question()
+        alignment.section_summary(2, "result")["emotions"]
+    Timed transcript segments ({'start', 'end', 'text'}, e.g. Whisper's) are
+    clip-relative; segment_offset moves them onto the session clock. The live page
+    transcribes without timings, so there only questions, emotions, stress and gaze
+    are aligned; segments, pauses and fillers are for callers that have them.
+    """
+
+    def __init__(self, questions: list = None, emotions=None, gaze: list = None, segments: list = None,
+                 pauses: list = None, fillers: list = None, segment_offset: float = 0.0, gaze_labels: tuple = None):
+        from vision.emotion_timeline import EmotionTimeline
+        self.questions = list(questions or [])
+
+        # Question i runs until its end_offset, or until the next question starts
+        starts = [q.get("start_offset") for q in self.questions]
+        ends = []
+        for i, q in enumerate(self.questions):
+            end = q.get("end_offset")
+            if end is None:
+                end = next((s for s in starts[i + 1:] if s is not None), np.inf)
+            ends.append(end)
+        timed = [i for i, s in enumerate(starts) if s is not None]
+        self._question_ids = np.array(timed, dtype=np.int64)
+        self._question_pos = {index: pos for pos, index in enumerate(timed)}
+        self.question_index = IntervalIndex([starts[i] for i in timed], [ends[i] for i in timed])
+
+        self.segments = [dict(s, start=s["start"] + segment_offset, end=s["end"] + segment_offset)
+                         for s in (segments or [])]
+        self.segment_index = IntervalIndex([s["start"] for s in self.segments], [s["end"] for s in self.segments])
+
+        timeline = EmotionTimeline.coerce(emotions if emotions is not None else [])
+        self.emotions = EventSeries(timeline.timestamps, timeline.codes, len(EMOTION_LABELS))
+        self.stress = EventSeries(timeline.timestamps[timeline.stress_mask()])
+
+        if gaze_labels is None:
+            from vision.gaze_estimator import GAZE_LABELS
+            gaze_labels = GAZE_LABELS
+        self.gaze_labels = tuple(gaze_labels)
+        codes = {label: i for i, label in enumerate(self.gaze_labels)}
+        unknown = codes.get("unknown", len(codes) - 1)
+        gaze = list(gaze or [])
+        self.gaze = EventSeries([t for t, _ in gaze], [codes.get(label, unknown) for _, label in gaze],
+                                len(self.gaze_labels))
+
+        pauses = list(pauses or [])
+        self.pauses = EventSeries([s for s, _ in pauses], weights=[e - s for s, e in pauses])
+        self.fillers = EventSeries(fillers if fillers is not None else filler_times(self.segments))
+
+    # ── Point lookups ────────────────────────────────────────────────
+    def question_at(self, times) -> np.ndarray:
+        """Question index active at each time (-1 before the first or between questions)."""
+        pos = self.question_index.locate(times)
+        if not len(self._question_ids):
+            return pos
+        return np.where(pos >= 0, self._question_ids[np.maximum(pos, 0)], -1)
+
+    def segment_at(self, times) -> np.ndarray:
+        """Transcript segment index spoken at each time (-1 in silence)."""
+        return self.segment_index.locate(times)
+
+    def question_window(self, index: int) -> tuple:
+        """(start, end) of question index on the session clock; end may be inf for the last one."""
+        if index not in self._question_pos:
+            raise ValueError(f"Question {index} has no start time")
+        return self.question_index.bounds(self._question_pos[index])
+
+    # ── Window queries ───────────────────────────────────────────────
+    def window_summary(self, start: float, end: float = None) -> dict:
+        """Emotion counts, stress samples, gaze counts, pauses and fillers in [start, end)."""
+        if end is not None and np.isinf(end):
+            end = None
+        emotions = self.emotions.code_counts(start, end)
+        gaze = self.gaze.code_counts(start, end)
+        return {
+            "emotions": {EMOTION_LABELS[c]: int(n) for c, n in enumerate(emotions) if n},
+            "stress_count": self.stress.count(start, end),
+            "gaze": {self.gaze_labels[c]: int(n) for c, n in enumerate(gaze) if n},
+            "pauses": self.pauses.count(start, end),
+            "pause_seconds": round(self.pauses.total(start, end), 2),
+            "fillers": self.fillers.count(start, end)
+        }
+
+    def question_summary(self, index: int) -> dict:
+        return self.window_summary(*self.question_window(index))
+
+    def stress_per_question(self) -> list:
+        """Stress samples during each question (None for questions without a start time)."""
+        out = [None] * len(self.questions)
+        for pos, index in enumerate(self._question_ids):
+            start, end = self.question_index.bounds(pos)
+            out[int(index)] = self.stress.count(start, None if np.isinf(end) else end)
+        return out
+
+    def star_sections(self, index: int) -> dict:
+        """
+        {component: [(start, end), ...]} time spans of the answer's STAR sections.
+        Transcripts carry no word times, so sentence spans are placed on the question's
+        window in proportion to their character offsets. Empty for an open-ended window.
+        """
+        from nlp.star_detector import star_sentence_labels
+        text = self.questions[index].get("answer_transcript") or ""
+        start, end = self.question_window(index)
+        if not text.strip() or np.isinf(end):
+            return {}
+        scale = (end - start) / len(text)
+        sections = {}
+        for a, b, component in star_sentence_labels(text):
+            sections.setdefault(component, []).append((start + a * scale, start + b * scale))
+        return sections
+
+    def section_summary(self, index: int, component: str) -> dict:
+        """window_summary totals over the spans of one STAR section of answer index."""
+        total = {"emotions": {}, "stress_count": 0, "gaze": {}, "pauses": 0, "pause_seconds": 0.0, "fillers": 0}
+        for start, end in self.star_sections(index).get(component, []):
+            part = self.window_summary(start, end)
+            for key in ("emotions", "gaze"):
+                for label, n in part[key].items():
+                    total[key][label] = total[key].get(label, 0) + n
+            for key in ("stress_count", "pauses", "pause_seconds", "fillers"):
+                total[key] += part[key]
+        total["pause_seconds"] = round(total["pause_seconds"], 2)
+        return total
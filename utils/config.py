@@ -23,12 +23,80 @@ SCORING_WEIGHTS = {
     "professionalism": 0.10
 }
 
+# Optional JSON file of per-role rubrics ({role: {"weights", "keywords",
+# "benchmark_scores", "question_categories"}}) added to the built-in ones;
+# scoring plans are recompiled when it changes
+RUBRICS_PATH = os.getenv("RUBRICS_PATH", "data/rubrics.json")
+RUBRICS_REFRESH_SECONDS = float(os.getenv("RUBRICS_REFRESH_SECONDS", "5"))
+
+# Version of the raw feature rows stored per question and session; bump when
+# a feature's meaning or extraction changes so old rows can be told apart
+FEATURE_SCHEMA_VERSION = 1
+
+# Background threads scoring answers while the interview continues
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "2"))
+# Worker processes for pure-Python analysis stages (0 runs them on threads)
+# and the per-stage timeout (seconds) of end-of-interview analysis
+ANALYSIS_PROCESS_WORKERS = int(os.getenv("ANALYSIS_PROCESS_WORKERS", "2"))
+ANALYSIS_STAGE_TIMEOUT = float(os.getenv("ANALYSIS_STAGE_TIMEOUT", "30"))
+# How often (seconds) in-memory score indexes check the database for a bulk re-score
+SCORE_INDEX_REFRESH_SECONDS = float(os.getenv("SCORE_INDEX_REFRESH_SECONDS", "5"))
+# Worker processes analyzing an uploaded video inside the Streamlit server
+VIDEO_ANALYSIS_WORKERS = int(os.getenv("VIDEO_ANALYSIS_WORKERS", "2"))
+# Latency budget (seconds) of the whole end-of-interview analysis (0 disables)
+# and the expected cost of each stage: a stage that no longer fits in what is
+# left of the deadline runs its cheaper estimator and its features are marked
+# degraded (weighted down in fusion)
+ANALYSIS_DEADLINE = float(os.getenv("ANALYSIS_DEADLINE", "20"))
+ANALYSIS_STAGE_BUDGETS = {"nlp": 2.0, "star": 0.2, "keywords": 0.1}
+
+# Near-duplicate answer detection (MinHash LSH): signature length, LSH bands
+# (num_perm / bands rows each), word shingle size, shortest answer checked and
+# the similarity from which an answer counts as a near-duplicate (kept below 1,
+# the duplicate penalty ramps from it to an exact copy)
+DUPLICATE_NUM_PERM = int(os.getenv("DUPLICATE_NUM_PERM", "128"))
+DUPLICATE_BANDS = int(os.getenv("DUPLICATE_BANDS", "32"))
+DUPLICATE_SHINGLE_SIZE = 5
+DUPLICATE_MIN_WORDS = 20
+DUPLICATE_THRESHOLD = min(0.99, max(0.0, float(os.getenv("DUPLICATE_THRESHOLD", "0.5"))))
+TEMPLATE_ANSWERS_PATH = os.getenv("TEMPLATE_ANSWERS_PATH", "data/template_answers.json")
+
 # Filler words for audio/NLP analysis
 FILLER_WORDS = ["um", "uh", "like", "you know", "basically", "literally"]
 
 # Expected emotion labels from DeepFace
 EMOTION_LABELS = ["happy", "sad", "angry", "fear", "surprise", "neutral", "disgust"]
 
+# Per-frame vision graph: "holistic" runs one MediaPipe Holistic graph,
+# "shared" runs FaceMesh and Pose on the same converted frame
+VISION_PIPELINE = os.getenv("VISION_PIPELINE", "holistic")
+
+# MediaPipe graph instances per server process, i.e. how many interviews can
+# run vision at the same moment, and how long (seconds) a frame waits for one
+VISION_GRAPH_POOL_SIZE = int(os.getenv("VISION_GRAPH_POOL_SIZE", "4"))
+VISION_GRAPH_TIMEOUT = float(os.getenv("VISION_GRAPH_TIMEOUT", "10"))
+
+# Longest side (pixels) frames are downscaled to before MediaPipe and the
+# emotion detector; results are mapped back to full-resolution coordinates.
+# 0 analyzes at the capture resolution.
+VISION_ANALYSIS_SIZE = int(os.getenv("VISION_ANALYSIS_SIZE", "640"))
+
+# Number of face crops sent to the emotion model per forward pass
+EMOTION_BATCH_SIZE = int(os.getenv("EMOTION_BATCH_SIZE", "32"))
+
+# Emotion classifier backend: "onnx" runs an ONNX export under onnxruntime,
+# "deepface" the Keras model, "auto" uses ONNX when the export exists.
+# DeepFace remains the fallback whenever ONNX cannot be loaded.
+EMOTION_BACKEND = os.getenv("EMOTION_BACKEND", "auto").lower()
+EMOTION_ONNX_PATH = os.getenv("EMOTION_ONNX_PATH", os.path.join(MODEL_CACHE_DIR, "emotion.onnx"))
+# Intra-op threads for the ONNX session (0 picks min(4, CPU count))
+EMOTION_ONNX_THREADS = int(os.getenv("EMOTION_ONNX_THREADS", "0"))
+
+# Perceptual-hash cache for emotion results: max entries (0 disables) and
+# Hamming distance (out of 64 bits) under which two faces count as the same
+EMOTION_CACHE_SIZE = int(os.getenv("EMOTION_CACHE_SIZE", "256"))
+EMOTION_CACHE_TOLERANCE = int(os.getenv("EMOTION_CACHE_TOLERANCE", "4"))
+
 # Ensure directories exist
 os.makedirs(TEMP_DIR, exist_ok=True)
 os.makedirs("data", exist_ok=True)
@@ -1,6 +1,9 @@
+import uuid
 import streamlit as st
 from datetime import datetime
 from utils.db import save_session
+from vision.emotion_timeline import EmotionTimeline
+from scoring.incremental import IncrementalScorer
 
 def init_session_state():
     """Initializes default Streamlit session_state variables."""
@@ -17,7 +20,7 @@ def init_session_state():
     if 'start_time' not in st.session_state:
         st.session_state.start_time = None
     if 'emotions_timeline' not in st.session_state:
-        st.session_state.emotions_timeline = []
+        st.session_state.emotions_timeline = EmotionTimeline()
     if 'current_answer_transcript' not in st.session_state:
         st.session_state.current_answer_transcript = ""
 
@@ -34,21 +37,81 @@ def start_interview(candidate_info: dict, role: str, questions: list):
             "category": q.get("category", ""),
             "id": q.get("id"),
             "answer_transcript": "",
-            "score": 0.0
+            "score": 0.0,
+            "start_offset": None,
+            "end_offset": None
         })
+    if st.session_state.questions:
+        st.session_state.questions[0]["start_offset"] = 0.0
         
     st.session_state.current_q_index = 0
     st.session_state.interview_active = True
     st.session_state.paused = False
     st.session_state.start_time = datetime.utcnow()
-    st.session_state.emotions_timeline = []
+    st.session_state.emotions_timeline = EmotionTimeline()
+    st.session_state.gaze_acc = None  # vision.gaze_estimator.GazeAccumulator, created on the first face
     st.session_state.current_answer_transcript = ""
+    # Answers are scored in the background as each question is committed
+    st.session_state.scorer = _new_scorer()
+    # Keys this interview's frames to its own MediaPipe tracking graphs
+    st.session_state.vision_session = uuid.uuid4().hex
+
+def _new_scorer() -> IncrementalScorer:
+    """Scorer matching the JD keywords, or the role's rubric keywords when there is no JD."""
+    from nlp.keyword_matcher import extract_jd_keywords
+    from scoring.rubric import get_scoring_plan
+    info = st.session_state.candidate_info
+    jd_text = info.get("jd_text", "")
+    return IncrementalScorer(extract_jd_keywords(jd_text) if jd_text else [],
+                             plan=get_scoring_plan(info.get("role", "")))
+
+def _get_scorer() -> IncrementalScorer:
+    if 'scorer' not in st.session_state:
+        st.session_state.scorer = _new_scorer()
+    return st.session_state.scorer
+
+def _commit_current_answer(idx: int):
+    """Saves the pending answer text to question idx without wiping one recorded directly on it."""
+    if 0 <= idx < len(st.session_state.questions) and st.session_state.current_answer_transcript:
+        st.session_state.questions[idx]['answer_transcript'] = st.session_state.current_answer_transcript
+
+def _close_question(idx: int, elapsed: float):
+    """Records when question idx stopped being the active one (seconds since start)."""
+    if 0 <= idx < len(st.session_state.questions):
+        q = st.session_state.questions[idx]
+        if q.get("end_offset") is None:
+            q["end_offset"] = elapsed
+
+def _submit_question(idx: int):
+    """Starts background scoring of a committed question."""
+    q = st.session_state.questions[idx]
+    _get_scorer().submit(idx, q.get("answer_transcript", ""), q.get("text", ""))
+
+def _apply_scores(indices: list):
+    """Copies folded features onto the questions (runs on the script thread)."""
+    from scoring.features import question_score, window_emotions
+    scorer = _get_scorer()
+    emotions = st.session_state.emotions_timeline
+    for idx in indices:
+        q = st.session_state.questions[idx]
+        features = scorer.features[idx]
+        features["start_offset"] = q.get("start_offset")
+        features["end_offset"] = q.get("end_offset")
+        if "emotion_counts" not in features:
+            features.update(window_emotions(emotions, features["start_offset"], features["end_offset"]))
+        q["score"] = question_score(features)
+
+def _collect_scores():
+    """Folds background results that have finished so far."""
+    _apply_scores(_get_scorer().collect())
 
 def end_interview():
-    """Finishes the interview, triggers scoring, handles DB save."""
+    """Finishes the interview: waits for answers still being scored, fuses and saves."""
+    idx = st.session_state.current_q_index
+    duration_secs = (datetime.utcnow() - st.session_state.start_time).total_seconds()
     # Ensure active answer is saved to current question
-    if st.session_state.questions and st.session_state.current_q_index < len(st.session_state.questions):
-        st.session_state.questions[st.session_state.current_q_index]['answer_transcript'] = st.session_state.current_answer_transcript
+    _commit_current_answer(idx)
+    _close_question(idx, duration_secs)
 
     st.session_state.interview_active = False
     st.session_state.paused = False
@@ -63,111 +126,45 @@ def end_interview():
         "emotions": st.session_state.emotions_timeline,
     }
     
-    # ── Real NLP Analysis on Transcripts ──────────────────────────────
-    from scoring.rubric import load_rubric
-    from scoring.fusion import fuse_scores
-    from nlp.engine import analyze_answer, get_answer_sentiment_arc
-    from nlp.star_detector import detect_star_components
-    from nlp.keyword_matcher import match_answer_to_jd
+    from scoring.rubric import get_scoring_plan
+    from scoring.fusion import fuse_scores, fusion_features
+    from scoring.features import fusion_inputs_from_totals
     
     role = st.session_state.candidate_info.get("role", "software_engineer")
-    rubric = load_rubric(role)
-    jd_text = st.session_state.candidate_info.get("jd_text", "")
-    
-    # Analyze each question's transcript with real NLP
-    all_transcripts = []
-    total_word_count = 0
-    total_vocab_score = 0
-    total_completeness = 0
-    total_sentiment = 0
-    total_star = 0
-    total_keyword_coverage = 0
-    scored_count = 0
-    
-    for q in st.session_state.questions:
-        transcript = q.get("answer_transcript", "")
-        all_transcripts.append(transcript)
-        
-        if transcript.strip():
-            # Run NLP engine analysis
-            nlp_result = analyze_answer(transcript, q.get("text", ""))
-            star_result = detect_star_components(transcript)
-            
-            # Keyword matching against JD if provided
-            if jd_text:
-                kw_result = match_answer_to_jd(transcript, jd_text)
-                kw_coverage = kw_result.get("coverage_percent", 50)
-            else:
-                kw_coverage = 50  # Default when no JD
-            
-            # Per-question score: weighted combo of NLP metrics
-            q_score = (
-                nlp_result["vocabulary_score"] * 0.2 +
-                nlp_result["completeness"] * 0.2 +
-                nlp_result["sentiment"] * 0.15 +
-                star_result["star_score"] * 0.25 +
-                kw_coverage * 0.2
-            )
-            q["score"] = round(min(100, max(0, q_score)), 1)
-            
-            # Accumulate for fusion
-            total_vocab_score += nlp_result["vocabulary_score"]
-            total_completeness += nlp_result["completeness"]
-            total_sentiment += nlp_result["sentiment"]
-            total_star += star_result["star_score"]
-            total_keyword_coverage += kw_coverage
-            total_word_count += len(transcript.split())
-            scored_count += 1
-        else:
-            q["score"] = 0.0
-    
-    # Compute averages for fusion
-    n = max(1, scored_count)
-    avg_vocab = total_vocab_score / n
-    avg_completeness = total_completeness / n
-    avg_sentiment = total_sentiment / n
-    avg_star = total_star / n
-    avg_kw = total_keyword_coverage / n
-    
-    # Estimate WPM from total words and interview duration
-    duration_secs = (datetime.utcnow() - st.session_state.start_time).total_seconds()
-    estimated_wpm = (total_word_count / max(1, duration_secs)) * 60
-    
-    # Build realistic fusion inputs from actual data
-    audio_data = {
-        "wpm": round(estimated_wpm),
-        "fillers": {},
-        "voice_confidence": round(min(100, avg_sentiment * 0.5 + avg_completeness * 0.5)),
-        "silence_ratio": 0.15 if scored_count > 0 else 0.9
-    }
+    plan = get_scoring_plan(role)
     
+    # Earlier answers were scored while the interview ran; the rest run concurrently
+    # as one stage graph and the in-flight ones are waited for
+    scorer = _get_scorer()
+    _apply_scores(scorer.finish(st.session_state.questions, st.session_state.emotions_timeline))
+    question_features = [scorer.features[i] for i in range(len(st.session_state.questions))]
+
+    # Flag answers nearly duplicating other candidates' or public template answers
+    from nlp.duplicate_detector import check_answers
+    checks = check_answers([q.get("answer_transcript", "") for q in st.session_state.questions])
+    for features, check in zip(question_features, checks):
+        features.update(check)
+        if features.get("answered"):
+            scorer.totals["duplicate_similarity"] = max(scorer.totals["duplicate_similarity"],
+                                                        check["duplicate_similarity"])
+
     # Use real emotion data if captured
-    emotions_list = st.session_state.emotions_timeline
-    emotion_summary = {}
-    stress_count = 0
-    for e in emotions_list:
-        emo = e.get("emotion", "neutral")
-        emotion_summary[emo] = emotion_summary.get(emo, 0) + 1
-        if emo in ["fear", "angry", "disgust"]:
-            stress_count += 1
-    
+    emotions = EmotionTimeline.coerce(st.session_state.emotions_timeline)
+    emotion_summary = emotions.counts()
+    stress_count = emotions.stress_count()
     eye_contact_pct = st.session_state.candidate_info.get("eye_contact_percent", 70)
     posture_val = st.session_state.candidate_info.get("posture_summary", "upright")
     
-    vision_data = {
-        "eye_contact_percent": eye_contact_pct,
-        "posture": posture_val,
-        "emotion_summary": emotion_summary,
-        "stress_spikes": stress_count
-    }
-    
-    nlp_data = {
-        "vocabulary_score": round(avg_vocab, 1),
-        "completeness": round(avg_completeness, 1),
-        "keyword_coverage_percent": round(avg_kw, 1),
-        "star_score": round(avg_star, 1),
-        "sentiment": round(avg_sentiment, 1)
-    }
+    audio_data, vision_data, nlp_data, scored_count = fusion_inputs_from_totals(
+        scorer.totals, duration_secs, emotion_summary, stress_count, eye_contact_pct, posture_val
+    )
+    session_data["question_features"] = question_features
+    session_data["session_features"] = dict(
+        fusion_features(audio_data, vision_data, nlp_data),
+        answered_questions=scored_count,
+        duration_seconds=duration_secs,
+        emotion_counts=emotion_summary
+    )
     
     if scored_count == 0:
         session_data["overall_score"] = 0.0
@@ -181,7 +178,7 @@ def end_interview():
             "professionalism": 0.0
         }
     else:
-        fusion_result = fuse_scores(audio_data, vision_data, nlp_data, rubric)
+        fusion_result = fuse_scores(audio_data, vision_data, nlp_data, plan)
         
         session_data["overall_score"] = fusion_result["overall_score"]
         session_data["grade"] = fusion_result["grade"]
@@ -203,15 +200,19 @@ def get_current_question() -> str:
 def next_question():
     """Advances to the next question."""
     idx = st.session_state.current_q_index
+    elapsed = (datetime.utcnow() - st.session_state.start_time).total_seconds()
     
     # Save transcript to current question before moving
-    if idx < len(st.session_state.questions):
-        st.session_state.questions[idx]['answer_transcript'] = st.session_state.current_answer_transcript
-    
+    _commit_current_answer(idx)
     st.session_state.current_answer_transcript = "" # Clear for next question
     
     if idx < len(st.session_state.questions) - 1:
+        _close_question(idx, elapsed)
+        # Score the committed answer in the background while the next question runs
+        _submit_question(idx)
+        _collect_scores()
         st.session_state.current_q_index += 1
+        st.session_state.questions[idx + 1]["start_offset"] = elapsed
     else:
         end_interview()
 
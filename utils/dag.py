@@ -0,0 +1,183 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+EXECUTORS = ("thread", "process", "inline")
+# How often (seconds) run() checks whether queued stages with a timeout have started
+_QUEUE_POLL = 0.05
+
+
+class _Stage:
+    __slots__ = ("name", "fn", "args", "deps", "executor", "timeout", "default", "fallback", "budget")
+
+    def __init__(self, name, fn, args, deps, executor, timeout, default, fallback, budget):
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.deps = deps
+        self.executor = executor
+        self.timeout = timeout
+        self.default = default
+        self.fallback = fallback
+        self.budget = budget
+
+
+class StageGraph:
+    """
+    Small DAG executor for analysis stages.
+    Each stage is fn(*args, *dep_results) and runs as soon as its dependencies have
+    finished: on a thread pool (model calls that release the GIL), a process pool
+    (pure-Python work; fn and arguments must be picklable) or inline on the caller's
+    thread (cheap glue and joins). A stage that exceeds its timeout, or raises,
+    yields its fallback's result (a cheaper estimator run inline on the same
+    arguments) or else its default, so downstream stages and the final join still
+    run. With a run deadline, a pooled stage only starts while at least its budget
+    (expected seconds) remains and is never waited for past the deadline; otherwise
+    it degrades straight away. Stages whose result did not come from fn are listed
+    in `degraded`, and those of them left with their default (no fallback, or the
+    fallback failed too) also in `defaulted`.
+        graph = StageGraph()
+        graph.add("nlp", analyze_answer, args=(text, question), executor="thread", timeout=20)
+        graph.add("star", detect_star_components, args=(text,), executor="process")
+        graph.add("features", merge, deps=("nlp", "star"), executor="inline")
+        results = graph.run(thread_pool, process_pool)
+    """
+
+    def __init__(self):
+        self._stages = {}
+        self.timed_out = []
+        self.failed = []
+        self.durations = {}
+        self.degraded = []
+        self.defaulted = []
+
+    def add(self, name: str, fn, args: tuple = (), deps: tuple = (), executor: str = "thread",
+            timeout: float = None, default=None, fallback=None, budget: float = None):
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage '{name}'")
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}', expected one of {EXECUTORS}")
+        missing = [d for d in deps if d not in self._stages]
+        if missing:
+            # Stages are added in dependency order, which also rules out cycles
+            raise ValueError(f"Stage '{name}' depends on unknown stages {missing}")
+        self._stages[name] = _Stage(name, fn, tuple(args), tuple(deps), executor, timeout, default, fallback, budget)
+        return self
+
+    def __len__(self) -> int:
+        return len(self._stages)
+
+    def _settle(self, stage, results, args=(), value=None, error=None, timed_out=False):
+        if timed_out:
+            self.timed_out.append(stage.name)
+            print(f"Warning: stage '{stage.name}' timed out")
+            value = self._degrade(stage, args)
+        elif error is not None:
+            self.failed.append(stage.name)
+            print(f"Warning: stage '{stage.name}' failed: {error}")
+            value = self._degrade(stage, args)
+        results[stage.name] = value
+
+    def _degrade(self, stage, args):
+        """Result of the stage's fallback, or its default when there is none or it fails too."""
+        self.degraded.append(stage.name)
+        if stage.fallback is not None:
+            try:
+                return stage.fallback(*args)
+            except Exception as e:
+                print(f"Warning: fallback of stage '{stage.name}' failed: {e}")
+        self.defaulted.append(stage.name)
+        return stage.default
+
+    def run(self, thread_pool=None, process_pool=None, deadline: float = None) -> dict:
+        """
+        Runs every stage and returns {stage name: result} once all have settled.
+        Without a process pool, process stages run on the thread pool; without a
+        thread pool, thread stages run inline. deadline (seconds from now) bounds
+        how long pooled stages are waited for. A stage's own timeout counts from
+        when a worker picks it up, not from when it was queued.
+        """
+        results = {}
+        deadline_at = None if deadline is None else time.monotonic() + deadline
+        waiting = dict(self._stages)
+        running = {}  # future -> [stage, args, started (None while queued)]
+
+        def executor_for(stage):
+            if stage.executor == "process" and process_pool is not None:
+                return process_pool
+            if stage.executor in ("thread", "process") and thread_pool is not None:
+                return thread_pool
+            return None
+
+        def stage_deadline(stage, started):
+            limits = [] if deadline_at is None else [deadline_at]
+            if stage.timeout is not None and started is not None:
+                limits.append(started + stage.timeout)
+            return min(limits) if limits else None
+
+        while waiting or running:
+            ready = [s for s in waiting.values() if all(d in results for d in s.deps)]
+            ran_inline = False
+            for stage in ready:
+                del waiting[stage.name]
+                args = stage.args + tuple(results[d] for d in stage.deps)
+                pool = executor_for(stage)
+                started = time.perf_counter()
+                remaining = None if deadline_at is None else deadline_at - time.monotonic()
+                if pool is not None and remaining is not None and remaining < (stage.budget or 0.0):
+                    # Not enough time left for the full stage: go straight to its cheaper estimate
+                    results[stage.name] = self._degrade(stage, args)
+                    self.durations[stage.name] = time.perf_counter() - started
+                    ran_inline = True
+                    continue
+                if pool is None:
+                    try:
+                        self._settle(stage, results, args, value=stage.fn(*args))
+                    except Exception as e:
+                        self._settle(stage, results, args, error=e)
+                    self.durations[stage.name] = time.perf_counter() - started
+                    ran_inline = True
+                    continue
+                running[pool.submit(stage.fn, *args)] = [stage, args, None]
+
+            if ran_inline:
+                # Inline results may have unblocked further stages
+                continue
+            if not running:
+                break
+
+            # Start the clock of stages a worker has picked up since the last pass;
+            # while any timed stage is still queued, wake up periodically to notice
+            now = time.monotonic()
+            deadlines, queued = [], False
+            for future, entry in running.items():
+                if entry[2] is None and future.running():
+                    entry[2] = now
+                if entry[2] is None and entry[0].timeout is not None:
+                    queued = True
+                d = stage_deadline(entry[0], entry[2])
+                if d is not None:
+                    deadlines.append(d)
+            timeout = max(0.0, min(deadlines) - now) if deadlines else None
+            if queued:
+                timeout = _QUEUE_POLL if timeout is None else min(timeout, _QUEUE_POLL)
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, args, started = running.pop(future)
+                self.durations[stage.name] = 0.0 if started is None else time.monotonic() - started
+                try:
+                    self._settle(stage, results, args, value=future.result())
+                except Exception as e:
+                    self._settle(stage, results, args, error=e)
+
+            now = time.monotonic()
+            for future, (stage, args, started) in list(running.items()):
+                if started is None and future.running():
+                    started = running[future][2] = now
+                d = stage_deadline(stage, started)
+                if d is not None and now >= d and not future.done():
+                    # A running thread cannot be interrupted; its result is simply dropped
+                    future.cancel()
+                    del running[future]
+                    self.durations[stage.name] = 0.0 if started is None else now - started
+                    self._settle(stage, results, args, timed_out=True)
+        return results
@@ -1,8 +1,9 @@
 import os
-from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Text
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, ForeignKey, Text, update, bindparam
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship
-from utils.config import DB_PATH
+from utils.config import DB_PATH, FEATURE_SCHEMA_VERSION
 
 Base = declarative_base()
 
@@ -23,11 +24,14 @@ class Session(Base):
     end_time = Column(DateTime, nullable=True)
     overall_score = Column(Float, nullable=True)
     grade = Column(String(10), nullable=True)
+    rescored_at = Column(DateTime, nullable=True)  # last scoring.rescore write
     
     candidate = relationship("Candidate", back_populates="sessions")
     questions = relationship("Question", back_populates="session", cascade="all, delete-orphan")
     emotions = relationship("EmotionLog", back_populates="session", cascade="all, delete-orphan")
     score_breakdown = relationship("ScoreBreakdown", uselist=False, back_populates="session", cascade="all, delete-orphan")
+    features = relationship("SessionFeatures", uselist=False, back_populates="session", cascade="all, delete-orphan")
+    question_features = relationship("QuestionFeatures", back_populates="session", cascade="all, delete-orphan")
 
 class Question(Base):
     __tablename__ = 'questions'
@@ -63,13 +67,102 @@ class ScoreBreakdown(Base):
     
     session = relationship("Session", back_populates="score_breakdown")
 
+class SessionFeatures(Base):
+    """Session-level fusion inputs (scoring.fusion.FUSION_FEATURES) as computed at interview time."""
+    __tablename__ = 'session_features'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(Integer, ForeignKey('sessions.id'), nullable=False, unique=True)
+    schema_version = Column(Integer, nullable=False, default=FEATURE_SCHEMA_VERSION)
+    answered_questions = Column(Integer, nullable=False, default=0)
+    duration_seconds = Column(Float, nullable=True)
+    vocabulary_score = Column(Float, nullable=True)
+    wpm = Column(Float, nullable=True)
+    filler_count = Column(Integer, nullable=True)
+    voice_confidence = Column(Float, nullable=True)
+    eye_contact_percent = Column(Float, nullable=True)
+    posture = Column(String(20), nullable=True)
+    keyword_coverage_percent = Column(Float, nullable=True)
+    star_score = Column(Float, nullable=True)
+    completeness = Column(Float, nullable=True)
+    sentiment = Column(Float, nullable=True)
+    happy_count = Column(Integer, nullable=True)
+    emotion_total = Column(Integer, nullable=True)
+    emotion_labels = Column(Integer, nullable=True)
+    silence_ratio = Column(Float, nullable=True)
+    stress_spikes = Column(Integer, nullable=True)
+    duplicate_similarity = Column(Float, nullable=True)
+    # Share of answers each degradable feature was fully computed for (NULL = all)
+    vocabulary_score_availability = Column(Float, nullable=True)
+    completeness_availability = Column(Float, nullable=True)
+    sentiment_availability = Column(Float, nullable=True)
+    star_score_availability = Column(Float, nullable=True)
+    keyword_coverage_percent_availability = Column(Float, nullable=True)
+    emotion_counts = Column(Text, nullable=True)  # JSON {label: count}
+
+    session = relationship("Session", back_populates="features")
+
+class QuestionFeatures(Base):
+    """Raw per-question model outputs, so scores can be recomputed without rerunning the models."""
+    __tablename__ = 'question_features'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(Integer, ForeignKey('sessions.id'), nullable=False, index=True)
+    question_id = Column(Integer, ForeignKey('questions.id'), nullable=True)
+    question_index = Column(Integer, nullable=False)
+    schema_version = Column(Integer, nullable=False, default=FEATURE_SCHEMA_VERSION)
+    answered = Column(Integer, nullable=False, default=0)
+    start_offset = Column(Float, nullable=True)  # seconds since the interview started
+    end_offset = Column(Float, nullable=True)
+    word_count = Column(Integer, nullable=False, default=0)
+    vocabulary_score = Column(Float, nullable=True)
+    completeness = Column(Float, nullable=True)
+    sentiment = Column(Float, nullable=True)
+    star_score = Column(Float, nullable=True)
+    keyword_coverage_percent = Column(Float, nullable=True)
+    stress_count = Column(Integer, nullable=True)
+    emotion_counts = Column(Text, nullable=True)  # JSON {label: count}
+    duplicate_similarity = Column(Float, nullable=True)
+    duplicate_matches = Column(Text, nullable=True)  # JSON list of nlp.duplicate_detector matches
+    degraded = Column(Text, nullable=True)  # JSON list of features from a deadline fallback
+
+    session = relationship("Session", back_populates="question_features")
+
 # Database initialization and Session maker
 engine = create_engine(f"sqlite:///{DB_PATH}")
 SessionLocal = sessionmaker(bind=engine)
 
+# Callbacks fn(event, session_id, row) run after a session is saved ("save", with its
+# scores row as yielded by iter_session_scores) or deleted ("delete", row None)
+_session_listeners = []
+
+def add_session_listener(fn) -> None:
+    if fn not in _session_listeners:
+        _session_listeners.append(fn)
+
+def _notify_session_change(event: str, session_id: int, row: dict = None) -> None:
+    for fn in _session_listeners:
+        try:
+            fn(event, session_id, row)
+        except Exception as e:
+            print(f"Warning: session listener failed: {e}")
+
 def create_tables() -> None:
     """Creates all tables in the SQLite database if they don't exist."""
     Base.metadata.create_all(engine)
+    _add_missing_columns()
+
+def _add_missing_columns() -> None:
+    """Adds nullable columns introduced after a table was first created (create_all skips existing tables)."""
+    from sqlalchemy import inspect, text
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                                      f"{column.type.compile(engine.dialect)}"))
 
 def save_session(session_data: dict) -> int:
     """
@@ -117,6 +210,7 @@ def save_session(session_data: dict) -> int:
 
         # Save Questions/Answers
         questions_list = session_data.get('questions', [])
+        db_questions = []
         for q in questions_list:
             db_q = Question(
                 session_id=new_session.id,
@@ -125,19 +219,74 @@ def save_session(session_data: dict) -> int:
                 score=q.get('score', 0.0)
             )
             db.add(db_q)
+            db_questions.append(db_q)
+
+        # Raw features behind the scores
+        question_features = session_data.get('question_features', [])
+        if question_features:
+            db.flush()
+        for idx, f in enumerate(question_features):
+            db.add(QuestionFeatures(
+                session_id=new_session.id,
+                question_id=db_questions[idx].id if idx < len(db_questions) else None,
+                question_index=idx,
+                schema_version=FEATURE_SCHEMA_VERSION,
+                answered=int(bool(f.get('answered'))),
+                start_offset=f.get('start_offset'),
+                end_offset=f.get('end_offset'),
+                word_count=f.get('word_count', 0),
+                vocabulary_score=f.get('vocabulary_score'),
+                completeness=f.get('completeness'),
+                sentiment=f.get('sentiment'),
+                star_score=f.get('star_score'),
+                keyword_coverage_percent=f.get('keyword_coverage_percent'),
+                stress_count=f.get('stress_count'),
+                emotion_counts=json.dumps(f.get('emotion_counts', {})),
+                duplicate_similarity=f.get('duplicate_similarity'),
+                duplicate_matches=json.dumps(f.get('duplicate_matches', [])),
+                degraded=json.dumps(f.get('degraded', []))
+            ))
+
+        sf = session_data.get('session_features')
+        if sf:
+            columns = set(SessionFeatures.__table__.columns.keys()) - {'id', 'session_id', 'schema_version', 'emotion_counts'}
+            db.add(SessionFeatures(
+                session_id=new_session.id,
+                schema_version=FEATURE_SCHEMA_VERSION,
+                emotion_counts=json.dumps(sf.get('emotion_counts', {})),
+                **{k: v for k, v in sf.items() if k in columns}
+            ))
 
         # Optional: Save emotion logs if provided
         emotion_logs = session_data.get('emotions', [])
         for e in emotion_logs:
+            timestamp = e.get('timestamp', datetime.utcnow())
+            if isinstance(timestamp, (int, float)):
+                # Live timelines store seconds elapsed since the interview started
+                timestamp = new_session.start_time + timedelta(seconds=float(timestamp))
             db_e = EmotionLog(
                 session_id=new_session.id,
                 emotion=e.get('emotion', 'neutral'),
                 confidence=e.get('confidence', 0.0),
-                timestamp=e.get('timestamp', datetime.utcnow())
+                timestamp=timestamp
             )
             db.add(db_e)
 
         db.commit()
+        _notify_session_change("save", new_session.id, {
+            "session_id": new_session.id,
+            "role": candidate.role,
+            "grade": new_session.grade,
+            "overall_score": new_session.overall_score,
+            "communication": sb.communication,
+            "confidence": sb.confidence_score,
+            "technical": sb.technical,
+            "emotional_iq": sb.emotional_iq,
+            "engagement": sb.engagement,
+            "professionalism": sb.professionalism,
+            # Stored fusion inputs, as iter_session_scores(feature_columns=...) returns them
+            **{k: v for k, v in (sf or {}).items() if k in SessionFeatures.__table__.columns.keys() and k != 'emotion_counts'}
+        })
         return new_session.id
     except Exception as e:
         db.rollback()
@@ -206,6 +355,7 @@ def delete_session(session_id: int) -> bool:
         if s:
             db.delete(s)
             db.commit()
+            _notify_session_change("delete", session_id)
             return True
         return False
     except Exception as e:
@@ -214,3 +364,149 @@ def delete_session(session_id: int) -> bool:
         return False
     finally:
         db.close()
+
+def scores_version():
+    """
+    Time of the last bulk re-score (None if never). In-memory indexes over session
+    scores compare it to rebuild after scoring.rescore rewrote scores, possibly
+    from another process, which the save/delete listeners never see.
+    """
+    from sqlalchemy import func, select
+    with engine.connect() as conn:
+        return conn.execute(select(func.max(Session.__table__.c.rescored_at))).scalar()
+
+def iter_session_scores(batch_size: int = 1000, feature_columns: tuple = ()):
+    """
+    Yields {'session_id', 'role', 'grade', 'overall_score', <six dimensions>} for every scored session,
+    plus the given session_features columns (None for sessions stored without features).
+    """
+    sessions, candidates, breakdowns = Session.__table__, Candidate.__table__, ScoreBreakdown.__table__
+    features = SessionFeatures.__table__
+    query = (
+        sessions.select()
+        .with_only_columns(
+            sessions.c.id.label("session_id"), candidates.c.role, sessions.c.grade, sessions.c.overall_score,
+            breakdowns.c.communication, breakdowns.c.confidence_score.label("confidence"), breakdowns.c.technical,
+            breakdowns.c.emotional_iq, breakdowns.c.engagement, breakdowns.c.professionalism,
+            *(features.c[name] for name in feature_columns)
+        )
+        .join(candidates, candidates.c.id == sessions.c.candidate_id)
+        .join(breakdowns, breakdowns.c.session_id == sessions.c.id)
+    )
+    if feature_columns:
+        query = query.outerjoin(features, features.c.session_id == sessions.c.id)
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=batch_size).execute(query)
+        for row in result.mappings():
+            yield dict(row)
+
+def iter_answer_transcripts(session_ids: list = None, batch_size: int = 1000):
+    """Yields {'session_id', 'question_index', 'answer_transcript'} for every non-empty stored answer."""
+    questions = Question.__table__
+    query = (
+        questions.select()
+        .with_only_columns(questions.c.session_id, questions.c.answer_transcript)
+        .order_by(questions.c.session_id, questions.c.id)
+    )
+    if session_ids is not None:
+        query = query.where(questions.c.session_id.in_(list(session_ids)))
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=batch_size).execute(query)
+        current, index = None, 0
+        for row in result.mappings():
+            # Questions are stored in interview order, so the position within a session is its index
+            if row["session_id"] != current:
+                current, index = row["session_id"], 0
+            else:
+                index += 1
+            if row["answer_transcript"]:
+                yield {"session_id": row["session_id"], "question_index": index,
+                       "answer_transcript": row["answer_transcript"]}
+
+def load_session_features(schema_version: int = FEATURE_SCHEMA_VERSION):
+    """
+    Stored session-level fusion inputs as a DataFrame (one row per session, with session_id
+    and the candidate's role), ready for scoring.fusion.fuse_scores_batch. Only rows of the
+    given schema version are returned.
+    """
+    import pandas as pd
+    table, sessions, candidates = SessionFeatures.__table__, Session.__table__, Candidate.__table__
+    query = (
+        table.select()
+        .add_columns(candidates.c.role)
+        .join(sessions, sessions.c.id == table.c.session_id)
+        .join(candidates, candidates.c.id == sessions.c.candidate_id)
+        .where(table.c.schema_version == schema_version)
+    )
+    with engine.connect() as conn:
+        df = pd.read_sql(query, conn)
+    df["emotion_counts"] = df["emotion_counts"].map(lambda s: json.loads(s) if s else {})
+    return df.drop(columns=["id"])
+
+def load_question_features(session_ids: list = None, schema_version: int = FEATURE_SCHEMA_VERSION):
+    """Stored per-question features as a DataFrame, optionally limited to some sessions."""
+    import pandas as pd
+    table = QuestionFeatures.__table__
+    query = table.select().where(table.c.schema_version == schema_version)
+    if session_ids is not None:
+        query = query.where(table.c.session_id.in_(list(session_ids)))
+    query = query.order_by(table.c.session_id, table.c.question_index)
+    with engine.connect() as conn:
+        df = pd.read_sql(query, conn)
+    df["emotion_counts"] = df["emotion_counts"].map(lambda s: json.loads(s) if s else {})
+    df["duplicate_matches"] = df["duplicate_matches"].map(lambda s: json.loads(s) if s else [])
+    df["degraded"] = df["degraded"].map(lambda s: json.loads(s) if s else [])
+    df["answered"] = df["answered"].astype(bool)
+    return df.drop(columns=["id"])
+
+def update_session_scores(rows, chunk_size: int = 5000) -> int:
+    """
+    Bulk-writes re-computed scores back to existing sessions.
+    rows is an iterable of dicts with 'session_id', 'overall_score', 'grade' and the
+    six breakdown dimensions (as produced by scoring.rescore). Updates are sent as
+    executemany batches of chunk_size rows, each chunk in one transaction.
+    Returns the number of rows written.
+    """
+    sessions, breakdowns = Session.__table__, ScoreBreakdown.__table__
+    session_stmt = update(sessions).where(sessions.c.id == bindparam("b_id")).values(
+        overall_score=bindparam("b_overall"), grade=bindparam("b_grade"), rescored_at=bindparam("b_rescored_at")
+    )
+    breakdown_stmt = update(breakdowns).where(breakdowns.c.session_id == bindparam("b_id")).values(
+        communication=bindparam("b_communication"),
+        confidence_score=bindparam("b_confidence"),
+        technical=bindparam("b_technical"),
+        emotional_iq=bindparam("b_emotional_iq"),
+        engagement=bindparam("b_engagement"),
+        professionalism=bindparam("b_professionalism")
+    )
+
+    written = 0
+    chunk = []
+    rescored_at = datetime.utcnow()  # bumps scores_version() for in-memory indexes
+
+    def flush():
+        with engine.begin() as conn:
+            conn.execute(session_stmt, chunk)
+            conn.execute(breakdown_stmt, chunk)
+
+    for r in rows:
+        chunk.append({
+            "b_id": int(r["session_id"]),
+            "b_overall": float(r["overall_score"]),
+            "b_grade": r["grade"],
+            "b_rescored_at": rescored_at,
+            "b_communication": float(r["communication"]),
+            "b_confidence": float(r["confidence"]),
+            "b_technical": float(r["technical"]),
+            "b_emotional_iq": float(r["emotional_iq"]),
+            "b_engagement": float(r["engagement"]),
+            "b_professionalism": float(r["professionalism"])
+        })
+        if len(chunk) >= chunk_size:
+            flush()
+            written += len(chunk)
+            chunk = []
+    if chunk:
+        flush()
+        written += len(chunk)
+    return written
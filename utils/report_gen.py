@@ -4,6 +4,7 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from utils.db import get_session_by_id
+from nlp.star_detector import highlight_star_segments
 
 def generate_report(session_id: int, charts_data: dict = None) -> str:
     """
@@ -79,6 +80,11 @@ def generate_report(session_id: int, charts_data: dict = None) -> str:
     for q in questions:
         elements.append(Paragraph(f"<b>Q:</b> {q.get('text', '')}", normal_style))
         elements.append(Paragraph(f"<i>Ans:</i> {q.get('transcript', '')}", normal_style))
+        segments = highlight_star_segments(q.get('transcript') or '')
+        if sum(1 for v in segments.values() if v) > 1:
+            for comp, seg in segments.items():
+                if seg:
+                    elements.append(Paragraph(f"&nbsp;&nbsp;<b>{comp.capitalize()}:</b> {seg}", normal_style))
         elements.append(Paragraph(f"Score: {q.get('score', 0):.1f}", normal_style))
         elements.append(Spacer(1, 10))
         
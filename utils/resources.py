@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+
+
+class _Resource:
+    def __init__(self, name, loader, warmup=None, teardown=None, per_thread=False):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.teardown = teardown
+        self.per_thread = per_thread
+        self.lock = threading.Lock()
+        self.instance = None
+        self.loaded = False
+        self.pid = None
+        self.local = threading.local()
+
+
+class ResourceRegistry:
+    """
+    Framework-neutral registry for expensive model singletons.
+    Resources are loaded lazily on first use, once per process. A resource
+    inherited through fork() is discarded and reloaded in the child, since
+    model graphs and sessions generally do not survive a fork.
+    Resources registered with per_thread=True get one instance per thread.
+    """
+
+    def __init__(self):
+        self._resources = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader, warmup=None, teardown=None, per_thread: bool = False):
+        """
+        Registers a loader under the given name. warmup(instance) runs once after
+        loading; teardown(instance) runs when the resource is released.
+        Re-registering a name replaces it and drops any loaded instance.
+        """
+        with self._lock:
+            self._resources[name] = _Resource(name, loader, warmup, teardown, per_thread)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._resources
+
+    def names(self) -> list:
+        return list(self._resources.keys())
+
+    def _entry(self, name: str) -> _Resource:
+        try:
+            return self._resources[name]
+        except KeyError:
+            raise KeyError(f"Unknown resource '{name}'") from None
+
+    def _load(self, res: _Resource):
+        instance = res.loader()
+        if instance is not None and res.warmup:
+            try:
+                res.warmup(instance)
+            except Exception as e:
+                print(f"Warning: warmup of '{res.name}' failed: {e}")
+        return instance
+
+    def get(self, name: str):
+        """Returns the loaded instance for name, loading it on first use."""
+        res = self._entry(name)
+        pid = os.getpid()
+
+        if res.per_thread:
+            local = res.local
+            if getattr(local, "pid", None) != pid:
+                local.instance = self._load(res)
+                local.pid = pid
+            return local.instance
+
+        # Fast path without taking the lock
+        if res.loaded and res.pid == pid:
+            return res.instance
+
+        with res.lock:
+            if res.loaded and res.pid != pid:
+                # Inherited from the parent process; do not tear it down here
+                res.instance, res.loaded = None, False
+            if not res.loaded:
+                res.instance = self._load(res)
+                res.pid = pid
+                res.loaded = True
+            return res.instance
+
+    def is_loaded(self, name: str) -> bool:
+        res = self._entry(name)
+        if res.per_thread:
+            return getattr(res.local, "pid", None) == os.getpid()
+        return res.loaded and res.pid == os.getpid()
+
+    def warmup(self, *names) -> dict:
+        """
+        Loads the given resources (all registered ones if none are given).
+        Returns a mapping of name -> bool telling whether each one is available.
+        """
+        status = {}
+        for name in names or self.names():
+            status[name] = self.get(name) is not None
+        return status
+
+    def teardown(self, *names):
+        """Releases the given resources (all if none are given) in this process."""
+        for name in names or self.names():
+            res = self._entry(name)
+            with res.lock:
+                if res.per_thread:
+                    instance = getattr(res.local, "instance", None)
+                    res.local = threading.local()
+                    owned = instance is not None
+                else:
+                    instance = res.instance
+                    owned = res.loaded and res.pid == os.getpid()
+                    res.instance, res.loaded, res.pid = None, False, None
+            if owned and instance is not None and res.teardown:
+                try:
+                    res.teardown(instance)
+                except Exception as e:
+                    print(f"Warning: teardown of '{res.name}' failed: {e}")
+
+
+class ChangeCheck:
+    """
+    Rate-limited change detector for resources built from data another process
+    may rewrite (the database, a config file). changed() calls version() at most
+    once per interval seconds and reports whether it differs from the value
+    recorded by the last reset(), which the resource's loader calls.
+    """
+
+    def __init__(self, version, interval: float):
+        self.version = version
+        self.interval = interval
+        self._seen = None
+        self._next = 0.0
+
+    def _read(self):
+        try:
+            return self.version()
+        except Exception as e:
+            print(f"Warning: version check failed: {e}")
+            return None
+
+    def reset(self):
+        self._seen = self._read()
+        self._next = time.monotonic() + self.interval
+
+    def changed(self) -> bool:
+        now = time.monotonic()
+        if now < self._next:
+            return False
+        self._next = now + self.interval
+        current = self._read()
+        if current == self._seen:
+            return False
+        self._seen = current
+        return True
+
+
+# Process-wide registry shared by the analysis modules
+registry = ResourceRegistry()
+
+
+def resource(name: str, warmup=None, teardown=None, per_thread: bool = False):
+    """
+    Decorator turning a loader function into a cached getter backed by the registry.
+        @resource("spacy")
+        def get_nlp_model(): ...
+    """
+    def decorator(loader):
+        registry.register(name, loader, warmup=warmup, teardown=teardown, per_thread=per_thread)
+
+        def getter():
+            return registry.get(name)
+
+        getter.__name__ = loader.__name__
+        getter.__doc__ = loader.__doc__
+        getter.resource_name = name
+        getter.clear = lambda: registry.teardown(name)
+        return getter
+
+    return decorator
@@ -0,0 +1,17 @@
+import streamlit as st
+from utils.resources import registry
+
+
+@st.cache_resource(show_spinner="Loading analysis models...")
+def warmup_models(names: tuple = ()) -> dict:
+    """
+    Streamlit adapter over the resource registry.
+    Loads the named models once per server process so the first interview
+    does not pay the cold start; later calls are served from Streamlit's cache.
+    """
+    # Importing the analysis modules registers their loaders
+    import nlp.engine  # noqa: F401
+    import nlp.duplicate_detector  # noqa: F401
+    import vision.emotion_detector  # noqa: F401
+    import vision.tracker  # noqa: F401
+    return registry.warmup(*names)
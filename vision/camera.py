@@ -0,0 +1,120 @@
+import threading
+import time
+import cv2
+
+
+class CameraStream:
+    """
+    Reads a camera on a background thread into a single-slot buffer that always
+    holds the newest frame, so analysis never works through a backlog of stale
+    frames queued inside the driver.
+        with CameraStream(0) as cam:
+            frame = cam.read()
+    source is a camera index / video path, or an already opened capture object.
+    """
+
+    def __init__(self, source=0):
+        self.source = source
+        self.cap = None
+        self._thread = None
+        self._running = False
+        self._cond = threading.Condition()
+        self._frame = None
+        self._frame_time = None
+        self._frame_id = 0
+        self._consumed_id = 0
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.frames_consumed = 0
+
+    def start(self) -> "CameraStream":
+        """Opens the source and starts the reader thread."""
+        if self._running:
+            return self
+        if isinstance(self.source, (int, str)):
+            self.cap = cv2.VideoCapture(self.source)
+        else:
+            self.cap = self.source
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Could not open camera {self.source}")
+
+        self._running = True
+        self._thread = threading.Thread(target=self._reader, name="CameraStream", daemon=True)
+        self._thread.start()
+        return self
+
+    def _reader(self):
+        while self._running:
+            ret, frame = self.cap.read()
+            if not ret:
+                # Camera unplugged or end of file
+                with self._cond:
+                    self._running = False
+                    self._cond.notify_all()
+                break
+            now = time.monotonic()
+            with self._cond:
+                if self._frame_id > self._consumed_id:
+                    # The previous frame was never read; it is replaced
+                    self.frames_dropped += 1
+                self._frame = frame
+                self._frame_time = now
+                self._frame_id += 1
+                self.frames_read += 1
+                self._cond.notify_all()
+
+    def read(self, timeout: float = 1.0, wait_new: bool = True):
+        """
+        Returns the newest frame, or None if none arrives within timeout.
+        With wait_new, a frame already returned by a previous read is never returned again.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._frame is None or (wait_new and self._frame_id == self._consumed_id):
+                remaining = deadline - time.monotonic()
+                if not self._running or remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            if self._frame_id != self._consumed_id:
+                self.frames_consumed += 1
+            self._consumed_id = self._frame_id
+            return self._frame
+
+    @property
+    def frame_age(self) -> float:
+        """Seconds since the newest buffered frame was captured (inf before the first frame)."""
+        with self._cond:
+            if self._frame_time is None:
+                return float("inf")
+            return time.monotonic() - self._frame_time
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def stats(self) -> dict:
+        """Counters for monitoring how far analysis lags behind the camera."""
+        with self._cond:
+            return {
+                "frames_read": self.frames_read,
+                "frames_dropped": self.frames_dropped,
+                "frames_consumed": self.frames_consumed,
+                "frame_age": (time.monotonic() - self._frame_time) if self._frame_time else float("inf")
+            }
+
+    def stop(self):
+        """Stops the reader thread and releases the capture."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self.cap is not None and self.cap.isOpened():
+            self.cap.release()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
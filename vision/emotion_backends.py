@@ -0,0 +1,69 @@
+import os
+import numpy as np
+
+# Input of DeepFace's emotion classifier: (batch, 48, 48, 1) grayscale in 0..1
+_INPUT_SHAPE = (None, 48, 48, 1)
+
+
+def default_onnx_threads() -> int:
+    """Intra-op threads for the emotion session; the 48x48 model stops scaling past a few cores."""
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+class OnnxEmotionModel:
+    """
+    ONNX Runtime CPU session over an export of DeepFace's 7-class emotion classifier.
+    predict() has the Keras signature, so it drops in wherever the Keras model is used
+    and returns the same (B, 7) probabilities in MODEL_EMOTION_ORDER.
+    """
+
+    def __init__(self, path: str, intra_op_threads: int = 0):
+        import onnxruntime as ort
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = intra_op_threads or default_onnx_threads()
+        # One small graph per call: parallelism inside ops only
+        opts.inter_op_num_threads = 1
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.path = path
+        self.session = ort.InferenceSession(path, sess_options=opts, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch: np.ndarray, verbose: int = 0) -> np.ndarray:
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+def load_onnx_emotion_model(path: str, intra_op_threads: int = 0):
+    """Returns an OnnxEmotionModel, or None if the file or onnxruntime is missing."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return OnnxEmotionModel(path, intra_op_threads)
+    except ImportError:
+        print("Warning: onnxruntime is not installed, using the DeepFace emotion model")
+        return None
+    except Exception as e:
+        print(f"Warning: could not load ONNX emotion model {path}: {e}")
+        return None
+
+
+def export_emotion_onnx(path: str, opset: int = 13) -> str:
+    """
+    Exports DeepFace's Keras emotion classifier to ONNX at path (needs deepface and tf2onnx).
+    Run once at setup; the runtime then only needs onnxruntime.
+    """
+    import tensorflow as tf
+    import tf2onnx
+    from deepface import DeepFace
+
+    try:
+        client = DeepFace.build_model("Emotion")
+    except Exception:
+        client = DeepFace.build_model(task="facial_attribute", model_name="Emotion")
+    model = getattr(client, "model", client)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    spec = (tf.TensorSpec(_INPUT_SHAPE, tf.float32, name="face"),)
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=opset, output_path=path)
+    return path
@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+
+def dhash(image: np.ndarray, hash_size: int = 8) -> int:
+    """
+    64-bit difference hash of an image (BGR or grayscale).
+    Near-identical images differ in only a few bits.
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _popcount64(values: np.ndarray) -> np.ndarray:
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+class EmotionCache:
+    """
+    Bounded LRU cache of emotion results keyed by perceptual hash.
+    A lookup hits when a stored hash is within `tolerance` bits (Hamming distance)
+    of the query, so consecutive near-identical faces reuse the earlier result.
+    """
+
+    def __init__(self, maxsize: int = 256, tolerance: int = 4):
+        self.maxsize = maxsize
+        self.tolerance = tolerance
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: int):
+        """Returns the cached result closest to key within tolerance, or None."""
+        with self._lock:
+            match = key if key in self._entries else None
+            if match is None and self.tolerance > 0 and self._entries:
+                keys = np.fromiter(self._entries.keys(), dtype=np.uint64, count=len(self._entries))
+                dist = _popcount64(keys ^ np.uint64(key))
+                best = int(np.argmin(dist))
+                if dist[best] <= self.tolerance:
+                    match = int(keys[best])
+            if match is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(match)
+            return self._entries[match]
+
+    def put(self, key: int, result: dict):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """Hit-rate metrics for tuning size and tolerance."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "tolerance": self.tolerance
+            }
@@ -1,8 +1,22 @@
 import time
-import streamlit as st
-from utils.config import DEEPFACE_MODEL
+import cv2
+import numpy as np
+from utils.config import (
+    DEEPFACE_MODEL, EMOTION_BATCH_SIZE, EMOTION_CACHE_SIZE, EMOTION_CACHE_TOLERANCE,
+    EMOTION_BACKEND, EMOTION_ONNX_PATH, EMOTION_ONNX_THREADS
+)
+from utils.resources import resource
+from vision.landmarks import FaceLandmarks
+from vision.emotion_cache import EmotionCache, dhash
+from vision.emotion_backends import OnnxEmotionModel, load_onnx_emotion_model
+from vision.scaling import downscale_for_analysis, scale_bbox
+from vision.emotion_timeline import EmotionTimeline
 
-@st.cache_resource
+# Output order of DeepFace's facial expression classifier
+MODEL_EMOTION_ORDER = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+EMOTION_INPUT_SIZE = 48
+
+@resource("deepface")
 def get_deepface():
     try:
         from deepface import DeepFace
@@ -10,21 +24,128 @@ def get_deepface():
     except Exception:
         return None
 
+@resource("emotion_model")
+def get_emotion_model():
+    """
+    Returns the emotion classifier: an OnnxEmotionModel when EMOTION_BACKEND allows it
+    and the export loads, otherwise the Keras model used by DeepFace, or None.
+    """
+    if EMOTION_BACKEND in ("onnx", "auto"):
+        model = load_onnx_emotion_model(EMOTION_ONNX_PATH, EMOTION_ONNX_THREADS)
+        if model is not None:
+            return model
+        if EMOTION_BACKEND == "onnx":
+            print(f"Warning: ONNX emotion model unavailable at {EMOTION_ONNX_PATH}, falling back to DeepFace")
+    DeepFace = get_deepface()
+    if not DeepFace:
+        return None
+    try:
+        try:
+            client = DeepFace.build_model("Emotion")
+        except Exception:
+            # deepface >= 0.0.93 groups models by task
+            client = DeepFace.build_model(task="facial_attribute", model_name="Emotion")
+        return getattr(client, "model", client)
+    except Exception as e:
+        print(f"Warning: could not build emotion model: {e}")
+        return None
+
+@resource("face_cascade")
+def get_face_cascade():
+    """OpenCV Haar cascade, the same detector DeepFace uses with detector_backend='opencv'."""
+    try:
+        path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+        cascade = cv2.CascadeClassifier(path)
+        return None if cascade.empty() else cascade
+    except Exception:
+        return None
+
+@resource("emotion_cache")
+def get_emotion_cache():
+    """Per-process perceptual-hash cache in front of the emotion model (None when disabled)."""
+    if EMOTION_CACHE_SIZE <= 0:
+        return None
+    return EmotionCache(maxsize=EMOTION_CACHE_SIZE, tolerance=EMOTION_CACHE_TOLERANCE)
+
+def get_emotion_cache_stats() -> dict:
+    """Hit-rate metrics of the emotion cache."""
+    cache = get_emotion_cache()
+    return cache.stats() if cache is not None else {}
+
 DEEPFACE_AVAILABLE = True
 
+def _load_frame(frame):
+    if isinstance(frame, str):
+        return cv2.imread(frame)
+    return frame
+
+def _extract_face(frame: np.ndarray) -> np.ndarray:
+    """Returns the largest detected face crop, or the whole frame if none is found."""
+    cascade = get_face_cascade()
+    if cascade is None:
+        return frame
+    # Detect on the downscaled copy, crop from the full-resolution frame
+    small, scale = downscale_for_analysis(frame)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    faces = cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5)
+    if len(faces) == 0:
+        return frame
+    x, y, w, h = scale_bbox(max(faces, key=lambda f: f[2] * f[3]), scale, frame.shape)
+    return frame[y:y + h, x:x + w]
+
+def preprocess_face(face: np.ndarray) -> np.ndarray:
+    """Converts a BGR face crop into the (48, 48) float32 grayscale input of the emotion model."""
+    if face.ndim == 3:
+        face = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+    face = cv2.resize(face, (EMOTION_INPUT_SIZE, EMOTION_INPUT_SIZE), interpolation=cv2.INTER_AREA)
+    return face.astype(np.float32) / 255.0
+
+def _predict_faces(faces: np.ndarray, model) -> np.ndarray:
+    """Runs the emotion model once on a (B, 48, 48) stack and returns (B, 7) probabilities."""
+    preds = model.predict(faces[..., np.newaxis], verbose=0)
+    return np.asarray(preds, dtype=np.float32).reshape(len(faces), len(MODEL_EMOTION_ORDER))
+
+def _scores_to_result(probs: np.ndarray) -> dict:
+    emotion_scores = {label: float(p) * 100 for label, p in zip(MODEL_EMOTION_ORDER, probs)}
+    dominant = MODEL_EMOTION_ORDER[int(np.argmax(probs))]
+    return {
+        "emotion": dominant,
+        "confidence": round(emotion_scores[dominant], 2),
+        "all_scores": emotion_scores
+    }
+
 def analyze_frame(frame) -> dict:
     """
-    Analyzes a single frame for emotion using DeepFace.
+    Analyzes a single frame for emotion using DeepFace, downscaled to VISION_ANALYSIS_SIZE.
     Returns dict: {'emotion': 'happy', 'confidence': 98.4, 'all_scores': {...}}
+    With the ONNX backend the face is located with OpenCV and DeepFace is never imported.
     """
+    if isinstance(get_emotion_model(), OnnxEmotionModel):
+        return analyze_frames_batch([frame])[0]
+
     DeepFace = get_deepface()
     if not DeepFace:
         return {"emotion": "neutral", "confidence": 0.0, "all_scores": {}}
+
+    # Near-identical faces reuse the previous result. The key hashes the detected face
+    # crop, not the whole snapshot, whose background would dominate the hash and hide
+    # expression changes; without a detected face the cache is skipped
+    cache = get_emotion_cache()
+    key = None
+    if cache is not None and isinstance(frame, np.ndarray):
+        face = _extract_face(frame)
+        if face is not frame and face.size:
+            key = dhash(face)
+    if key is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
     try:
         # Enforce face enforcement off because we usually already cropped/detected frame 
         # But we'll let DeepFace run its own fast detection
+        small, scale = downscale_for_analysis(frame) if isinstance(frame, np.ndarray) else (frame, 1.0)
         results = DeepFace.analyze(
-            frame, 
+            small, 
             actions=['emotion'], 
             enforce_detection=False,
             silent=True
@@ -39,23 +160,148 @@ def analyze_frame(frame) -> dict:
         emotion_scores = res.get('emotion', {})
         confidence = emotion_scores.get(dominant, 0.0)
         
-        return {
+        result = {
             "emotion": dominant,
             "confidence": round(confidence, 2),
             "all_scores": emotion_scores
         }
+        region = res.get('region')
+        if region and isinstance(frame, np.ndarray):
+            # Face box in the original frame's pixels
+            result["region"] = scale_bbox((region.get('x', 0), region.get('y', 0),
+                                           region.get('w', 0), region.get('h', 0)), scale, frame.shape)
+        if key is not None:
+            cache.put(key, result)
+        return result
     except Exception as e:
         print(f"Error analyzing emotion: {e}")
         return {"emotion": "neutral", "confidence": 0.0, "all_scores": {}}
 
-def get_emotion_timeline(frames_list: list) -> list:
+def crop_face(frame: np.ndarray, bbox: tuple, landmarks=None, margin: float = 0.15) -> np.ndarray:
+    """
+    Crops the face given an (x, y, w, h) bbox, padded by margin on each side.
+    If FaceMesh landmarks are given, the crop is rotated so the eyes are level.
+    """
+    h, w = frame.shape[:2]
+    x, y, bw, bh = bbox
+    pad_x, pad_y = int(bw * margin), int(bh * margin)
+    x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+    x1, y1 = min(w, x + bw + pad_x), min(h, y + bh + pad_y)
+    crop = frame[y0:y1, x0:x1]
+    if crop.size == 0 or landmarks is None:
+        return crop
+
+    try:
+        right, left = FaceLandmarks.coerce(landmarks, frame.shape).eye_centers()
+        angle = np.degrees(np.arctan2(left[1] - right[1], left[0] - right[0]))
+        if abs(angle) < 1.0:
+            return crop
+        center = ((right[0] + left[0]) / 2 - x0, (right[1] + left[1]) / 2 - y0)
+        rot = cv2.getRotationMatrix2D(center, angle, 1.0)
+        return cv2.warpAffine(crop, rot, (crop.shape[1], crop.shape[0]), borderMode=cv2.BORDER_REPLICATE)
+    except Exception:
+        return crop
+
+def _neutral_result() -> dict:
+    return {"emotion": "neutral", "confidence": 0.0, "all_scores": {}}
+
+def _analyze_crop_deepface(face: np.ndarray) -> dict:
+    DeepFace = get_deepface()
+    if not DeepFace:
+        return _neutral_result()
+    try:
+        results = DeepFace.analyze(face, actions=['emotion'], detector_backend="skip",
+                                   enforce_detection=False, silent=True)
+        res = results[0] if isinstance(results, list) else results
+        dominant = res.get('dominant_emotion', 'neutral')
+        emotion_scores = res.get('emotion', {})
+        return {
+            "emotion": dominant,
+            "confidence": round(emotion_scores.get(dominant, 0.0), 2),
+            "all_scores": emotion_scores
+        }
+    except Exception as e:
+        print(f"Error analyzing emotion: {e}")
+        return _neutral_result()
+
+def analyze_face_crops(crops: list, batch_size: int = EMOTION_BATCH_SIZE) -> list:
+    """
+    Classifies face crops (as cut by crop_face) without running face detection,
+    batch_size crops per forward pass. Crops whose perceptual hash is close to a
+    recently classified face reuse that result instead of running the model.
+    Returns one analyze_frame-style dict per crop.
+    """
+    model = get_emotion_model()
+    cache = get_emotion_cache()
+    batch_size = max(1, int(batch_size))
+
+    inputs = [preprocess_face(face) for face in crops]
+    keys = [dhash(x) for x in inputs] if cache is not None else [None] * len(crops)
+    results = [None] * len(crops)
+    misses = []
+    for i, key in enumerate(keys):
+        hit = cache.get(key) if key is not None else None
+        if hit is not None:
+            results[i] = hit
+        else:
+            misses.append(i)
+
+    for start in range(0, len(misses), batch_size):
+        idxs = misses[start:start + batch_size]
+        if model is None:
+            chunk_results = [_analyze_crop_deepface(crops[i]) for i in idxs]
+        else:
+            try:
+                probs = _predict_faces(np.stack([inputs[i] for i in idxs]), model)
+                chunk_results = [_scores_to_result(p) for p in probs]
+            except Exception as e:
+                print(f"Error analyzing emotion: {e}")
+                chunk_results = [_neutral_result() for _ in idxs]
+        for i, res in zip(idxs, chunk_results):
+            results[i] = res
+            if keys[i] is not None and res["all_scores"]:
+                cache.put(keys[i], res)
+    return results
+
+def analyze_face_crop(frame: np.ndarray, bbox: tuple, landmarks=None) -> dict:
+    """
+    Classifies emotion on a face already located by FaceMesh (see vision.tracker.detect_face),
+    so no second face detection is run.
+    Returns the same dict as analyze_frame.
+    """
+    face = crop_face(frame, bbox, landmarks)
+    if face.size == 0:
+        return _neutral_result()
+    return analyze_face_crops([face])[0]
+
+def analyze_frames_batch(frames: list, batch_size: int = EMOTION_BATCH_SIZE) -> list:
+    """
+    Batched variant of analyze_frame for offline use.
+    Face crops are stacked and the emotion model runs once per batch of batch_size frames.
+    Returns one {'emotion', 'confidence', 'all_scores'} dict per input frame.
+    """
+    model = get_emotion_model()
+    if model is None:
+        return [analyze_frame(f) for f in frames]
+
+    batch_size = max(1, int(batch_size))
+    results = []
+    for start in range(0, len(frames), batch_size):
+        chunk = [_load_frame(f) for f in frames[start:start + batch_size]]
+        valid = [f is not None and f.size > 0 for f in chunk]
+        faces = [_extract_face(f) for f, ok in zip(chunk, valid) if ok]
+        classified = iter(analyze_face_crops(faces, batch_size=batch_size))
+        for ok in valid:
+            results.append(next(classified) if ok else _neutral_result())
+    return results
+
+def get_emotion_timeline(frames_list: list, batch_size: int = EMOTION_BATCH_SIZE) -> list:
     """
     Takes a list of frames (or paths) and returns a list of dictionaries with timestamps and emotions.
     """
     timeline = []
     # For a realistic simulation, we use mock timestamps assuming 1 frame per second
-    for idx, frame in enumerate(frames_list):
-        result = analyze_frame(frame)
+    for idx, result in enumerate(analyze_frames_batch(frames_list, batch_size=batch_size)):
         timeline.append({
             "timestamp": idx, # seconds
             "emotion": result["emotion"],
@@ -64,34 +310,19 @@ def get_emotion_timeline(frames_list: list) -> list:
         })
     return timeline
 
-def get_dominant_emotion_summary(timeline: list) -> dict:
+def get_dominant_emotion_summary(timeline) -> dict:
     """
-    Returns a percentage breakdown of emotions across the timeline.
-    Example: {'neutral': 60.5, 'happy': 30.0, 'stress': 9.5}
+    Returns a percentage breakdown of emotions across the timeline
+    (a list of records or an EmotionTimeline).
+    Example: {'neutral': 60.5, 'happy': 30.0, 'fear': 9.5}
     """
-    if not timeline:
-        return {}
-        
-    counts = {}
-    for entry in timeline:
-        emo = entry["emotion"]
-        counts[emo] = counts.get(emo, 0) + 1
-        
-    total = len(timeline)
-    return {k: round((v / total) * 100, 2) for k, v in counts.items()}
+    return EmotionTimeline.coerce(timeline).summary()
 
-def detect_stress_spikes(timeline: list, threshold_percent: float = 60.0) -> list:
+def detect_stress_spikes(timeline, threshold_percent: float = 60.0) -> list:
     """
     Detects moments in the timeline where 'fear' or 'disgust' or 'angry' 
     spike above the given confidence threshold.
-    Returns a list of integer timestamps.
-    """
-    stressful_emotions = ['fear', 'disgust', 'angry']
-    spikes = []
-    
-    for entry in timeline:
-        emotion = entry["emotion"]
-        if emotion in stressful_emotions and entry.get("intensity", 0) > threshold_percent:
-            spikes.append(entry["timestamp"])
-            
-    return spikes
+    Returns a list of timestamps.
+    """
+    tl = EmotionTimeline.coerce(timeline)
+    return tl.timestamps[tl.stress_mask(threshold_percent)].tolist()
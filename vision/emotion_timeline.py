@@ -0,0 +1,206 @@
+import numpy as np
+from utils.config import EMOTION_LABELS
+
+LABEL_CODES = {label: code for code, label in enumerate(EMOTION_LABELS)}
+STRESS_EMOTIONS = ("fear", "disgust", "angry")
+_STRESS_CODES = np.array([LABEL_CODES[e] for e in STRESS_EMOTIONS], dtype=np.uint8)
+
+
+class EmotionTimeline:
+    """
+    Compact, array-backed emotion timeline.
+    Holds float32 timestamps (seconds), uint8 label codes into EMOTION_LABELS,
+    float32 intensities (confidence of the dominant label, 0-100) and an
+    (N, 7) float32 matrix of per-label scores in EMOTION_LABELS order.
+    Indexing and iteration yield the familiar record dicts, so code written
+    for lists of {'timestamp', 'emotion', 'confidence'} keeps working.
+    """
+    __slots__ = ("_t", "_codes", "_intensity", "_scores", "_n")
+
+    def __init__(self, capacity: int = 64):
+        capacity = max(1, capacity)
+        self._t = np.zeros(capacity, dtype=np.float32)
+        self._codes = np.zeros(capacity, dtype=np.uint8)
+        self._intensity = np.zeros(capacity, dtype=np.float32)
+        self._scores = np.zeros((capacity, len(EMOTION_LABELS)), dtype=np.float32)
+        self._n = 0
+
+    # ── Construction ──────────────────────────────────────────────────
+    @classmethod
+    def from_records(cls, records) -> "EmotionTimeline":
+        """Builds a timeline from dicts with 'timestamp', 'emotion', 'confidence'/'intensity' and optional 'all_scores'."""
+        if isinstance(records, cls):
+            return records
+        records = list(records)
+        timeline = cls(capacity=len(records))
+        for r in records:
+            timeline.append(
+                r.get("timestamp", timeline._n),
+                r.get("emotion", "neutral"),
+                r.get("confidence", r.get("intensity", 0.0)),
+                r.get("all_scores")
+            )
+        return timeline
+
+    coerce = from_records
+
+    def _grow(self):
+        capacity = len(self._t) * 2
+        self._t = np.resize(self._t, capacity)
+        self._codes = np.resize(self._codes, capacity)
+        self._intensity = np.resize(self._intensity, capacity)
+        scores = np.zeros((capacity, self._scores.shape[1]), dtype=np.float32)
+        scores[:self._n] = self._scores[:self._n]
+        self._scores = scores
+
+    def append(self, timestamp: float, emotion: str, intensity: float, all_scores: dict = None):
+        """Adds one sample; unknown labels are stored as neutral."""
+        if self._n == len(self._t):
+            self._grow()
+        i = self._n
+        self._t[i] = timestamp
+        self._codes[i] = LABEL_CODES.get(emotion, LABEL_CODES["neutral"])
+        self._intensity[i] = intensity or 0.0
+        if all_scores:
+            self._scores[i] = [all_scores.get(label, 0.0) for label in EMOTION_LABELS]
+        else:
+            self._scores[i] = 0.0
+        self._n += 1
+
+    # ── Array views ───────────────────────────────────────────────────
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._t[:self._n]
+
+    @property
+    def codes(self) -> np.ndarray:
+        return self._codes[:self._n]
+
+    @property
+    def intensities(self) -> np.ndarray:
+        return self._intensity[:self._n]
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self._scores[:self._n]
+
+    @property
+    def nbytes(self) -> int:
+        return self._t.nbytes + self._codes.nbytes + self._intensity.nbytes + self._scores.nbytes
+
+    # ── Record compatibility ──────────────────────────────────────────
+    def __len__(self) -> int:
+        return self._n
+
+    def _record(self, i: int) -> dict:
+        record = {
+            "timestamp": float(self._t[i]),
+            "emotion": EMOTION_LABELS[self._codes[i]],
+            "confidence": round(float(self._intensity[i]), 2)
+        }
+        if self._scores[i].any():
+            record["all_scores"] = dict(zip(EMOTION_LABELS, self._scores[i].tolist()))
+        return record
+
+    def __getitem__(self, index: int) -> dict:
+        if index < 0:
+            index += self._n
+        if not 0 <= index < self._n:
+            raise IndexError("EmotionTimeline index out of range")
+        return self._record(index)
+
+    def __iter__(self):
+        for i in range(self._n):
+            yield self._record(i)
+
+    def to_records(self) -> list:
+        return list(self)
+
+    def window(self, start: float, end: float = None) -> "EmotionTimeline":
+        """Samples with start <= timestamp < end (open-ended without end) as a new timeline."""
+        mask = self.timestamps >= start
+        if end is not None:
+            mask &= self.timestamps < end
+        n = int(mask.sum())
+        out = EmotionTimeline(capacity=n)
+        out._t[:n] = self.timestamps[mask]
+        out._codes[:n] = self.codes[mask]
+        out._intensity[:n] = self.intensities[mask]
+        out._scores[:n] = self.scores[mask]
+        out._n = n
+        return out
+
+    # ── Vectorized analysis ───────────────────────────────────────────
+    def counts(self) -> dict:
+        """Number of samples per label (labels that never occur are omitted)."""
+        counts = np.bincount(self.codes, minlength=len(EMOTION_LABELS))
+        return {EMOTION_LABELS[c]: int(n) for c, n in enumerate(counts) if n}
+
+    def summary(self) -> dict:
+        """Percentage breakdown of labels, e.g. {'neutral': 60.5, 'happy': 30.0, 'fear': 9.5}."""
+        if not self._n:
+            return {}
+        return {k: round((v / self._n) * 100, 2) for k, v in self.counts().items()}
+
+    def stress_mask(self, threshold_percent: float = None) -> np.ndarray:
+        """Boolean mask of stressful samples, optionally only those above threshold_percent."""
+        mask = np.isin(self.codes, _STRESS_CODES)
+        if threshold_percent is not None:
+            mask &= self.intensities > threshold_percent
+        return mask
+
+    def stress_count(self) -> int:
+        return int(self.stress_mask().sum())
+
+    def stress_spikes(self, threshold_percent: float = 60.0, release_percent: float = None) -> list:
+        """
+        Timestamps at which stress episodes start, with hysteresis.
+        An episode starts on a stressful sample above threshold_percent and only ends
+        once a sample drops to release_percent or below (or is not stressful), so one
+        flickering episode is reported once. release_percent defaults to threshold - 15.
+        """
+        if not self._n:
+            return []
+        if release_percent is None:
+            release_percent = threshold_percent - 15.0
+        stressful = self.stress_mask()
+        on = stressful & (self.intensities > threshold_percent)
+        off = ~stressful | (self.intensities <= release_percent)
+
+        # State at each sample is set by the most recent on/off event (hold otherwise)
+        events = np.where(on, 1, np.where(off, -1, 0))
+        idx = np.where(events != 0, np.arange(self._n), -1)
+        last = np.maximum.accumulate(idx)
+        state = np.where(last >= 0, events[np.maximum(last, 0)] == 1, False)
+        starts = state & ~np.concatenate(([False], state[:-1]))
+        return self.timestamps[starts].tolist()
+
+    def resample(self, interval: float) -> "EmotionTimeline":
+        """
+        Aggregates samples into fixed bins of `interval` seconds.
+        Each bin gets the mean scores and intensity; its label is the arg-max of the
+        mean scores, or the most frequent label when no scores were recorded.
+        """
+        out = EmotionTimeline(capacity=1)
+        if not self._n:
+            return out
+        bins = np.floor(self.timestamps / interval).astype(np.int64)
+        uniq, inverse, counts = np.unique(bins, return_inverse=True, return_counts=True)
+        n_bins, n_labels = len(uniq), len(EMOTION_LABELS)
+
+        score_sums = np.zeros((n_bins, n_labels), dtype=np.float64)
+        np.add.at(score_sums, inverse, self.scores)
+        label_counts = np.zeros((n_bins, n_labels), dtype=np.int64)
+        np.add.at(label_counts, (inverse, self.codes), 1)
+        intensity = np.bincount(inverse, weights=self.intensities, minlength=n_bins) / counts
+
+        has_scores = score_sums.any(axis=1)
+        codes = np.where(has_scores, score_sums.argmax(axis=1), label_counts.argmax(axis=1))
+
+        out = EmotionTimeline(capacity=n_bins)
+        out._t[:n_bins] = uniq * interval
+        out._codes[:n_bins] = codes
+        out._intensity[:n_bins] = intensity
+        out._scores[:n_bins] = score_sums / counts[:, None]
+        out._n = n_bins
+        return out
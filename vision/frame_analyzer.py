@@ -0,0 +1,96 @@
+import cv2
+import numpy as np
+from utils.config import VISION_PIPELINE, VISION_GRAPH_TIMEOUT
+from vision.landmarks import FaceLandmarks
+from vision.scaling import downscale_for_analysis
+from vision.gaze_estimator import classify_gaze
+from vision.tracker import (
+    get_holistic_pool, get_face_mesh_pool, get_pose_pool,
+    get_head_pose, pose_to_array, classify_posture
+)
+
+
+class FrameAnalysis:
+    """Everything the per-frame vision pass produces for one frame."""
+    __slots__ = ("face", "bbox", "pose", "gaze", "iris_ratios", "head_pose", "posture")
+
+    def __init__(self, face=None, bbox=None, pose=None, gaze="unknown", iris_ratios=None,
+                 head_pose=None, posture="unknown"):
+        self.face = face            # FaceLandmarks or None
+        self.bbox = bbox            # (x, y, w, h) or None
+        self.pose = pose            # (33, 4) float32 pose landmarks or None
+        self.gaze = gaze
+        self.iris_ratios = iris_ratios  # (x, y) iris position in the eye, 0..1
+        self.head_pose = head_pose or {"pitch": 0.0, "yaw": 0.0, "roll": 0.0}
+        self.posture = posture
+
+    @property
+    def has_face(self) -> bool:
+        return self.face is not None
+
+    def to_dict(self) -> dict:
+        """Plain summary without the landmark arrays."""
+        return {
+            "bbox": self.bbox,
+            "gaze": self.gaze,
+            "head_pose": self.head_pose,
+            "posture": self.posture
+        }
+
+
+def _run_graphs(rgb: np.ndarray, session_key=None) -> tuple:
+    """
+    Returns the raw (face_landmarks, pose_landmarks) MediaPipe outputs for one RGB frame,
+    using pooled graphs with tracking affinity to session_key.
+    """
+    if VISION_PIPELINE == "holistic":
+        with get_holistic_pool().lease(session_key, VISION_GRAPH_TIMEOUT) as holistic:
+            if holistic:
+                results = holistic.process(rgb)
+                return results.face_landmarks, results.pose_landmarks
+
+    # Shared-input fallback: both graphs read the same converted buffer
+    face_lms = pose_lms = None
+    with get_face_mesh_pool().lease(session_key, VISION_GRAPH_TIMEOUT) as face_mesh:
+        if face_mesh:
+            results = face_mesh.process(rgb)
+            if results.multi_face_landmarks:
+                face_lms = results.multi_face_landmarks[0]
+    with get_pose_pool().lease(session_key, VISION_GRAPH_TIMEOUT) as pose:
+        if pose:
+            pose_lms = pose.process(rgb).pose_landmarks
+    return face_lms, pose_lms
+
+
+def analyze_vision_frame(frame: np.ndarray, max_side: int = None, session_key=None) -> FrameAnalysis:
+    """
+    Runs face mesh and pose on a BGR frame in one pass, converting the colour
+    space once, and derives gaze, head pose and posture from the result.
+    The graphs see a copy downscaled to max_side (VISION_ANALYSIS_SIZE by default);
+    landmarks, bbox and head pose are in the original frame's coordinates.
+    Pass a per-interview session_key when several interviews share the process.
+    """
+    small, _ = downscale_for_analysis(frame, max_side)
+    rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+    # Read-only input lets MediaPipe pass the buffer by reference
+    rgb.flags.writeable = False
+    face_lms, pose_lms = _run_graphs(rgb, session_key)
+
+    analysis = FrameAnalysis()
+    if face_lms is not None:
+        # Normalized landmarks scaled by the original size land in full-resolution pixels
+        h, w = frame.shape[:2]
+        face = FaceLandmarks.from_mediapipe(face_lms, w, h)
+        analysis.face = face
+        analysis.bbox = face.bbox()
+        try:
+            analysis.iris_ratios = face.iris_ratios()
+        except IndexError:
+            # Landmarks without the refined iris points
+            analysis.iris_ratios = None
+        analysis.gaze = classify_gaze(analysis.iris_ratios)
+        analysis.head_pose = get_head_pose(frame, face)
+    if pose_lms is not None:
+        analysis.pose = pose_to_array(pose_lms)
+        analysis.posture = classify_posture(analysis.pose)
+    return analysis
@@ -1,52 +1,38 @@
 import numpy as np
+from vision.landmarks import FaceLandmarks
+
+def classify_gaze(ratios) -> str:
+    """
+    Maps the (x, y) iris position ratios from FaceLandmarks.iris_ratios to a direction.
+    Returns: 'direct', 'left', 'right', 'up', 'down' or 'unknown'
+    """
+    if ratios is None:
+        return "unknown"
+    ratio, y_ratio = ratios
+    
+    if ratio < 0.40:
+        return "right" # From candidate's perspective
+    elif ratio > 0.60:
+        return "left"
+        
+    # Basic vertical estimation from the iris position between the eyelids
+    if y_ratio < 0.35:
+        return "up"
+    elif y_ratio > 0.65:
+        return "down"
+
+    return "direct"
 
 def estimate_gaze(frame: np.ndarray, landmarks) -> str:
     """
     Estimates gaze direction based on eye landmarks.
+    landmarks may be a FaceLandmarks or a raw MediaPipe landmark list.
     Returns: 'direct', 'left', 'right', 'up', 'down'
     """
-    # MediaPipe face mesh eye landmarks
-    LEFT_EYE = [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385,384, 398]
-    RIGHT_EYE = [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161 , 246]
-    LEFT_IRIS = [474, 475, 476, 477]
-    RIGHT_IRIS = [469, 470, 471, 472]
-    
-    h, w, _ = frame.shape
-    
     try:
-        # Get bounds of the right eye
-        rx_min = min([landmarks.landmark[p].x for p in RIGHT_EYE])
-        rx_max = max([landmarks.landmark[p].x for p in RIGHT_EYE])
-        
-        # Get center of the right iris
-        riris_x = np.mean([landmarks.landmark[p].x for p in RIGHT_IRIS])
-        
-        # Calculate relative position of iris in the eye (0 to 1)
-        eye_width = rx_max - rx_min
-        if eye_width == 0:
-            return "unknown"
-            
-        ratio = (riris_x - rx_min) / eye_width
-        
-        if ratio < 0.40:
-            return "right" # From candidate's perspective
-        elif ratio > 0.60:
-            return "left"
-            
-        # Add basic vertical estimation if needed (requires upper/lower eyelid vs iris y)
-        ry_min = min([landmarks.landmark[p].y for p in RIGHT_EYE])
-        ry_max = max([landmarks.landmark[p].y for p in RIGHT_EYE])
-        riris_y = np.mean([landmarks.landmark[p].y for p in RIGHT_IRIS])
-        eye_height = ry_max - ry_min
-        if eye_height > 0:
-            y_ratio = (riris_y - ry_min) / eye_height
-            if y_ratio < 0.35:
-                return "up"
-            elif y_ratio > 0.65:
-                return "down"
-
-        return "direct"
-
+        face = FaceLandmarks.coerce(landmarks, frame.shape)
+        # Relative position of the right iris in the right eye (0 to 1)
+        return classify_gaze(face.iris_ratios())
     except Exception as e:
         print(f"Error estimating gaze: {e}")
         return "unknown"
@@ -67,34 +53,110 @@ def get_gaze_heatmap_data(gaze_log: list) -> dict:
     Parses a gaze log into a formatted dictionary for Plotly heatmap generation.
     Returns a dict with coordinates.
     """
-    # A simple 3x3 grid mimicking looking left/right/up/down/center
-    grid = {
-        "up_left": 0, "up": 0, "up_right": 0,
-        "left": 0, "center": 0, "right": 0,
-        "down_left": 0, "down": 0, "down_right": 0
-    }
-    
+    acc = GazeAccumulator()
     for g in gaze_log:
-        if g == "direct":
-            grid["center"] += 1
-        elif g == "left":
-            grid["left"] += 1
-        elif g == "right":
-            grid["right"] += 1
-        elif g == "up":
-            grid["up"] += 1
-        elif g == "down":
-            grid["down"] += 1
-            
-    # Format for Plotly z-matrix (3x3 array)
-    z_matrix = [
-        [grid["up_left"], grid["up"], grid["up_right"]],
-        [grid["left"], grid["center"], grid["right"]],
-        [grid["down_left"], grid["down"], grid["down_right"]]
-    ]
-    
-    return {
-        "x": ["Left", "Center", "Right"],
-        "y": ["Top", "Middle", "Bottom"],
-        "z": z_matrix
-    }
+        acc.update(g)
+    return acc.heatmap_data()
+
+GAZE_LABELS = ("direct", "left", "right", "up", "down", "unknown")
+_GAZE_CODES = {label: i for i, label in enumerate(GAZE_LABELS)}
+
+class GazeAccumulator:
+    """
+    Running gaze statistics updated once per frame, so eye contact and the
+    heatmap cost O(1) however long the interview runs.
+    Keeps per-direction counts, a bins x bins histogram of continuous iris
+    offsets (x, y ratios in 0..1) and, with smoothing=alpha, an exponential
+    moving average of eye contact. Frames given a timestamp are also kept
+    as (seconds, label) samples for utils.alignment, in parallel arrays that
+    double when full (amortized O(1) per frame). The live page keeps the
+    accumulator itself in st.session_state; to_dict()/from_dict() give a
+    compact form of the statistics, without the samples.
+    """
+
+    def __init__(self, bins: int = 12, smoothing: float = None):
+        self.bins = bins
+        self.smoothing = smoothing
+        self.counts = np.zeros(len(GAZE_LABELS), dtype=np.int64)
+        self.offsets = np.zeros((bins, bins), dtype=np.int32)
+        self.ema = None
+        # Timestamped frames: seconds since start and label code, first _n in use
+        self._times = np.zeros(64, dtype=np.float64)
+        self._codes = np.zeros(64, dtype=np.uint8)
+        self._n = 0
+
+    def update(self, label: str, ratios=None, timestamp: float = None):
+        """Adds one frame's gaze label, optional (x, y) iris ratios and optional time (seconds)."""
+        code = _GAZE_CODES.get(label, _GAZE_CODES["unknown"])
+        self.counts[code] += 1
+        if timestamp is not None:
+            if self._n == len(self._times):
+                self._times = np.resize(self._times, self._n * 2)
+                self._codes = np.resize(self._codes, self._n * 2)
+            self._times[self._n] = timestamp
+            self._codes[self._n] = code
+            self._n += 1
+        if ratios is not None:
+            x, y = ratios
+            col = min(self.bins - 1, max(0, int(x * self.bins)))
+            row = min(self.bins - 1, max(0, int(y * self.bins)))
+            self.offsets[row, col] += 1
+        if self.smoothing:
+            hit = 100.0 if label == "direct" else 0.0
+            self.ema = hit if self.ema is None else self.smoothing * hit + (1 - self.smoothing) * self.ema
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def count(self, label: str) -> int:
+        return int(self.counts[_GAZE_CODES[label]])
+
+    @property
+    def eye_contact_percent(self) -> float:
+        """Same value as get_eye_contact_percentage over the full log."""
+        total = self.total
+        if not total:
+            return 0.0
+        return round((self.count("direct") / total) * 100, 2)
+
+    @property
+    def smoothed_eye_contact(self) -> float:
+        """Exponentially smoothed eye contact %, or the plain percentage without smoothing."""
+        if self.ema is None:
+            return self.eye_contact_percent
+        return round(self.ema, 2)
+
+    def timed_samples(self) -> list:
+        """(seconds, label) of every timestamped frame, in arrival order."""
+        return [(float(t), GAZE_LABELS[code]) for t, code in zip(self._times[:self._n], self._codes[:self._n])]
+
+    def heatmap_data(self) -> dict:
+        """3x3 direction heatmap in the get_gaze_heatmap_data format, plus the iris offset histogram."""
+        z_matrix = [
+            [0, self.count("up"), 0],
+            [self.count("left"), self.count("direct"), self.count("right")],
+            [0, self.count("down"), 0]
+        ]
+        return {
+            "x": ["Left", "Center", "Right"],
+            "y": ["Top", "Middle", "Bottom"],
+            "z": z_matrix,
+            "offsets": self.offsets.tolist()
+        }
+
+    def to_dict(self) -> dict:
+        data = {"bins": self.bins, "counts": self.counts.tolist(), "smoothing": self.smoothing, "ema": self.ema}
+        nz = np.nonzero(self.offsets)
+        # Sparse: only occupied histogram cells
+        data["offsets"] = [[int(r), int(c), int(self.offsets[r, c])] for r, c in zip(*nz)]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "GazeAccumulator":
+        acc = cls(bins=data.get("bins", 12), smoothing=data.get("smoothing"))
+        acc.counts[:] = data.get("counts", acc.counts)
+        for r, c, n in data.get("offsets", []):
+            acc.offsets[r, c] = n
+        acc.ema = data.get("ema")
+        return acc
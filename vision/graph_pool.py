@@ -0,0 +1,182 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Owner of a slot whose graph has not processed any frame yet
+_FRESH = object()
+
+
+class _Slot:
+    __slots__ = ("graph", "owner", "busy", "last_used")
+
+    def __init__(self):
+        self.graph = None
+        self.owner = _FRESH
+        self.busy = True
+        self.last_used = 0.0
+
+
+class GraphPool:
+    """
+    Bounded pool of stateful graph instances (MediaPipe FaceMesh/Pose/Holistic).
+    A graph is used by one caller at a time: checkout() hands out an idle graph,
+    creating one while fewer than `size` exist and otherwise waiting for a checkin.
+    Graphs have session affinity: a session gets back the graph it used last, so
+    MediaPipe's frame-to-frame tracking only ever sees that session's frames. When
+    a graph has to move to another session it is rebuilt, never shared mid-track.
+        with pool.lease(session_key) as graph:
+            results = graph.process(rgb)
+    """
+
+    def __init__(self, factory, size: int = 4, teardown=None):
+        self.factory = factory
+        self.size = max(1, size)
+        self.teardown = teardown
+        self.available = True
+        self._slots = []
+        self._by_graph = {}
+        self._cond = threading.Condition()
+        self.created = 0
+        self.rebuilds = 0
+        self.waits = 0
+
+    def _pick(self, session_key):
+        """Best idle slot for session_key: its own, then a fresh one, else None."""
+        fresh = None
+        for slot in self._slots:
+            if slot.busy:
+                continue
+            if slot.owner is not _FRESH and slot.owner == session_key:
+                return slot
+            if slot.owner is _FRESH and fresh is None:
+                fresh = slot
+        return fresh
+
+    def _oldest_idle(self):
+        idle = [s for s in self._slots if not s.busy]
+        return min(idle, key=lambda s: s.last_used) if idle else None
+
+    def _close(self, graph):
+        if graph is not None and self.teardown:
+            try:
+                self.teardown(graph)
+            except Exception as e:
+                print(f"Warning: closing pooled graph failed: {e}")
+
+    def checkout(self, session_key=None, timeout: float = None):
+        """
+        Returns a graph reserved for the caller until checkin(), or None when the
+        factory cannot build one (e.g. MediaPipe is not installed).
+        Raises TimeoutError if no graph frees up within timeout seconds.
+        """
+        if not self.available:
+            return None
+        deadline = None if timeout is None else time.monotonic() + timeout
+        stale = None
+        with self._cond:
+            while True:
+                slot = self._pick(session_key)
+                if slot is None and len(self._slots) < self.size:
+                    slot = _Slot()
+                    self._slots.append(slot)
+                if slot is None:
+                    # Take over the least recently used graph of another session
+                    slot = self._oldest_idle()
+                    if slot is not None:
+                        stale, slot.graph = slot.graph, None
+                        self._by_graph.pop(id(stale), None)
+                        self.rebuilds += 1
+                if slot is not None:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No graph available in the pool within {timeout}s")
+                self.waits += 1
+                self._cond.wait(remaining)
+            slot.busy = True
+            slot.owner = session_key
+
+        # Building and closing graphs is slow; do it outside the lock
+        self._close(stale)
+        if slot.graph is None:
+            try:
+                graph = self.factory()
+            except Exception:
+                self._discard(slot)
+                raise
+            if graph is None:
+                self.available = False
+                self._discard(slot)
+                return None
+            with self._cond:
+                slot.graph = graph
+                self._by_graph[id(graph)] = slot
+                self.created += 1
+        return slot.graph
+
+    def _discard(self, slot):
+        with self._cond:
+            if slot in self._slots:
+                self._slots.remove(slot)
+            self._cond.notify_all()
+
+    def checkin(self, graph):
+        """Returns a graph obtained from checkout() to the pool."""
+        if graph is None:
+            return
+        with self._cond:
+            slot = self._by_graph.get(id(graph))
+            if slot is not None:
+                slot.busy = False
+                slot.last_used = time.monotonic()
+                self._cond.notify()
+                return
+        # The pool was closed while this graph was checked out
+        self._close(graph)
+
+    @contextmanager
+    def lease(self, session_key=None, timeout: float = None):
+        graph = self.checkout(session_key, timeout)
+        try:
+            yield graph
+        finally:
+            self.checkin(graph)
+
+    def release_session(self, session_key):
+        """Closes the idle graphs tracking session_key, freeing their capacity."""
+        closing = []
+        with self._cond:
+            for slot in list(self._slots):
+                if not slot.busy and slot.owner is not _FRESH and slot.owner == session_key:
+                    self._slots.remove(slot)
+                    self._by_graph.pop(id(slot.graph), None)
+                    closing.append(slot.graph)
+            self._cond.notify_all()
+        for graph in closing:
+            self._close(graph)
+
+    def close(self):
+        """Closes every idle graph now and every checked-out graph on its checkin."""
+        with self._cond:
+            idle = [s.graph for s in self._slots if not s.busy]
+            self._slots = []
+            self._by_graph = {}
+            self._cond.notify_all()
+        for graph in idle:
+            self._close(graph)
+
+    def warmup(self):
+        """Builds one graph ahead of the first request; it stays claimable by any session."""
+        self.checkin(self.checkout(_FRESH))
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self.size,
+                "graphs": len(self._slots),
+                "in_use": sum(1 for s in self._slots if s.busy),
+                "created": self.created,
+                "rebuilds": self.rebuilds,
+                "waits": self.waits
+            }
+
@@ -0,0 +1,80 @@
+import numpy as np
+
+# MediaPipe face mesh indices shared by the gaze, head-pose and crop code
+RIGHT_EYE = np.array([33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246])
+LEFT_EYE = np.array([362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398])
+RIGHT_IRIS = np.array([469, 470, 471, 472])
+LEFT_IRIS = np.array([474, 475, 476, 477])
+RIGHT_EYE_CORNERS = np.array([33, 133])
+LEFT_EYE_CORNERS = np.array([362, 263])
+# 1 - nose tip, 33/263 - eye corners, 61/291 - mouth corners, 199 - chin
+HEAD_POSE_POINTS = np.array([1, 33, 61, 199, 263, 291])
+
+
+class FaceLandmarks:
+    """
+    Face mesh landmarks of one frame as a single (N, 3) float32 array of
+    normalized x, y, z coordinates, plus the frame size to map them to pixels.
+    Geometry helpers are vectorized gathers over this array.
+    """
+    __slots__ = ("points", "width", "height")
+
+    def __init__(self, points: np.ndarray, width: int, height: int):
+        self.points = points
+        self.width = width
+        self.height = height
+
+    @classmethod
+    def from_mediapipe(cls, landmarks, width: int, height: int) -> "FaceLandmarks":
+        """Converts a MediaPipe NormalizedLandmarkList in one pass."""
+        points = np.array([(l.x, l.y, l.z) for l in landmarks.landmark], dtype=np.float32)
+        return cls(points, width, height)
+
+    @classmethod
+    def coerce(cls, landmarks, frame_shape) -> "FaceLandmarks":
+        """Accepts either a FaceLandmarks or a raw MediaPipe landmark list."""
+        if isinstance(landmarks, cls):
+            return landmarks
+        h, w = frame_shape[:2]
+        return cls.from_mediapipe(landmarks, w, h)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def pixels(self, indices=None) -> np.ndarray:
+        """Returns (k, 2) pixel coordinates for the given indices (all if None)."""
+        pts = self.points[:, :2] if indices is None else self.points[indices, :2]
+        return pts * np.array([self.width, self.height], dtype=np.float32)
+
+    def bbox(self) -> tuple:
+        """Returns the (x, y, w, h) integer bounding box of all landmarks."""
+        px = self.pixels().astype(np.int32)
+        x_min, y_min = px.min(axis=0)
+        x_max, y_max = px.max(axis=0)
+        return (int(x_min), int(y_min), int(x_max - x_min), int(y_max - y_min))
+
+    def eye_centers(self) -> tuple:
+        """Returns the pixel centres of the (right, left) eye from their corners."""
+        return self.pixels(RIGHT_EYE_CORNERS).mean(axis=0), self.pixels(LEFT_EYE_CORNERS).mean(axis=0)
+
+    def iris_ratios(self) -> tuple:
+        """
+        Returns the (x, y) position of the right iris centre inside the right eye,
+        each as a 0..1 ratio of the eye's extent, or None if the eye has no extent.
+        """
+        eye = self.points[RIGHT_EYE, :2]
+        iris = self.points[RIGHT_IRIS, :2].mean(axis=0)
+        lo = eye.min(axis=0)
+        extent = eye.max(axis=0) - lo
+        if extent[0] == 0:
+            return None
+        x_ratio = float((iris[0] - lo[0]) / extent[0])
+        y_ratio = float((iris[1] - lo[1]) / extent[1]) if extent[1] > 0 else 0.5
+        return x_ratio, y_ratio
+
+    def pnp_points(self) -> tuple:
+        """Returns the (2D, 3D) float64 point sets used for head-pose PnP."""
+        pts = self.points[HEAD_POSE_POINTS]
+        face_2d = (pts[:, :2] * np.array([self.width, self.height])).astype(np.int64).astype(np.float64)
+        face_3d = np.column_stack([face_2d, pts[:, 2].astype(np.float64)])
+        return face_2d, face_3d
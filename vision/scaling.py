@@ -0,0 +1,35 @@
+import cv2
+import numpy as np
+from utils.config import VISION_ANALYSIS_SIZE
+
+
+def downscale_for_analysis(frame: np.ndarray, max_side: int = None) -> tuple:
+    """
+    Shrinks a frame so its longer side is at most max_side pixels, keeping the aspect ratio.
+    Returns (frame, scale) where scale = analysis size / original size (1.0 if unchanged).
+    max_side defaults to VISION_ANALYSIS_SIZE; 0 or None keeps full resolution.
+    """
+    if max_side is None:
+        max_side = VISION_ANALYSIS_SIZE
+    h, w = frame.shape[:2]
+    longest = max(h, w)
+    if not max_side or longest <= max_side:
+        return frame, 1.0
+    scale = max_side / longest
+    size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA), scale
+
+
+def scale_bbox(bbox: tuple, scale: float, frame_shape: tuple = None) -> tuple:
+    """
+    Maps an (x, y, w, h) bbox found on a downscaled frame back to original pixels.
+    With frame_shape the result is clamped to the original frame.
+    """
+    if scale == 1.0:
+        return tuple(int(v) for v in bbox)
+    x, y, w, h = (int(round(v / scale)) for v in bbox)
+    if frame_shape is not None:
+        fh, fw = frame_shape[:2]
+        x, y = min(max(0, x), fw), min(max(0, y), fh)
+        w, h = min(w, fw - x), min(h, fh - y)
+    return (x, y, w, h)
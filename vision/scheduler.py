@@ -0,0 +1,85 @@
+import cv2
+import numpy as np
+
+
+class FrameScheduler:
+    """
+    Decides which frames get the full vision treatment.
+    A cheap motion score (mean absolute difference of 32x32 grayscale thumbnails,
+    optionally combined with face landmark displacement) is compared against the
+    last analyzed frame. Changing scenes are analyzed up to budget_fps; static
+    scenes back off geometrically to min_fps and reuse the previous result.
+        if scheduler.should_analyze(frame, t):
+            result = analyze(frame)
+            scheduler.mark_analyzed(frame, t, face)
+    """
+
+    def __init__(self, budget_fps: float = 2.0, min_fps: float = 0.2,
+                 motion_threshold: float = 6.0, landmark_threshold: float = 0.01,
+                 thumb_size: int = 32):
+        self.min_interval = 1.0 / budget_fps
+        self.max_interval = 1.0 / min_fps
+        self.motion_threshold = motion_threshold
+        self.landmark_threshold = landmark_threshold
+        self.thumb_size = thumb_size
+        self.interval = self.min_interval
+        self._ref_thumb = None
+        self._ref_points = None
+        self._last_time = None
+        self._last_moved = True
+        self.analyzed = 0
+        self.skipped = 0
+
+    def _thumb(self, frame: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, (self.thumb_size, self.thumb_size), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def motion_score(self, frame: np.ndarray) -> float:
+        """Mean absolute thumbnail difference (0-255) against the last analyzed frame."""
+        if self._ref_thumb is None:
+            return float("inf")
+        return float(np.abs(self._thumb(frame) - self._ref_thumb).mean())
+
+    def landmark_motion(self, face) -> float:
+        """Mean normalized displacement of face landmarks since the last analyzed frame."""
+        if face is None or self._ref_points is None or len(face.points) != len(self._ref_points):
+            return 0.0
+        return float(np.abs(face.points[:, :2] - self._ref_points).mean())
+
+    def should_analyze(self, frame: np.ndarray, timestamp: float, face=None) -> bool:
+        """Returns True if the frame at timestamp (seconds) should be fully analyzed."""
+        if self._last_time is None:
+            return True
+        since = timestamp - self._last_time
+        if since < self.min_interval:
+            self.skipped += 1
+            return False
+
+        moved = (self.motion_score(frame) >= self.motion_threshold
+                 or self.landmark_motion(face) >= self.landmark_threshold)
+        self._last_moved = moved
+        if moved or since >= self.interval:
+            return True
+        self.skipped += 1
+        return False
+
+    def mark_analyzed(self, frame: np.ndarray, timestamp: float, face=None):
+        """Records an analyzed frame as the new reference and adapts the sampling interval."""
+        if self._last_time is not None and not self._last_moved:
+            # Static scene: sample less often
+            self.interval = min(self.max_interval, self.interval * 2)
+        else:
+            self.interval = self.min_interval
+        self._ref_thumb = self._thumb(frame)
+        self._ref_points = face.points[:, :2].copy() if face is not None else None
+        self._last_time = timestamp
+        self.analyzed += 1
+
+    def stats(self) -> dict:
+        total = self.analyzed + self.skipped
+        return {
+            "analyzed": self.analyzed,
+            "skipped": self.skipped,
+            "analyzed_ratio": round(self.analyzed / total, 3) if total else 0.0,
+            "current_interval": round(self.interval, 3)
+        }
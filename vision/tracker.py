@@ -1,9 +1,15 @@
 import cv2
 import numpy as np
-import streamlit as st
+from utils.config import VISION_GRAPH_POOL_SIZE, VISION_GRAPH_TIMEOUT
+from utils.resources import registry, resource
+from vision.landmarks import FaceLandmarks
+from vision.scaling import downscale_for_analysis
+from vision.graph_pool import GraphPool
 
-@st.cache_resource
-def get_face_mesh_model():
+def _close_graph(graph):
+    graph.close()
+
+def build_face_mesh():
     try:
         import mediapipe as mp
         mp_face_mesh = mp.solutions.face_mesh
@@ -16,8 +22,7 @@ def get_face_mesh_model():
     except ImportError:
         return None
 
-@st.cache_resource
-def get_pose_model():
+def build_pose():
     try:
         import mediapipe as mp
         mp_pose = mp.solutions.pose
@@ -29,6 +34,49 @@ def get_pose_model():
     except ImportError:
         return None
 
+def build_holistic():
+    try:
+        import mediapipe as mp
+        return mp.solutions.holistic.Holistic(
+            static_image_mode=False,
+            refine_face_landmarks=True,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+    except ImportError:
+        return None
+
+# MediaPipe graphs keep tracking state and must not process frames concurrently,
+# so each server process holds a bounded pool of them with per-session affinity.
+def _warm_pool(pool):
+    pool.warmup()
+
+def _close_pool(pool):
+    pool.close()
+
+@resource("face_mesh", warmup=_warm_pool, teardown=_close_pool)
+def get_face_mesh_pool():
+    return GraphPool(build_face_mesh, size=VISION_GRAPH_POOL_SIZE, teardown=_close_graph)
+
+@resource("pose", warmup=_warm_pool, teardown=_close_pool)
+def get_pose_pool():
+    return GraphPool(build_pose, size=VISION_GRAPH_POOL_SIZE, teardown=_close_graph)
+
+@resource("holistic", warmup=_warm_pool, teardown=_close_pool)
+def get_holistic_pool():
+    return GraphPool(build_holistic, size=VISION_GRAPH_POOL_SIZE, teardown=_close_graph)
+
+def release_vision_session(session_key):
+    """Frees the graphs tracking a finished session."""
+    for get_pool in (get_face_mesh_pool, get_pose_pool, get_holistic_pool):
+        if registry.is_loaded(get_pool.resource_name):
+            get_pool().release_session(session_key)
+
+# MediaPipe pose landmark indices used by the posture heuristic
+POSE_NOSE = 0
+POSE_LEFT_SHOULDER = 11
+POSE_RIGHT_SHOULDER = 12
+
 def initialize_camera(camera_index: int = 0) -> cv2.VideoCapture:
     """Initializes and returns a cv2 VideoCapture object."""
     cap = cv2.VideoCapture(camera_index)
@@ -43,51 +91,33 @@ def get_frame(cap: cv2.VideoCapture) -> np.ndarray:
         return None
     return frame
 
-def detect_face(frame: np.ndarray):
+def detect_face(frame: np.ndarray, session_key=None):
     """
-    Returns bounding box and landmarks for the primary face.
+    Returns bounding box and landmarks (a FaceLandmarks) for the primary face.
     Returns None if no face is detected.
+    session_key keeps consecutive frames of one interview on the same tracking graph.
     """
-    face_mesh = get_face_mesh_model()
-    if not face_mesh:
-        return None
-        
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = face_mesh.process(rgb_frame)
+    small, _ = downscale_for_analysis(frame)
+    rgb_frame = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+    with get_face_mesh_pool().lease(session_key, VISION_GRAPH_TIMEOUT) as face_mesh:
+        if not face_mesh:
+            return None
+        results = face_mesh.process(rgb_frame)
     
     if not results.multi_face_landmarks:
         return None
         
-    landmarks = results.multi_face_landmarks[0]
-    h, w, c = frame.shape
-    
-    # Calculate bounding box
-    x_min = min([int(l.x * w) for l in landmarks.landmark])
-    x_max = max([int(l.x * w) for l in landmarks.landmark])
-    y_min = min([int(l.y * h) for l in landmarks.landmark])
-    y_max = max([int(l.y * h) for l in landmarks.landmark])
-    bbox = (x_min, y_min, x_max - x_min, y_max - y_min)
-    
-    return {"bbox": bbox, "landmarks": landmarks}
+    # Landmarks are normalized, so the original size maps them back to full-resolution pixels
+    h, w = frame.shape[:2]
+    landmarks = FaceLandmarks.from_mediapipe(results.multi_face_landmarks[0], w, h)
+    return {"bbox": landmarks.bbox(), "landmarks": landmarks}
 
 def get_head_pose(frame: np.ndarray, landmarks) -> dict:
     """
     Estimates head pose (yaw, pitch, roll) from face landmarks.
     """
     h, w, c = frame.shape
-    face_3d = []
-    face_2d = []
-
-    # 33 - nose tip, 263 - left eye left corner, 33 - right eye right corner (simplified list)
-    key_points = [33, 263, 1, 61, 291, 199]
-    for idx, lm in enumerate(landmarks.landmark):
-        if idx in key_points:
-            x, y = int(lm.x * w), int(lm.y * h)
-            face_2d.append([x, y])
-            face_3d.append([x, y, lm.z])
-
-    face_2d = np.array(face_2d, dtype=np.float64)
-    face_3d = np.array(face_3d, dtype=np.float64)
+    face_2d, face_3d = FaceLandmarks.coerce(landmarks, frame.shape).pnp_points()
 
     focal_length = 1 * w
     cam_matrix = np.array([
@@ -109,46 +139,50 @@ def get_head_pose(frame: np.ndarray, landmarks) -> dict:
     except:
         return {"pitch": 0.0, "yaw": 0.0, "roll": 0.0}
 
-def detect_posture(frame: np.ndarray) -> str:
+def pose_to_array(pose_landmarks) -> np.ndarray:
+    """Converts a MediaPipe pose landmark list into a (33, 4) float32 array of x, y, z, visibility."""
+    return np.array([(l.x, l.y, l.z, l.visibility) for l in pose_landmarks.landmark], dtype=np.float32)
+
+def classify_posture(pose_points: np.ndarray) -> str:
     """
-    Detects upper body posture.
+    Classifies upper body posture from a (33, 4) pose landmark array.
     Returns 'upright', 'slouching', or 'leaning'.
     """
-    pose = get_pose_model()
-    if not pose:
-        return "unknown"
-        
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = pose.process(rgb_frame)
-    
-    if not results.pose_landmarks:
-        return "unknown"
-        
-    try:
-        import mediapipe as mp
-        mp_pose = mp.solutions.pose
-    except ImportError:
-        return "unknown"
-        
-    landmarks = results.pose_landmarks.landmark
-    left_shoulder = landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-    right_shoulder = landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-    nose = landmarks[mp_pose.PoseLandmark.NOSE.value]
+    nose = pose_points[POSE_NOSE]
+    left_shoulder = pose_points[POSE_LEFT_SHOULDER]
+    right_shoulder = pose_points[POSE_RIGHT_SHOULDER]
     
     # Calculate simple heuristics for demonstration
-    shoulder_y_avg = (left_shoulder.y + right_shoulder.y) / 2
+    shoulder_y_avg = (left_shoulder[1] + right_shoulder[1]) / 2
     
     # If the nose is very close to shoulders Y level, likely slouching or leaning in too close
-    if nose.y > shoulder_y_avg - 0.15:
+    if nose[1] > shoulder_y_avg - 0.15:
         return "slouching"
     
     # Checking for leaning left/right
-    spine_x = (left_shoulder.x + right_shoulder.x) / 2
-    if abs(nose.x - spine_x) > 0.1:
+    spine_x = (left_shoulder[0] + right_shoulder[0]) / 2
+    if abs(nose[0] - spine_x) > 0.1:
         return "leaning"
         
     return "upright"
 
+def detect_posture(frame: np.ndarray, session_key=None) -> str:
+    """
+    Detects upper body posture.
+    Returns 'upright', 'slouching', or 'leaning'.
+    """
+    small, _ = downscale_for_analysis(frame)
+    rgb_frame = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+    with get_pose_pool().lease(session_key, VISION_GRAPH_TIMEOUT) as pose:
+        if not pose:
+            return "unknown"
+        results = pose.process(rgb_frame)
+    
+    if not results.pose_landmarks:
+        return "unknown"
+        
+    return classify_posture(pose_to_array(results.pose_landmarks))
+
 def release_camera(cap: cv2.VideoCapture):
     """Releases the camera resource."""
     if cap and cap.isOpened():
@@ -0,0 +1,199 @@
+import os
+import queue
+import threading
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+from vision.gaze_estimator import get_eye_contact_percentage
+from vision.scheduler import FrameScheduler
+
+# Frames per task sent to a worker process; consecutive frames keep MediaPipe tracking warm
+CHUNK_SIZE = 8
+_END = object()
+
+
+def iter_sampled_frames(path: str, sample_fps: float = 1.0):
+    """
+    Yields (timestamp_seconds, frame) from a video file at roughly sample_fps.
+    Skipped frames are only grabbed, not decoded.
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video {path}")
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        step = max(1, int(round(fps / sample_fps))) if sample_fps > 0 else 1
+        idx = 0
+        while True:
+            if idx % step == 0:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield idx / fps, frame
+            elif not cap.grab():
+                break
+            idx += 1
+    finally:
+        cap.release()
+
+
+def _reader(path: str, sample_fps: float, out: queue.Queue, errors: list,
+            scheduler: FrameScheduler = None, skipped: list = None):
+    """
+    Decodes on its own thread so decoding overlaps with analysis.
+    With a scheduler, static frames are not sent for analysis; their timestamps go to skipped.
+    """
+    try:
+        chunk = []
+        for item in iter_sampled_frames(path, sample_fps):
+            if scheduler is not None:
+                timestamp, frame = item
+                if not scheduler.should_analyze(frame, timestamp):
+                    skipped.append(timestamp)
+                    continue
+                scheduler.mark_analyzed(frame, timestamp)
+            chunk.append(item)
+            if len(chunk) == CHUNK_SIZE:
+                out.put(chunk)
+                chunk = []
+        if chunk:
+            out.put(chunk)
+    except Exception as e:
+        errors.append(e)
+    finally:
+        out.put(_END)
+
+
+def _init_worker():
+    # Keep each worker to one core; parallelism comes from the pool
+    try:
+        cv2.setNumThreads(1)
+    except Exception:
+        pass
+
+
+def analyze_chunk(chunk: list) -> list:
+    """
+    Runs the full per-frame vision pass on a list of (timestamp, frame).
+    Emotion is classified in one batch over the chunk's face crops.
+    Returns one dict per frame.
+    """
+    from vision.frame_analyzer import analyze_vision_frame
+    from vision.emotion_detector import crop_face, analyze_face_crops
+
+    rows = []
+    crops = []
+    for timestamp, frame in chunk:
+        analysis = analyze_vision_frame(frame)
+        row = {"timestamp": round(float(timestamp), 3), "face": analysis.has_face,
+               "gaze": analysis.gaze, "posture": analysis.posture, "head_pose": analysis.head_pose}
+        if analysis.has_face:
+            crop = crop_face(frame, analysis.bbox, analysis.face)
+            if crop.size > 0:
+                row["crop_idx"] = len(crops)
+                crops.append(crop)
+        rows.append(row)
+
+    emotions = analyze_face_crops(crops) if crops else []
+    for row in rows:
+        idx = row.pop("crop_idx", None)
+        row["emotion"] = emotions[idx] if idx is not None else None
+    return rows
+
+
+def fill_skipped_frames(rows: list, skipped: list) -> list:
+    """Adds a copy of the last analyzed row, marked 'reused', for every skipped timestamp."""
+    if not skipped:
+        return rows
+    rows = sorted(rows, key=lambda r: r["timestamp"])
+    times = [r["timestamp"] for r in rows]
+    filled = list(rows)
+    for timestamp in skipped:
+        idx = bisect_right(times, timestamp) - 1
+        if idx < 0:
+            continue
+        reused = dict(rows[idx], timestamp=round(float(timestamp), 3), reused=True)
+        filled.append(reused)
+    filled.sort(key=lambda r: r["timestamp"])
+    return filled
+
+def summarize_frames(rows: list) -> dict:
+    """Builds the emotion timeline, gaze log and posture summary from per-frame rows."""
+    emotion_timeline = []
+    gaze_log = []
+    postures = Counter()
+    for row in rows:
+        if not row["face"]:
+            continue
+        emo = row["emotion"]
+        if emo is not None:
+            emotion_timeline.append({
+                "timestamp": row["timestamp"],
+                "emotion": emo["emotion"],
+                "confidence": emo["confidence"],
+                "all_scores": emo["all_scores"]
+            })
+        gaze_log.append(row["gaze"])
+        if row["posture"] != "unknown":
+            postures[row["posture"]] += 1
+
+    return {
+        "emotion_timeline": emotion_timeline,
+        "gaze_log": gaze_log,
+        "eye_contact_percent": get_eye_contact_percentage(gaze_log),
+        "posture_summary": postures.most_common(1)[0][0] if postures else "unknown",
+        "posture_counts": dict(postures),
+        "frames_analyzed": sum(1 for r in rows if not r.get("reused")),
+        "frames_reused": sum(1 for r in rows if r.get("reused"))
+    }
+
+
+def analyze_video(path: str, sample_fps: float = 1.0, workers: int = None,
+                  budget_fps: float = None) -> dict:
+    """
+    Analyzes a recorded interview video.
+    Frames are decoded on a reader thread at sample_fps and analyzed in chunks on a
+    process pool of `workers` processes (CPU count by default; 0 runs inline).
+    With budget_fps, a FrameScheduler analyzes at most budget_fps frames per second
+    of video, fewer while the scene is static, and skipped frames reuse the previous result.
+    Returns the emotion timeline, gaze log, eye contact % and posture summary
+    in the same shape the live interview produces.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    chunks = queue.Queue(maxsize=max(2, workers * 2))
+    errors = []
+    skipped = []
+    scheduler = FrameScheduler(budget_fps=budget_fps, min_fps=min(0.2, budget_fps)) if budget_fps else None
+    reader = threading.Thread(target=_reader, args=(path, sample_fps, chunks, errors, scheduler, skipped),
+                              daemon=True)
+    reader.start()
+
+    rows = []
+    if workers <= 0:
+        while True:
+            chunk = chunks.get()
+            if chunk is _END:
+                break
+            rows.extend(analyze_chunk(chunk))
+    else:
+        # Bounded number of in-flight chunks keeps memory flat on long videos
+        max_in_flight = workers * 2
+        pending = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            while True:
+                chunk = chunks.get()
+                if chunk is _END:
+                    break
+                pending.append(pool.submit(analyze_chunk, chunk))
+                if len(pending) >= max_in_flight:
+                    rows.extend(pending.pop(0).result())
+            for fut in pending:
+                rows.extend(fut.result())
+
+    reader.join()
+    if errors:
+        raise errors[0]
+    return summarize_frames(fill_skipped_frames(rows, skipped))